@@ -1,40 +1,210 @@
 from __future__ import annotations
-from typing import List, Tuple
+from typing import Callable, List, Optional, Tuple
+from contextlib import contextmanager
+from AccountResult import AccountResult, console
 from Wallet import Wallet
+from WalletList import WalletList
+from WalletBatch import WalletBatch
+from WalletJournal import WalletJournal
 from datetime import datetime
 from Transaction import TransactionType
 from AccountTransactionHandler import AccountTransactionHandler
+from TransactionWriter import TransactionWriter
+from GroupCommit import GroupCommit
+from AccountLocks import AccountLocks, reading, writing
 import json
 import os
-import shutil
+import threading
 
 
 class Account():
     """
     This single account entity provides the functionality for managing
     all the wallets for an owner. 
+
+    storage selects how the wallets file is saved:
+        "json": the whole wallets file is rewritten on each save (default)
+        "journal": saves append only the changed wallets to a journal
+                   next to the wallets file, see WalletJournal
+        "sqlite": wallet_name is a SQLite database that keeps both the
+                  wallets and the transactions, see SQLiteStorage.
+                  Use SQLiteTransactionHistory to query its transactions
+
+    transactions_name (optional) is the name of the transactions csv file,
+    transactions.csv by default. The transactions queued until the next
+    save belong to the account (see AccountTransactionHandler), so many
+    accounts can be used in the same process
+
+    output (optional) receives the messages of the operations, one string
+    at a time; they are printed by default. With output=None the account
+    is quiet: messages are not even formatted. Either way, the operations
+    return an AccountResult with what they did
+
+    background_writes (optional) appends the transactions saved to the
+    transactions file from a background thread (see TransactionWriter),
+    so save() doesn't wait for the disk. Call flush() to wait for them
+    and close() when done with the account
+
+    group_commit (optional) is a GroupCommit that makes saves durable
+    with its durability level; share it among accounts to group their
+    fsyncs. The transactions are made durable before the wallets file
+    they belong to. Without it nothing is fsynced. SQLite storages
+    handle their own durability
+
+    thread_safe (optional) lets many threads use the account at once, see
+    AccountLocks. Reads run in parallel; transfer, add, deduct and set_cap
+    only lock the wallets they touch (and main when a cap may send money
+    to it), so operations on different wallets don't wait for each other.
+    Operations on many wallets, or on the wallet list, run alone.
+    A read running with a transfer may see the money on both wallets or
+    on none: totals are exact only between operations
+
+    readonly (optional) opens the account only to read it, see open_readonly
     """
 
-    def __init__(self, wallet_name: str = "test_wallet.json"):
+    storages = ("json", "journal", "sqlite")
+    # from this many wallets on, deposits are split by the DepositEngine
+    # and print a summary instead of one line per wallet
+    deposit_engine_threshold = 1000
+
+    def __init__(
+        self,
+        wallet_name: str = "test_wallet.json",
+        storage: str = "json",
+        transactions_name: str = None,
+        output: Optional[Callable[[str], None]] = console,
+        background_writes: bool = False,
+        group_commit: GroupCommit = None,
+        thread_safe: bool = False,
+        readonly: bool = False,
+    ):
+        if storage not in self.storages:
+            raise ValueError(f"Unknown storage {storage}, use one of {self.storages}")
         self.__wallet_name = wallet_name
-        if wallet_name in ["test_wallet.json", "test_empty_wallet.json"]:
+        self.__storage = storage
+        self.__readonly = readonly
+        self.output = output
+        self.__journal = WalletJournal(wallet_name) if storage == "journal" else None
+        self.__database = None
+        if storage == "sqlite" and not readonly:
+            self.__database = self.__open_database()
+        if transactions_name:
+            self.__transactions_name = transactions_name
+        elif wallet_name in ["test_wallet.json", "test_empty_wallet.json"]:
             self.__transactions_name = "test_transactions.csv"
         else:
             self.__transactions_name = "transactions.csv"
-        self.wallets: List[Wallet] = []
-        self.savings_wallets: List[str] = [
-            'emergencies',
-            'savings',
-            'investing',
-            'binance-btc',
-            'travels',
-        ]
+        self.transaction_handler = AccountTransactionHandler(self.__transactions_name)
+        self.__writer = None
+        self.__group_commit = group_commit
+        self._locks = AccountLocks() if thread_safe else None
+        self.__deposit_engine = None
+        if readonly:
+            # the wallets are read when first used, see __getattr__
+            return
 
+        self.wallets: WalletList = WalletList()
+        if thread_safe:
+            self.wallets.totals_lock = threading.Lock()
         self.__init_wallets_file()
-        AccountTransactionHandler._init_transactions_file(
-            self.get_transactions_file_name()
-        )
+        if not self.__database:
+            self.transaction_handler._init_transactions_file()
+            if background_writes:
+                self.__writer = TransactionWriter(self.get_transactions_file_name())
+
+
+    @classmethod
+    def open_readonly(
+        cls,
+        wallet_name: str = "test_wallet.json",
+        storage: str = "json",
+        transactions_name: str = None,
+        output: Optional[Callable[[str], None]] = console,
+    ) -> Account:
+        """
+        Opens an account only to read it, for reports: no file is created
+        or written, and the wallets file isn't even read until the wallets
+        are first used. Its changes can't be saved
+        """
 
+        return cls(wallet_name, storage, transactions_name, output, readonly=True)
+
+    def __getattr__(self, name: str):
+        """Reads the wallets of a read only account the first time they're used"""
+
+        if name != 'wallets' or not self.__dict__.get('_Account__readonly'):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        if self.__storage == "sqlite" and self.__database is None:
+            self.__database = self.__open_database(readonly=True)
+        self.wallets = WalletList()
+        self.wallets.extend_data(self.__read_saved_wallets() or [])
+        self.wallets.mark_saved()
+        return self.wallets
+
+    def __open_database(self, readonly: bool = False):
+        """Opens the SQLite storage. Imported here so other accounts don't load it"""
+        from SQLiteStorage import SQLiteStorage
+        return SQLiteStorage(self.__wallet_name, readonly=readonly)
+
+    def _say(self, message: str, *args) -> None:
+        """Sends a message to the output, formatting it with args only if there's an output"""
+        if self.output is not None:
+            self.output(message.format(*args) if args else message)
+
+    def _fail(self, result: AccountResult, message: str, *args) -> AccountResult:
+        """Marks the operation as not done and sends the reason to the output"""
+        result.error = message.format(*args) if args else message
+        self._say(result.error)
+        return result
+
+    @contextmanager
+    def __locked_wallets(self, *names: str, capped: Tuple[str] = ()):
+        """
+        Holds the locks of the named wallets when the account is thread safe,
+        and the one of main if a wallet in capped has a cap. Internal use only
+        """
+
+        if self._locks is None:
+            yield
+            return
+        # correct_cap creates main if it's missing, which can't be done with the read lock held
+        needs_main = bool(capped) or 'main' in names
+        structure = self._locks.structure
+        while True:
+            if needs_main and self.wallets.get('main') is None:
+                self.__add_main()
+            structure.acquire_read()
+            # main may be deleted again before the read lock is taken
+            if not needs_main or self.wallets.get('main') is not None:
+                break
+            structure.release_read()
+        try:
+            while True:
+                locked = set(names)
+                if self.__has_cap(capped):
+                    locked.add('main')
+                wallet_locks = self._locks.acquire(locked)
+                # a cap set while waiting for the locks also needs main
+                if 'main' in locked or not self.__has_cap(capped):
+                    break
+                self._locks.release(wallet_locks)
+            try:
+                yield
+            finally:
+                self._locks.release(wallet_locks)
+        finally:
+            structure.release_read()
+
+    @writing
+    def __add_main(self) -> None:
+        """Creates the main wallet if it's missing. Internal use only"""
+
+        if self.wallets.get('main') is None:
+            self.add_wallet('main')
+            self._say('main Wallet created.')
+
+    def __has_cap(self, names: Tuple[str]) -> bool:
+        return any((wallet := self.wallets.get(name)) is not None and wallet.cap for name in names)
 
     def get_wallet_name(self) -> str:
         """Returns the name of the wallet JSON file"""
@@ -50,87 +220,103 @@ class Account():
         Internal use only
         """
 
-        if os.path.exists(self.__wallet_name):
-            with open(self.__wallet_name) as file:
-                json_content = file.read()
-                if not len(json_content):
-                    self.add_wallet('main')
-                    self.save()
-                    print('Wallet created.')
-                else:
-                    wallets: List = json.loads(json_content)
-                    for wallet_dict in wallets:
-                        wallet = Wallet(**wallet_dict)
-                        self.wallets.append(wallet)
+        if self.__database or os.path.exists(self.__wallet_name):
+            wallets = self.__read_saved_wallets()
+            if wallets is None:
+                self.add_wallet('main')
+                self.save()
+                self._say('Wallet created.')
+            else:
+                self.wallets.extend_data(wallets)
+                self.wallets.mark_saved()
         else:
             self.add_wallet('main')
             with open(self.__wallet_name, 'w') as file:
                 self.save()
-                print('Wallet created.')
+                self._say('Wallet created.')
 
 
+    def __read_saved_wallets(self) -> List[dict]:
+        """
+        Returns the saved wallets data, or None if the wallets file is empty.
+        Internal use only
+        """
+
+        if self.__journal:
+            return self.__journal.load()
+        if self.__database:
+            return self.__database.load_wallets()
+
+        with open(self.__wallet_name) as file:
+            json_content = file.read()
+        if not len(json_content):
+            return None
+        return json.loads(json_content)
+
+    @reading
     def get_wallet(self, name: str) -> Wallet:
         """
         Returns an existing wallet object of the specified name
         """
 
-        for wallet in self.wallets:
-            if name == wallet.name:
-                return wallet
+        return self.wallets.get(name)
 
-    def add_wallet(self, name: str, balance: int = 0, percent: int = 0, cap: int = 0) -> None:
+    @writing
+    def add_wallet(
+        self, name: str, balance: int = 0, percent: int = 0, cap: int = 0, wallet_type: str = None, location: str = ''
+    ) -> AccountResult:
         """
         Adds a new wallet to your wallets provided a name
         balance (optional) is the current amount of money the wallet holds
         percent (optional) current percent data the wallet has
         cap (optional) maximum amount of money the wallet is allowed to have
+        wallet_type (optional) one of Wallet.types, see Wallet for the default
+        location (optional) where the money is, like cash or bank
         """
 
-        __wallet_names = [wallet.name for wallet in self.wallets]
-        if name in __wallet_names:
-            print(f'Wallet {name} already exists. Please try again.')
-            return
-        else:
-            if self.valid_number(balance) and self.valid_number(percent) and self.valid_number(cap):
-                new_wallet = Wallet(name, balance, percent, cap)
-                if new_wallet.cap and new_wallet.balance > new_wallet.cap:
-                    print('Error: Balance value must not be greater than Cap')
-                    return
-                self.wallets.append(new_wallet)
-                print(f"Wallet {new_wallet.name} created.")
-            else:
-                print(f'Bad input, please try again.')
-
-    def delete_wallet(self, name: str):
+        result = AccountResult('add_wallet')
+        if self.wallets.get(name) is not None:
+            return self._fail(result, 'Wallet {} already exists. Please try again.', name)
+        if not (self.valid_number(balance) and self.valid_number(percent) and self.valid_number(cap)):
+            return self._fail(result, 'Bad input, please try again.')
+        if cap and balance > cap:
+            return self._fail(result, 'Error: Balance value must not be greater than Cap')
+        if wallet_type is not None and wallet_type not in Wallet.types:
+            return self._fail(result, 'Wallet type {} is not one of {}.', wallet_type, ', '.join(Wallet.types))
+
+        self.wallets.append(Wallet(name, balance, percent, cap, wallet_type, location))
+        self._say("Wallet {} created.", name)
+        return result
+
+    @writing
+    def delete_wallet(self, name: str) -> AccountResult:
         """
         Delete an existing wallet from your wallets
         """
 
+        result = AccountResult('delete_wallet')
         if name == 'main':
-            print('Main wallet should not be deleted.')
-            return
+            return self._fail(result, 'Main wallet should not be deleted.')
 
         wallet_to_delete = self.get_wallet(name)
         if not wallet_to_delete:
-            print(f'Wallet {name} could not be found. Please try again.')
-        else:
-            self.transfer(name, 'main')
-            self.wallets.remove(wallet_to_delete)
-            print(f"Wallet {name} deleted.")
+            return self._fail(result, 'Wallet {} could not be found. Please try again.', name)
 
+        result.balances = self.transfer(name, 'main').balances
+        self.wallets.remove(wallet_to_delete)
+        self._say("Wallet {} deleted.", name)
+        return result
+
+    @reading
     def correct_percent(self) -> bool:
         """
         Returns true if the sum of the percentages of all wallets is 100
         Return false otherwise
         """
 
-        percents = [wallet.percent for wallet in self.wallets]
-        if not percents:
-            return False
-        elif sum(percents) == 100:
-            return True
-        else:
+        if not self.wallets:
             return False
+        return self.wallets.total('percents') == 100
 
     def valid_number(self, *args: Tuple[int]) -> bool:
         """
@@ -143,133 +329,287 @@ class Account():
                 return False 
         return True
 
-    def transfer(self, _from: str, to: str, amount: int = None) -> None:
+    def transfer(self, _from: str, to: str, amount: int = None) -> AccountResult:
         """
         Transfer a desired amount of money from one wallet to another
         """
 
-        from_wallet = self.get_wallet(_from)
-        to_wallet = self.get_wallet(to)
-        if not from_wallet or not to_wallet:
-            print('Please insert valid wallet names.')
-            return
-
-        if amount is not None:
-            if not self.valid_number(amount):
-                print('Only positive integers are permitted. Try again.')
-                return
-            if amount > from_wallet.balance:
-                print('Money to transfer surpasses wallet amount. Please try again.')
-                return
-
-            print(f"Balance of {from_wallet.name} changed from {from_wallet.balance} ", end="")
+        with self.__locked_wallets(_from, to, capped=(to,)):
+            result = AccountResult('transfer')
+            from_wallet = self.get_wallet(_from)
+            to_wallet = self.get_wallet(to)
+            if not from_wallet or not to_wallet:
+                return self._fail(result, 'Please insert valid wallet names.')
+
+            # Transfer all the money if amount is None
+            transfer_all = amount is None
+            if transfer_all:
+                amount = from_wallet.balance
+            elif not self.valid_number(amount):
+                return self._fail(result, 'Only positive integers are permitted. Try again.')
+            elif amount > from_wallet.balance:
+                return self._fail(result, 'Money to transfer surpasses wallet amount. Please try again.')
+
+            from_before, to_before = from_wallet.balance, to_wallet.balance
             from_wallet -= amount
-            print(f"to {from_wallet.balance}")
-            print(f"Balance of {to_wallet.name} changed from {to_wallet.balance} ", end="")
             to_wallet += amount
-            print(f"to {to_wallet.balance}\n")
-            self.correct_cap(to_wallet)
-        
-        # Transfer all the money if amount is None
-        else:
-            amount = from_wallet.balance
-            print(f"Balance of {from_wallet.name} changed from {from_wallet.balance} ", end="")
-            from_wallet -= amount
-            print(f"to {from_wallet.balance}")
-            print(f"Balance of {to_wallet.name} changed from {to_wallet.balance} ", end="")
-            to_wallet += amount
-            print(f"to {to_wallet.balance}")
-
+            result.balance_changed(from_wallet.name, from_before, from_wallet.balance)
+            result.balance_changed(to_wallet.name, to_before, to_wallet.balance)
+            self._say("Balance of {} changed from {} to {}", from_wallet.name, from_before, from_wallet.balance)
+            self._say("Balance of {} changed from {} to {}", to_wallet.name, to_before, to_wallet.balance)
+            if not transfer_all:
+                self.correct_cap(to_wallet, result)
+            return result
+
+    @reading
     def total(self) -> str:
         """
         Outputs the total amount of money available
         i.e. the sum of the balance of all wallets
         """
 
-        total = sum([wallet.balance for wallet in self.wallets])
-        return f'${total}'
+        return f'${self.wallets.total()}'
 
+    @reading
     def total_except(self, *names: Tuple[str]) -> str:
         """
         Takes as arguments as many existing wallet names,
         returns the sum of all balances except those whose names were given
         """
-        except_wallets = [self.get_wallet(wallet_name) for wallet_name in names]
+        except_wallets = {self.get_wallet(wallet_name) for wallet_name in names}
         
-        if any(wallet is None for wallet in except_wallets):
-            print('One of the wallet names provided does not exist.')
+        if None in except_wallets:
+            self._say('One of the wallet names provided does not exist.')
             return None
         
-        total = sum([wallet.balance for wallet in self.wallets if wallet not in except_wallets])
+        total = self.wallets.total() - sum([wallet.balance for wallet in except_wallets])
         return f"${total}"
 
-    def save(self) -> None:
+    @writing
+    def save(self) -> AccountResult:
         """Save changes to json wallet file"""
-        wallets: List = [wallet.__dict__ for wallet in self.wallets]
+
+        result = AccountResult('save')
+        if self.__readonly:
+            return self._fail(result, "The account {} is read only, it can't be saved.", self.__wallet_name)
+        if self.__database:
+            queued_rows = self.__database.rows_from_lines(self.transaction_handler._transactions)
+            self.__database.save(self.wallets, queued_rows)
+            self.transaction_handler._empty_queued_transactions()
+            self._say('Saved Changes.')
+            return result
+
+        directory = os.path.dirname(os.path.abspath(self.__wallet_name))
+        commit_durability = self.__group_commit is not None and self.__group_commit.durability == "commit"
+        # the writer appends the lines later anyway, so without commit durability they are
+        # handed over once the wallets are saved, and a failed save has nothing to take back
+        handed_later = self.__writer is not None and not commit_durability
+        lines = list(self.transaction_handler._transactions)
+        size = None if handed_later else self.__transactions_size()
+        try:
+            if self.__journal:
+                self.__save_journal(directory, handed_later)
+            else:
+                self.__save_wallets_file(directory, commit_durability, handed_later)
+        except Exception:
+            self.__undo_transactions(lines, size)
+            raise
+        if handed_later:
+            self.__insert_queued_transactions()
+        self._say('Saved Changes.')
+        return result
+
+    def __save_journal(self, directory: str, handed_later: bool) -> None:
+        if not handed_later:
+            self.__insert_queued_transactions()
+            self.__sync(self.get_transactions_file_name())
+        self.__journal.save(self.wallets)
+        self.__sync(self.__journal.wallets_filename, self.__journal.journal_filename, directory)
+
+    def __save_wallets_file(self, directory: str, commit_durability: bool, handed_later: bool) -> None:
+        wallets: List = [wallet.to_dict() for wallet in self.wallets]
         wallets_json = json.dumps(wallets)
-        with open(self.__wallet_name, 'w') as file:
+        # write aside and rename, so a crash never leaves half a wallets file
+        temporary_filename = f"{self.__wallet_name}.tmp"
+        with open(temporary_filename, 'w') as file:
             file.write(wallets_json)
-            AccountTransactionHandler._insert_queued_transactions(self.get_transactions_file_name())
-            print('Saved Changes.')
+        if not handed_later:
+            self.__insert_queued_transactions()
+        if commit_durability:
+            # the new wallets must be on disk before they replace the old ones
+            self.__sync(temporary_filename, self.get_transactions_file_name())
+            os.replace(temporary_filename, self.__wallet_name)
+            self.__sync(directory)
+        else:
+            # a periodic sync comes later, once the temporary file has been renamed
+            os.replace(temporary_filename, self.__wallet_name)
+            self.__sync(self.__wallet_name, self.get_transactions_file_name(), directory)
+        self.wallets.mark_saved()
+
+    def __transactions_size(self) -> Optional[int]:
+        try:
+            return os.path.getsize(self.get_transactions_file_name())
+        except OSError:
+            return None
 
-    def deduct(self, name: str, description: str = None, amount: int = None):
+    def __undo_transactions(self, lines: List[str], size: Optional[int]) -> None:
         """
-        Deduct the desired amount of money from a wallet
+        Takes the transactions of a failed save out of the transactions file,
+        cutting it back to size, and queues them again
         """
 
-        wallet = self.get_wallet(name)
-        if not wallet:
-            print('No wallet under that name could be found.')
-            return
+        if size is not None:
+            if self.__writer is not None:
+                self.__writer.flush()
+            if (self.__transactions_size() or 0) > size:
+                os.truncate(self.get_transactions_file_name(), size)
+        self.transaction_handler._transactions[:] = lines
+
+    def __sync(self, *paths: str) -> None:
+        """Makes the files durable according to the group commit, if any"""
+        if self.__group_commit is not None:
+            self.__group_commit.sync(paths)
 
-        if not wallet.balance:
-            print("No available balance to deduct from.")
+    def __insert_queued_transactions(self) -> None:
+        """Appends the queued transactions to the transactions file, or hands them to the writer"""
+
+        if self.__writer is None:
+            self.transaction_handler._insert_queued_transactions()
             return
-        
-        balance_before = wallet.balance
+        self.__writer.write(self.transaction_handler._transactions)
+        self.transaction_handler._empty_queued_transactions()
+        if self.__group_commit is not None and self.__group_commit.durability == "commit":
+            # the lines must be in the file before it is synced
+            self.__writer.flush()
+
+    def flush(self) -> None:
+        """Waits until the saved transactions are in the transactions file (background_writes)"""
+        if self.__writer is not None:
+            self.__writer.flush()
+
+    def close(self) -> None:
+        """Writes the pending transactions and releases the transactions file, writer thread or database"""
+
+        if self.__writer is not None:
+            self.__writer.close()
+        self.transaction_handler.close()
+        if self.__database is not None:
+            self.__database.close()
+
+    @writing
+    def apply_batch(self, operations: List[tuple]) -> AccountResult:
+        """
+        Applies many operations at once and saves a single time, see WalletBatch
+        for the operations. All of them are checked first: if any of them is
+        not valid, or saving fails, no operation is applied.
+        The errors of the operations not valid are in the result errors
+        """
+
+        result = AccountResult('apply_batch')
+        operations = list(operations)
+        batch = WalletBatch(self.wallets)
+        if not batch.run(operations):
+            result.errors = batch.errors
+            for index, error in batch.errors[:10]:
+                self._say('Operation {}: {}.', index, error)
+            if len(batch.errors) > 10:
+                self._say('... and {} more.', len(batch.errors) - 10)
+            return self._fail(result, 'No operation was applied.')
+
+        previous = {}
+        for name, data in batch.state.items():
+            wallet = self.get_wallet(name)
+            previous[name] = [wallet.balance, wallet.percent, wallet.cap]
+            for attr, value, old_value in zip(('balance', 'percent', 'cap'), data, previous[name]):
+                if value != old_value:
+                    setattr(wallet, attr, value)
+
+        queued = len(self.transaction_handler._transactions)
         date = datetime.strftime(datetime.now(), "%d-%m-%Y %H:%M:%S")
-        if not description:
-            description = "no_description"
+        for name, amount, balance_before, balance_after, description in batch.deductions:
+            self.transaction_handler._queue_transaction(
+                date,
+                name,
+                TransactionType.DEDUCTION.value,
+                amount,
+                balance_before,
+                balance_after,
+                f'"{description}"',
+            )
+
+        try:
+            self.save()
+        except Exception:
+            for name, (balance, percent, cap) in previous.items():
+                wallet = self.get_wallet(name)
+                wallet.balance, wallet.percent, wallet.cap = balance, percent, cap
+            del self.transaction_handler._transactions[queued:]
+            raise
+
+        for name, (balance, _, _) in previous.items():
+            if batch.state[name][0] != balance:
+                result.balance_changed(name, balance, batch.state[name][0])
+        self._say('Applied {} operations.', len(operations))
+        return result
+
+    def deduct(self, name: str, description: str = None, amount: int = None) -> AccountResult:
+        """
+        Deduct the desired amount of money from a wallet
+        """
 
-        if amount is not None:
-            if not self.valid_number(amount) or amount > wallet.balance:
-                print('Error with the amount input, please try again.')
-                return
-            else:
+        with self.__locked_wallets(name):
+            result = AccountResult('deduct')
+            wallet = self.get_wallet(name)
+            if not wallet:
+                return self._fail(result, 'No wallet under that name could be found.')
+
+            if not wallet.balance:
+                return self._fail(result, "No available balance to deduct from.")
+        
+            balance_before = wallet.balance
+            date = datetime.strftime(datetime.now(), "%d-%m-%Y %H:%M:%S")
+            if not description:
+                description = "no_description"
+
+            if amount is not None:
+                if not self.valid_number(amount) or amount > wallet.balance:
+                    return self._fail(result, 'Error with the amount input, please try again.')
                 balance_after = wallet.balance - amount
-                print(f"Wallet balance changed from {wallet.balance} ", end="")
                 wallet.balance -= amount
-                print(f"to {wallet.balance}")
-        else:
-            print(f"Wallet {wallet.name} balance {wallet.balance} set to 0")
-            amount = wallet.balance
-            balance_after = 0
-            wallet.balance = 0
-
-        AccountTransactionHandler._queue_transaction(
-            date,
-            name,
-            TransactionType.DEDUCTION.value,
-            amount,
-            balance_before, 
-            balance_after,
-            f'"{description}"', 
-        )
-
+                self._say("Wallet balance changed from {} to {}", balance_before, wallet.balance)
+            else:
+                self._say("Wallet {} balance {} set to 0", wallet.name, wallet.balance)
+                amount = wallet.balance
+                balance_after = 0
+                wallet.balance = 0
+
+            result.balance_changed(wallet.name, balance_before, balance_after)
+            self.transaction_handler._queue_transaction(
+                date,
+                name,
+                TransactionType.DEDUCTION.value,
+                amount,
+                balance_before, 
+                balance_after,
+                f'"{description}"', 
+            )
+            return result
+
+    @reading
     def percents(self) -> None:
         """Show existing percents of each wallet"""
 
         for wallet in self.wallets:
             if wallet.percent > 0:
-                print(f"{wallet.name}: {wallet.percent}%")
+                self._say("{}: {}%", wallet.name, wallet.percent)
 
     def set_percents(self) -> None:
         """Show current wallets percents and prompts user to set them"""
 
-        print("Showing current wallet percentages")
+        self._say("Showing current wallet percentages")
         for wallet in self.wallets:
-            print(f'Wallet {wallet.name}: {wallet.percent}%')
-        print('')   # newline
+            self._say('Wallet {}: {}%', wallet.name, wallet.percent)
+        self._say('')   # newline
 
         wallets = [wallet.name for wallet in self.wallets]
         wallets_dict = {}
@@ -279,69 +619,77 @@ class Account():
             try:
                 new_percent = int(new_percent)
             except ValueError:
-                print('Not valid number format, please try again.')
+                self._say('Not valid number format, please try again.')
                 return
             else:
                 if self.valid_number(new_percent) and new_percent <= 100 :
                     wallets_dict[wallet] = new_percent
                 else:
-                    print('Not a valid number format, please try again.')
+                    self._say('Not a valid number format, please try again.')
                     return
             
         self.calc_percents(wallets_dict)
 
-    def calc_percents(self, percents: dict) -> None:
+    @writing
+    def calc_percents(self, percents: dict) -> AccountResult:
         """Calculates the main wallet percent and set all percents on wallets"""
         
+        result = AccountResult('calc_percents')
         percents_sum = sum([percent for percent in percents.values()])
-        if percents_sum == 100:
-            for name, percent in percents.items():
-                self.get_wallet(name).percent = percent
-
-            if self.correct_percent():
-                print('Percent values correctly set on wallets.\n')
-            else:
-                print('Unknown error, please try again!\n')
+        if percents_sum != 100:
+            return self._fail(result, 'Percents not correctly set, please try again.\n')
 
-        else:
-            print('Percents not correctly set, please try again.\n')
+        for name, percent in percents.items():
+            self.get_wallet(name).percent = percent
+        if not self.correct_percent():
+            return self._fail(result, 'Unknown error, please try again!\n')
+        self._say('Percent values correctly set on wallets.\n')
+        return result
 
-    def correct_cap(self, wallet: Wallet) -> None:
+    def correct_cap(self, wallet: Wallet, result: AccountResult = None) -> None:
         """
         Checks whether the balance of the wallet surpasses its cap,
-        and if so, perform the necessary adjustments and calculations
+        and if so, perform the necessary adjustments and calculations.
+        The changes are recorded in result if given
         """
 
         if not (main := self.get_wallet('main')):
-            self.add_wallet('main')
+            self.__add_main()
             main = self.get_wallet('main')
-            print('main Wallet created.')
 
         if wallet.cap and wallet.balance > wallet.cap:
             extra_money = wallet.balance - wallet.cap
+            balance_before, main_before = wallet.balance, main.balance
             wallet.balance = wallet.cap
 
             main.balance += extra_money
             wallet.percent = 0
+            if result is not None:
+                result.balance_changed(wallet.name, balance_before, wallet.balance)
+                result.balance_changed(main.name, main_before, main.balance)
+                result.capped.append(wallet.name)
 
-            print(f"Wallet {wallet.name} balance set to {wallet.cap} and transfering {extra_money} to main")
-            print(f'Wallet {wallet.name} with balance of {wallet.balance} surpassed its cap of {wallet.cap} by {extra_money}')
-            print(f"Transfering {main.balance} to main\n")
-        
-    def deposit(self, amount: int) -> None:
+            self._say("Wallet {} balance set to {} and transfering {} to main", wallet.name, wallet.cap, extra_money)
+            self._say('Wallet {} with balance of {} surpassed its cap of {} by {}', wallet.name, wallet.balance, wallet.cap, extra_money)
+            self._say("Transfering {} to main\n", main.balance)
+
+    @writing
+    def deposit(self, amount: int) -> AccountResult:
         """
         Deposits money and distributes it among all wallets
         according to their percent data attribute
         all percent values must add up to 100
         """
 
+        result = AccountResult('deposit')
         if not self.valid_number(amount):
-            print('Not a valid number format.')
-            return
+            return self._fail(result, 'Not a valid number format.')
+
+        if len(self.wallets) >= self.deposit_engine_threshold and self.get_wallet('main'):
+            return self.__deposit_many(amount, result)
 
         if not self.correct_percent():
-            print('Percent values among wallets do not add up to 100, please set them and try again.')
-            return
+            return self._fail(result, 'Percent values among wallets do not add up to 100, please set them and try again.')
         
         # calculate the respective amount of money to all wallets except main
         wallets_part = {}
@@ -354,49 +702,80 @@ class Account():
         # transfer the calculated money to each wallet
         for name, part_money in wallets_part.items():
             wallet = self.get_wallet(name)
-            print(f'Depositing {part_money} to {name} (${wallet.balance}). ', end="")
+            balance_before = wallet.balance
             wallet.balance += part_money
-            print(f"Now ${wallet.balance}")
+            result.balance_changed(name, balance_before, wallet.balance)
+            self._say('Depositing {} to {} (${}). Now ${}', part_money, name, balance_before, wallet.balance)
             amount -= part_money
-            self.correct_cap(wallet)
+            self.correct_cap(wallet, result)
 
         # transfer the remaining amount of money to main
         main = self.get_wallet('main')
-        print(f'Depositing {amount} to main (${main.balance}). ', end="")
+        main_before = main.balance
         main += amount
-        print(f"Now ${main.balance}\n")
+        result.balance_changed(main.name, main_before, main.balance)
+        self._say('Depositing {} to main (${}). Now ${}\n', amount, main_before, main.balance)
+        return result
 
+    def __deposit_many(self, amount: int, result: AccountResult) -> AccountResult:
+        """
+        deposit for large numbers of wallets, see DepositEngine.
+        The result only has the balance of main and the capped wallets
+        """
+
+        if self.__deposit_engine is None:
+            # imported when needed, it loads numpy
+            from DepositEngine import DepositEngine
+            self.__deposit_engine = DepositEngine(self.wallets)
+        if self.__deposit_engine.percent_total() != 100:
+            return self._fail(result, 'Percent values among wallets do not add up to 100, please set them and try again.')
+
+        main = self.get_wallet('main')
+        main_before = main.balance
+        deposit = self.__deposit_engine.deposit(amount)
+        result.balance_changed(main.name, main_before, main.balance)
+        result.capped = deposit.capped
+        self._say('Depositing {} among {} wallets.', amount - deposit.to_main, deposit.deposited)
+        if deposit.capped:
+            self._say('{} wallets reached their cap, their percent is now 0.', len(deposit.capped))
+        self._say('Depositing {} to main (${}). Now ${}\n', deposit.to_main, main_before, main.balance)
+        return result
+
+    @reading
     def check_wallets(self) -> None:
         """Show all information of all wallets"""
         
         for wallet in self.wallets:
-            print(f'Name: {wallet.name}')
-            print(f'Balance: ${wallet.balance}')
-            print(f'Percent: {wallet.percent}%')
-            print(f'Cap: ${wallet.cap}')
+            self._say('Name: {}', wallet.name)
+            self._say('Balance: ${}', wallet.balance)
+            self._say('Percent: {}%', wallet.percent)
+            self._say('Cap: ${}', wallet.cap)
             
             if wallet.cap:
-                print(f"${(wallet.cap - wallet.balance)} more to reach the cap\n")
+                self._say("${} more to reach the cap\n", wallet.cap - wallet.balance)
             else:
-                print("No cap limit\n")
+                self._say("No cap limit\n")
 
-    def add(self, name: str, amount: int) -> None:
+    def add(self, name: str, amount: int) -> AccountResult:
         """Adds an amount of money to a wallet"""
-        
-        wallet = self.get_wallet(name)
-        if not wallet:
-            print(f'Wallet {name} could not be found.')
-            return
-        else:
-            if self.valid_number(amount):
-                print(f"Wallet {wallet.name} from {wallet.balance} ", end="")
-                wallet += amount
-                print(f"to {wallet.balance}")
-                self.correct_cap(wallet)
-            else:
-                print('Not a valid number format.')
 
-    def edit(self, wallet_name: str, name: str, balance: int, percent: int, cap: int) -> None:
+        with self.__locked_wallets(name, capped=(name,)):
+            result = AccountResult('add')
+            wallet = self.get_wallet(name)
+            if not wallet:
+                return self._fail(result, 'Wallet {} could not be found.', name)
+            if not self.valid_number(amount):
+                return self._fail(result, 'Not a valid number format.')
+
+            balance_before = wallet.balance
+            wallet += amount
+            result.balance_changed(wallet.name, balance_before, wallet.balance)
+            self._say("Wallet {} from {} to {}", wallet.name, balance_before, wallet.balance)
+            self.correct_cap(wallet, result)
+            return result
+
+    @writing
+    def edit(self, wallet_name: str, name: str, balance: int, percent: int, cap: int) -> AccountResult:
         """
         edit an existing wallet
         
@@ -406,39 +785,80 @@ class Account():
             - balance, percent, cap (int): respective values
         """
 
+        result = AccountResult('edit')
         if wallet_name == 'main':
-            print("Can't edit main.")
-            return
+            return self._fail(result, "Can't edit main.")
             
-        if current_wallet := self.get_wallet(wallet_name):
-            invalid_names = [wallet.name for wallet in self.wallets if wallet.name != current_wallet.name]
-            if name not in invalid_names and self.valid_number(balance, percent, cap):
-                current_wallet.name = name
-                current_wallet.balance = balance
-                current_wallet.percent = percent
-                current_wallet.cap = cap
-                self.show(current_wallet.name)
-        else:
-            print(f"Wallet {wallet_name} couldn't be found.")
-
+        if not (current_wallet := self.get_wallet(wallet_name)):
+            return self._fail(result, "Wallet {} couldn't be found.", wallet_name)
+
+        name_taken = name != current_wallet.name and self.wallets.get(name) is not None
+        if name_taken or not self.valid_number(balance, percent, cap):
+            result.error = 'Bad input, please try again.'
+            return result
+        balance_before = current_wallet.balance
+        self.wallets.rename_wallet(current_wallet, name)
+        current_wallet.balance = balance
+        current_wallet.percent = percent
+        current_wallet.cap = cap
+        if balance != balance_before:
+            result.balance_changed(name, balance_before, balance)
+        self.show(current_wallet.name)
+        return result
+
+    @reading
     def usable(self) -> str:
         """
         Returns the total amount of money you may use 
         (the money not in savings wallets)
         """
 
-        usable_money = sum([wallet.balance for wallet in self.wallets if wallet.name not in self.savings_wallets])
+        usable_money = self.wallets.total() - self.wallets.group_total('wallet_type', 'savings')
         return f'${usable_money}'
 
+    @reading
     def non_usable(self) -> str:
         """
         Returns the total amount of money you should NOT use 
         (the money in savings wallets)
         """
 
-        non_usable_money = sum([wallet.balance for wallet in self.wallets if wallet.name in self.savings_wallets])
+        non_usable_money = self.wallets.group_total('wallet_type', 'savings')
         return f'${non_usable_money}'
 
+    @reading
+    def total_type(self, wallet_type: str) -> str:
+        """Returns the sum of the balance of all wallets of a type"""
+
+        if wallet_type not in Wallet.types:
+            self._say('Wallet type {} is not one of {}.', wallet_type, ', '.join(Wallet.types))
+            return None
+        return f"${self.wallets.group_total('wallet_type', wallet_type)}"
+
+    @reading
+    def total_location(self, location: str) -> str:
+        """Returns the sum of the balance of all wallets in a location"""
+
+        totals = self.wallets.group_totals('location')
+        if location not in totals:
+            self._say('There are no wallets in {}.', location)
+            return None
+        return f"${totals[location]}"
+
+    @reading
+    def show_by_type(self) -> None:
+        """Prints the wallets of each type with the total of the type"""
+
+        # the lists of wallets are only built when there's an output to show them
+        if self.output is None:
+            return
+        totals = self.wallets.group_totals('wallet_type')
+        for wallet_type in Wallet.types:
+            if wallet_type in totals:
+                wallets = self.wallets.group('wallet_type', wallet_type)
+                self._say("{} (${}): {}", wallet_type, totals[wallet_type], ', '.join(map(repr, wallets)))
+
+    @reading
     def total_on(self, *names: Tuple[str]) -> str:
         """
         Returns the sum of the balance of all specified wallets
@@ -451,144 +871,211 @@ class Account():
             if wallet := self.get_wallet(name):
                 total += wallet.balance
             else:
-                print(f"Wallet {name} couldn't be found. Please try again.")
+                self._say("Wallet {} couldn't be found. Please try again.", name)
                 return
         
         return f"${total}" if total else None
 
+    @reading
     def summary(self) -> None:
         """Prints all relevant information about your account"""
 
-        print(f'Total amount of money {self.total()}')
-        print(f'Total usable money {self.usable()}')
-        print(f'Total non-usable of money {self.non_usable()}\n')
+        self._say('Total amount of money {}', self.total())
+        self._say('Total usable money {}', self.usable())
+        self._say('Total non-usable of money {}\n', self.non_usable())
         self.check_wallets()
 
+    @reading
     def show(self, name: str):
         """Show all properties of a wallet given its name"""
         
         if wallet := self.get_wallet(name):
-            print(f"Name: {wallet.name}")
-            print(f"balance: {wallet.balance}")
-            print(f"percent: {wallet.percent}")
-            print(f"cap: {wallet.cap}\n")
+            self._say("Name: {}", wallet.name)
+            self._say("balance: {}", wallet.balance)
+            self._say("percent: {}", wallet.percent)
+            self._say("cap: {}\n", wallet.cap)
         else:
-            print(f"Wallet {name} doesn't exist!")
+            self._say("Wallet {} doesn't exist!", name)
 
-    @staticmethod
-    def show_queued_transactions() -> None:
+    def show_queued_transactions(self) -> None:
         """Show all queued transactions."""
-        AccountTransactionHandler._show_queued_transactions()
+        self.transaction_handler._show_queued_transactions()
 
-    def rename(self, wallet_name: str, new_name: str) -> None:
+    @writing
+    def rename(self, wallet_name: str, new_name: str) -> AccountResult:
         """Renames a wallet"""
 
+        result = AccountResult('rename')
         if wallet_name == 'main':
-            print("Can't rename the main wallet.")
-            return
+            return self._fail(result, "Can't rename the main wallet.")
         
         if (wallet := self.get_wallet(wallet_name)) and not self.get_wallet(new_name):
-            print(f"Wallet {wallet.name} changed to {new_name}")
-            wallet.name = new_name
-        else:
-            print(f"Error with wallet names, please try again!")
-
-    def reset(self) -> None:
+            self._say("Wallet {} changed to {}", wallet.name, new_name)
+            self.wallets.rename_wallet(wallet, new_name)
+            return result
+        return self._fail(result, "Error with wallet names, please try again!")
+
+    @writing
+    def set_type(self, name: str, wallet_type: str) -> AccountResult:
+        """Changes the type of a wallet, one of Wallet.types"""
+
+        result = AccountResult('set_type')
+        if wallet_type not in Wallet.types:
+            return self._fail(result, 'Wallet type {} is not one of {}.', wallet_type, ', '.join(Wallet.types))
+        if not (wallet := self.get_wallet(name)):
+            return self._fail(result, 'Wallet not found!')
+
+        self._say("Wallet {} type {} changed to {}", name, wallet.wallet_type, wallet_type)
+        wallet.wallet_type = wallet_type
+        return result
+
+    @writing
+    def set_location(self, name: str, location: str) -> AccountResult:
+        """Changes where the money of a wallet is"""
+
+        result = AccountResult('set_location')
+        if not (wallet := self.get_wallet(name)):
+            return self._fail(result, 'Wallet not found!')
+
+        self._say("Wallet {} location {} changed to {}", name, wallet.location or 'none', location)
+        wallet.location = location
+        return result
+
+    @writing
+    def reset(self) -> AccountResult:
         """Resets the account to the previous saved state"""
 
         self.wallets.clear()
-        with open(self.__wallet_name) as file:
-            json_content = file.read()
+        wallets = self.__read_saved_wallets() or []
+        self.wallets.extend_data(wallets)
+        self.wallets.mark_saved()
 
-        wallets: List = json.loads(json_content)
-        for wallet_dict in wallets:
-            wallet = Wallet(**wallet_dict)
-            self.wallets.append(wallet)
+        self.transaction_handler._empty_queued_transactions()
+        self._say("Account has been reset.")
+        return AccountResult('reset')
 
-        AccountTransactionHandler._empty_queued_transactions()
-        print("Account has been reset.")
-
-    def set_cap(self, name: str, cap: int) -> None:
+    def set_cap(self, name: str, cap: int) -> AccountResult:
         """Set the cap attribute of a wallet given its name"""
 
-        if not self.valid_number(cap):
-            print('Not a valid cap value, please try again.')
-            return
+        with self.__locked_wallets(name, 'main'):
+            result = AccountResult('set_cap')
+            if not self.valid_number(cap):
+                return self._fail(result, 'Not a valid cap value, please try again.')
 
-        if name == 'main':
-            print("You can't do this operation on the main wallet.")
-            return
+            if name == 'main':
+                return self._fail(result, "You can't do this operation on the main wallet.")
 
-        if wallet := self.get_wallet(name):
-            print(f"Wallet {name} cap of {wallet.cap} changed to {cap}")
+            if not (wallet := self.get_wallet(name)):
+                return self._fail(result, 'Wallet not found!')
+
+            self._say("Wallet {} cap of {} changed to {}", name, wallet.cap, cap)
             wallet.cap = cap
-            self.correct_cap(wallet)
-        else:
-            print('Wallet not found!')
+            self.correct_cap(wallet, result)
+            return result
 
-    def merge(self, wallet_one_name: str, wallet_two_name: str) -> None:
+    @writing
+    def merge(self, wallet_one_name: str, wallet_two_name: str) -> AccountResult:
         """Combine wallet two into wallet one if both exist"""
 
+        result = AccountResult('merge')
         wallet_one = self.get_wallet(wallet_one_name)
         wallet_two = self.get_wallet(wallet_two_name)
 
         if not wallet_one or not wallet_two:
-            print("Invalid operation. One or both of the wallets couldn't be found.")
-            return
+            return self._fail(result, "Invalid operation. One or both of the wallets couldn't be found.")
 
-        print(f"Combining percent of {wallet_one.percent} to {wallet_two.percent}, now ", end="")
+        percent_one, percent_two = wallet_one.percent, wallet_two.percent
         wallet_one.percent += wallet_two.percent
-        print(wallet_one.percent)
+        self._say("Combining percent of {} to {}, now {}", percent_one, percent_two, wallet_one.percent)
 
-        print(f"Combining cap of {wallet_one.cap} to {wallet_two.cap}, now ", end="")
-        self.set_cap(wallet_one_name, wallet_one.cap + wallet_two.cap)
-        print(wallet_one.cap)
+        cap_one, cap_two = wallet_one.cap, wallet_two.cap
+        cap = self.set_cap(wallet_one_name, wallet_one.cap + wallet_two.cap)
+        self._say("Combining cap of {} to {}, now {}", cap_one, cap_two, wallet_one.cap)
 
-        print(f"Combining balance of {wallet_one.balance} to {wallet_two.balance}, now ", end="")
-        self.transfer(wallet_two_name, wallet_one_name)
-        print(wallet_one.balance)
+        balance_one, balance_two = wallet_one.balance, wallet_two.balance
+        transfer = self.transfer(wallet_two_name, wallet_one_name)
+        self._say("Combining balance of {} to {}, now {}", balance_one, balance_two, wallet_one.balance)
 
+        for name, (before, after) in list(cap.balances.items()) + list(transfer.balances.items()):
+            result.balance_changed(name, before, after)
+        result.capped = cap.capped
         self.delete_wallet(wallet_two_name)
-        
-    def clear_all(self) -> None:
+        return result
+
+    @writing
+    def clear_all(self) -> AccountResult:
         """Sets all wallets data to zero"""
+
+        result = AccountResult('clear_all')
         for wallet in self.wallets:
+            if wallet.balance:
+                result.balance_changed(wallet.name, wallet.balance, 0)
             wallet.percent = wallet.balance = wallet.cap = 0
-        print("All wallet values set to zero (0)")
+        self._say("All wallet values set to zero (0)")
+        return result
 
-    def clear(self, name: str) -> None:
+    @writing
+    def clear(self, name: str) -> AccountResult:
         """Set all data of a given wallet to zero"""
         
-        if wallet := self.get_wallet(name):
-            wallet.balance = wallet.percent = wallet.cap = 0
-            print(f"Wallet {wallet.name} values set to zero (0).")
-        else:
-            print(f"Wallet {name} doesn't exist!")
-
-    def wipe(self) -> None:
+        result = AccountResult('clear')
+        if not (wallet := self.get_wallet(name)):
+            return self._fail(result, "Wallet {} doesn't exist!", name)
+        if wallet.balance:
+            result.balance_changed(wallet.name, wallet.balance, 0)
+        wallet.balance = wallet.percent = wallet.cap = 0
+        self._say("Wallet {} values set to zero (0).", wallet.name)
+        return result
+
+    @writing
+    def wipe(self) -> AccountResult:
         """Deletes all wallet data in your account"""
         self.wallets.clear()
-        print('All wallet data has been deleted.')
+        self._say('All wallet data has been deleted.')
+        return AccountResult('wipe')
 
     def help(self):
         """Prints info about the class methods"""
         return help(self)
     
-    def backup(self):
+    @reading
+    def backup(self) -> AccountResult:
         """Creates a backup of the current state of the account"""
+
+        result = AccountResult('backup')
+        if self.__storage == "sqlite":
+            return self.__backup_database(result)
+        self.flush()
         wallet_exists = os.path.exists(self.__wallet_name)
         transactions_exists = os.path.exists(self.__transactions_name)
         if not wallet_exists or not transactions_exists:
-            print(f"Error. One of the files {self.__wallet_name} or {self.__transactions_name} was not found.")
-            return
+            return self._fail(
+                result, "Error. One of the files {} or {} was not found.", self.__wallet_name, self.__transactions_name
+            )
         if not os.path.exists("backup"):
             os.mkdir("backup")
 
         backup_wallet_name = self.__wallet_name.replace(".json", "_backup.json")
         backup_transactions_name = self.__transactions_name.replace(".csv", "_backup.csv")
+        import shutil
         shutil.copy(self.__wallet_name, os.path.join("backup", backup_wallet_name))
         shutil.copy(self.__transactions_name, os.path.join("backup", backup_transactions_name))
-        print(f"Backup of {self.__wallet_name} and {self.__transactions_name} created at ./backup/")
+        self._say("Backup of {} and {} created at ./backup/", self.__wallet_name, self.__transactions_name)
+        return result
+
+    def __backup_database(self, result: AccountResult) -> AccountResult:
+        """Backs up a SQLite account, wallets and transactions are both in the database"""
+
+        if not os.path.exists(self.__wallet_name):
+            return self._fail(result, "Error. The database {} was not found.", self.__wallet_name)
+        if not os.path.exists("backup"):
+            os.mkdir("backup")
+        if self.__database is None:
+            self.__database = self.__open_database(readonly=True)
+        root, extension = os.path.splitext(self.__wallet_name)
+        self.__database.backup(os.path.join("backup", f"{root}_backup{extension}"))
+        self._say("Backup of {} created at ./backup/", self.__wallet_name)
+        return result
 
     def __repr__(self) -> str:
         return f'Account: {[wallet.name for wallet in self.wallets]}'
@@ -0,0 +1,147 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Iterable, List
+import threading
+
+
+class ReadWriteLock:
+    """
+    Lock that many readers can hold at the same time, or a single writer.
+    Waiting writers go before new readers, so writes are not starved.
+
+    Both sides are reentrant, and the writer may also read, but a reader
+    can't become the writer: that raises RuntimeError instead of deadlocking
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    @contextmanager
+    def reading(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def writing(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+    def acquire_read(self) -> None:
+        depth = getattr(self._local, "reads", 0)
+        if depth or self._writer == threading.get_ident():
+            self._local.reads = depth + 1
+            return
+        with self._condition:
+            while self._writer is not None or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        self._local.reads = 1
+
+    def release_read(self) -> None:
+        self._local.reads -= 1
+        if self._local.reads or self._writer == threading.get_ident():
+            return
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        me = threading.get_ident()
+        if self._writer == me:
+            self._writer_depth += 1
+            return
+        if getattr(self._local, "reads", 0):
+            raise RuntimeError("A thread reading can't start writing")
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self) -> None:
+        self._writer_depth -= 1
+        if self._writer_depth:
+            return
+        with self._condition:
+            self._writer = None
+            self._condition.notify_all()
+
+
+class AccountLocks:
+    """
+    Locks of a thread safe Account.
+
+    structure is read locked by the operations that only read, or that
+    change single wallets, and write locked by the ones that change the
+    wallet list or many wallets at once. Single wallet changes also hold
+    the lock of each wallet they touch, always taken in name order so two
+    operations can't wait for each other.
+    """
+
+    def __init__(self):
+        self.structure = ReadWriteLock()
+        self._wallets: Dict[str, threading.RLock] = {}
+        self._guard = threading.Lock()
+
+    @contextmanager
+    def holding(self, names: Iterable[str]):
+        """Holds the locks of the wallets with the given names"""
+
+        locks = self.acquire(names)
+        try:
+            yield
+        finally:
+            self.release(locks)
+
+    def acquire(self, names: Iterable[str]) -> List[threading.RLock]:
+        """Takes the locks of the wallets with the given names, in name order. Returns them to release"""
+
+        with self._guard:
+            locks = [self._wallets.setdefault(name, threading.RLock()) for name in sorted(set(names))]
+        for lock in locks:
+            lock.acquire()
+        return locks
+
+    @staticmethod
+    def release(locks: List[threading.RLock]) -> None:
+        for lock in reversed(locks):
+            lock.release()
+
+
+def reading(method):
+    """Runs the Account method with the structure read locked, if the account is thread safe"""
+
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        if self._locks is None:
+            return method(self, *args, **kwargs)
+        with self._locks.structure.reading():
+            return method(self, *args, **kwargs)
+    return locked
+
+
+def writing(method):
+    """Runs the Account method with the structure write locked, if the account is thread safe"""
+
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        if self._locks is None:
+            return method(self, *args, **kwargs)
+        with self._locks.structure.writing():
+            return method(self, *args, **kwargs)
+    return locked
@@ -0,0 +1,203 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Callable, Dict, NamedTuple, Optional
+import os
+import threading
+from Account import Account
+
+
+class CacheStats(NamedTuple):
+    """Counters of an AccountManager cache"""
+
+    hits: int
+    misses: int
+    evictions: int
+    accounts: int
+    wallets: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of get() calls served from the cache, 0 before any call"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class AccountManager:
+    """
+    Serves many accounts from one process. An account is loaded the first
+    time it's asked for, and kept in an LRU cache so the next requests
+    don't read its files again.
+
+    The cache holds at most max_accounts accounts and, if max_wallets is
+    given, at most that many wallets among all of them, as a measure of the
+    memory they take. Past either limit the least recently used accounts
+    are evicted; the ones with unsaved changes or queued transactions are
+    saved first, then closed. The account just asked for is never evicted.
+
+    account_options are passed to every Account, with output=None unless
+    given, so the accounts are quiet. transactions_name (optional) returns
+    the name of the transactions file of a wallets file; by default it's
+    the wallets file name with _transactions.csv instead of its extension,
+    so every account keeps its own transactions (see
+    default_transactions_name).
+
+    get() is safe to call from many threads, and loading an account
+    doesn't hold up the requests for the others. An account used by many
+    threads at once also needs thread_safe=True, and references to it
+    shouldn't be kept after the request: it may be evicted and closed.
+    """
+
+    def __init__(
+        self,
+        max_accounts: int = 256,
+        max_wallets: int = None,
+        transactions_name: Optional[Callable[[str], str]] = None,
+        **account_options,
+    ):
+        if max_accounts < 1:
+            raise ValueError("max_accounts must be at least 1")
+        self.max_accounts = max_accounts
+        self.max_wallets = max_wallets
+        self.transactions_name = transactions_name or self.default_transactions_name
+        self.account_options = {"output": None, **account_options}
+        self._accounts: OrderedDict[str, Account] = OrderedDict()
+        # guards the cache and the counters, accounts load under their own lock in _loading
+        self._lock = threading.RLock()
+        self._loading: Dict[str, threading.Lock] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, wallet_name: str) -> Account:
+        """Returns the account of the wallets file, loading it if it's not cached"""
+
+        with self._lock:
+            account = self._cached(wallet_name)
+            if account is not None:
+                return account
+            loading = self._loading.setdefault(wallet_name, threading.Lock())
+
+        # the account is read without holding the cache, so other accounts
+        # are served meanwhile. Other gets of this one wait for it
+        with loading:
+            with self._lock:
+                account = self._cached(wallet_name)
+                if account is not None:
+                    return account
+                self._misses += 1
+            try:
+                account = self._load(wallet_name)
+            except BaseException:
+                with self._lock:
+                    self._done_loading(wallet_name, loading)
+                raise
+            with self._lock:
+                self._done_loading(wallet_name, loading)
+                # after a failed load, the gets waiting for it and the new ones may both load it
+                if wallet_name in self._accounts:
+                    account.close()
+                    return self._cached(wallet_name)
+                self._accounts[wallet_name] = account
+                self._evict()
+                return account
+
+    def __getitem__(self, wallet_name: str) -> Account:
+        return self.get(wallet_name)
+
+    def __contains__(self, wallet_name: str) -> bool:
+        return wallet_name in self._accounts
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    def evict(self, wallet_name: str) -> bool:
+        """Saves if needed and drops an account from the cache. Returns False if it wasn't cached"""
+
+        with self._lock:
+            account = self._accounts.pop(wallet_name, None)
+            if account is None:
+                return False
+            self._release(wallet_name, account)
+            return True
+
+    def save_all(self) -> int:
+        """Saves the cached accounts that have changes, returns how many were saved"""
+
+        with self._lock:
+            dirty = [account for account in self._accounts.values() if self.is_dirty(account)]
+            for account in dirty:
+                account.save()
+            return len(dirty)
+
+    def close(self) -> None:
+        """Saves the accounts that have changes and empties the cache"""
+
+        with self._lock:
+            while self._accounts:
+                self.evict(next(iter(self._accounts)))
+
+    def stats(self) -> CacheStats:
+        """Returns the counters of the cache, see CacheStats"""
+
+        with self._lock:
+            return CacheStats(
+                self._hits,
+                self._misses,
+                self._evictions,
+                len(self._accounts),
+                self._wallet_count(),
+            )
+
+    @staticmethod
+    def is_dirty(account: Account) -> bool:
+        """Returns True if the account has changes or transactions not saved yet"""
+        return account.wallets.has_changes() or bool(account.transaction_handler._transactions)
+
+    @staticmethod
+    def default_transactions_name(wallet_name: str) -> str:
+        """Transactions file of a wallets file: alice.json -> alice_transactions.csv"""
+        return f"{os.path.splitext(wallet_name)[0]}_transactions.csv"
+
+    def _cached(self, wallet_name: str) -> Optional[Account]:
+        """Returns the cached account as the most recently used one, counting the hit"""
+
+        account = self._accounts.get(wallet_name)
+        if account is not None:
+            self._hits += 1
+            self._accounts.move_to_end(wallet_name)
+        return account
+
+    def _done_loading(self, wallet_name: str, loading: threading.Lock) -> None:
+        if self._loading.get(wallet_name) is loading:
+            del self._loading[wallet_name]
+
+    def _load(self, wallet_name: str) -> Account:
+        options = dict(self.account_options)
+        options["transactions_name"] = self.transactions_name(wallet_name)
+        return Account(wallet_name, **options)
+
+    def _wallet_count(self) -> int:
+        return sum(len(account) for account in self._accounts.values())
+
+    def _evict(self) -> None:
+        """Evicts the least recently used accounts until the cache is within its limits"""
+
+        while len(self._accounts) > 1 and (
+            len(self._accounts) > self.max_accounts
+            or (self.max_wallets is not None and self._wallet_count() > self.max_wallets)
+        ):
+            wallet_name, account = self._accounts.popitem(last=False)
+            self._release(wallet_name, account)
+            self._evictions += 1
+
+    def _release(self, wallet_name: str, account: Account) -> None:
+        """Saves the account if it's dirty and closes it. If saving fails it stays cached"""
+
+        try:
+            if self.is_dirty(account):
+                account.save()
+        except Exception:
+            self._accounts[wallet_name] = account
+            self._accounts.move_to_end(wallet_name, last=False)
+            raise
+        account.close()
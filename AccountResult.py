@@ -0,0 +1,38 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class AccountResult:
+    """
+    What an Account operation did. It is falsy when the operation could
+    not be done, error then has the reason
+    """
+
+    operation: str
+    error: Optional[str] = None
+    # wallet name -> (balance before, balance after) of the balances that changed
+    balances: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    # wallets that reached their cap, their extra money went to main
+    capped: List[str] = field(default_factory=list)
+    # errors of the single operations of a batch, as (index, message)
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+    def balance_changed(self, name: str, before: int, after: int) -> None:
+        """Records a balance change, keeping the first balance before of the wallet"""
+
+        if name in self.balances:
+            before = self.balances[name][0]
+        self.balances[name] = (before, after)
+
+
+def console(message: str) -> None:
+    """Default message sink of Account, prints the messages"""
+    print(message)
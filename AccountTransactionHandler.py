@@ -1,3 +1,5 @@
+from typing import List, Optional, TextIO
+from TransactionSummary import TransactionSummary
 import os
 
 class AccountTransactionHandler:
@@ -5,20 +7,32 @@ class AccountTransactionHandler:
     Handles all the logic about initializing and saving transaction entries
     from Account transaction type movements
 
-    This class is never instantiated, and all its methods are classmethods,
-    so its methods are called directly from the class
+    Each Account owns its handler, with its own queue of transactions for
+    its transactions file, so saving an account never writes the queued
+    transactions of another one. The file is kept open for appending
+    between saves, and opened again if it's replaced or removed meanwhile.
+    The rows it appends are also added to the summary of the file if it's
+    loaded, which is written when the handler is closed (see
+    TransactionSummary)
 
     You should never have to touch and call this class directly, it's made only
     for use within the Account class internal functionalities
     """
 
-    # class attributes
-    _transactions = []
     headers = "date,wallet,transaction_type,amount,description,balance_before,balance_after\n"
 
-    @classmethod
+    def __init__(self, transactions_filename: str):
+        """
+        args:
+            transactions_filename(str): name of the transactions file
+        """
+        self.transactions_filename = transactions_filename
+        self._transactions: List[str] = []
+        self._file: Optional[TextIO] = None
+        self.summary = TransactionSummary(transactions_filename)
+
     def _queue_transaction(
-        cls, 
+        self,
         date: str,
         wallet: str,
         transaction_type: str,
@@ -31,7 +45,7 @@ class AccountTransactionHandler:
         Queue a transaction entry into the list
 
         args:
-            date(str): dd-mm-yyyy hh:mm:ss 
+            date(str): dd-mm-yyyy hh:mm:ss
             wallet(str): name of the wallet
             transaction_type(str): TransactionType type value
             amount(int): amount of money for transaction type
@@ -42,33 +56,37 @@ class AccountTransactionHandler:
         returns: None
         """
         entry = f"{date},{wallet},{transaction_type},{amount},{description},{balance_before},{balance_after}\n"
-        cls._transactions.append(entry)
+        self._transactions.append(entry)
 
 
-    @classmethod
-    def _insert_queued_transactions(cls, transactions_filename: str) -> bool:
+    def _insert_queued_transactions(self) -> bool:
         """
         Put all the transaction entries in queue in the transactions file
 
-        args:
-            transactions_filename(str): name of the transaction file
-
         returns:
             bool: True if the file is found and process completes without errors
                   False if the transctions file is not found
         """
-        if not os.path.exists(transactions_filename):
-            print(f"Error. File {transactions_filename} was not found.")
+        try:
+            file_stat = os.stat(self.transactions_filename)
+        except FileNotFoundError:
+            self._close_file()
+            print(f"Error. File {self.transactions_filename} was not found.")
             return False
-        with open(transactions_filename, "a") as file:
-            for transaction in cls._transactions:
-                file.write(transaction)
-        cls._transactions.clear()
+        if self._file is not None and os.fstat(self._file.fileno()).st_ino != file_stat.st_ino:
+            # the file was replaced since it was opened
+            self._close_file()
+        if self._file is None:
+            self._file = open(self.transactions_filename, "a")
+        self._file.writelines(self._transactions)
+        self._file.flush()
+        if self._transactions:
+            self.summary.add(self._transactions, file_stat.st_size, os.fstat(self._file.fileno()).st_size)
+        self._transactions.clear()
         return True
-            
 
-    @classmethod
-    def _show_queued_transactions(cls) -> bool:
+
+    def _show_queued_transactions(self) -> bool:
         """
         Shows the queued transactions
 
@@ -78,40 +96,51 @@ class AccountTransactionHandler:
             True if there are queued transactions to show
             False if there are none
         """
-        if cls._transactions:
-            for transaction in cls._transactions:
+        if self._transactions:
+            for transaction in self._transactions:
                 print(transaction)
             return True
         else:
             print("There are no transactions in queue.")
             return False
-        
-    
-    @classmethod
-    def _empty_queued_transactions(cls) -> None:
+
+
+    def _empty_queued_transactions(self) -> None:
         """
         Empty all the queued transactions in the list
         """
-        cls._transactions.clear()
-        
+        self._transactions.clear()
+
 
-    @classmethod
-    def _init_transactions_file(cls, transaction_filename: str) -> bool:
+    def _init_transactions_file(self) -> bool:
         """
         Make sure to create the transactions.csv file with its proper headers
         if it doesn't exist yet
 
-        args:
-            transactions_filename(str): name of the transaction file
-        
         returns:
             True if it didn't exist and was successfully created
             False if the transaction file already exists
         """
 
-        if os.path.exists(transaction_filename):
+        if os.path.exists(self.transactions_filename):
             return False
         else:
-            with open(transaction_filename, "w") as file:
-                file.write(cls.headers)
+            with open(self.transactions_filename, "w") as file:
+                file.write(self.headers)
             return True
+
+    def close(self) -> None:
+        """
+        Closes the transactions file, it's opened again by the next insert,
+        and writes the summary if rows were added to it
+        """
+        self._close_file()
+        self.summary.save()
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __del__(self):
+        self._close_file()
@@ -0,0 +1,266 @@
+from __future__ import annotations
+from typing import Dict, Iterable, Iterator, List, Tuple
+from Transaction import Transaction
+from TransactionDate import DATE_FORMAT, date_from_key, date_key, parse_date
+import csv
+import json
+import os
+import struct
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class BinaryTransactionLog:
+    """
+    Transactions log in a compact binary format, an alternative to the
+    transactions csv file. It is made of three files:
+
+        <filename>: one fixed width record per transaction (see RECORD)
+        <filename>.heap: the utf-8 descriptions one after the other
+        <filename>.names: JSON with the csv headers, and the wallet and
+                          transaction type names the records refer to by id
+
+    Records need no parsing: read them with struct/memoryview (records)
+    or as a numpy structured array (array). They take 42 bytes, so dates
+    go from 1970 to 2106 and the descriptions heap up to 4 GiB.
+    """
+
+    # date (seconds since the epoch, see TransactionDate.date_key), wallet id,
+    # transaction type id and flags (id << 1 | flags), amount, balance before,
+    # balance after, description offset in the heap, description length
+    RECORD = struct.Struct("<IIHqqqII")
+    QUOTED_DESCRIPTION = 1
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.heap_filename = f"{filename}.heap"
+        self.names_filename = f"{filename}.names"
+        self.headers = "date,wallet,transaction_type,amount,description,balance_before,balance_after\n"
+        self.wallet_names: List[str] = []
+        self.type_names: List[str] = []
+        if os.path.exists(self.names_filename):
+            with open(self.names_filename) as file:
+                names = json.load(file)
+            self.headers = names["headers"]
+            self.wallet_names = names["wallets"]
+            self.type_names = names["types"]
+        self._wallet_ids = {name: number for number, name in enumerate(self.wallet_names)}
+        self._type_ids = {name: number for number, name in enumerate(self.type_names)}
+
+    def __len__(self) -> int:
+        if not os.path.exists(self.filename):
+            return 0
+        return os.path.getsize(self.filename) // self.RECORD.size
+
+    def append(self, transactions: Iterable[Transaction], quoted: Iterable[bool] = None) -> None:
+        """
+        Appends transactions at the end of the log
+
+        args:
+            transactions: Transaction objects to append
+            quoted (Optional): for each transaction, whether its description
+                               is quoted in the csv file. Not quoted by default
+        """
+
+        transactions = list(transactions)
+        quoted = list(quoted) if quoted is not None else [False] * len(transactions)
+        heap_offset = os.path.getsize(self.heap_filename) if os.path.exists(self.heap_filename) else 0
+        records = bytearray()
+        heap = bytearray()
+        for transaction, is_quoted in zip(transactions, quoted):
+            description = transaction.description.encode()
+            type_id = self._id(self._type_ids, self.type_names, transaction.transaction_type)
+            try:
+                records += self.RECORD.pack(
+                    date_key(transaction.date),
+                    self._id(self._wallet_ids, self.wallet_names, transaction.wallet),
+                    type_id << 1 | (self.QUOTED_DESCRIPTION if is_quoted else 0),
+                    transaction.amount,
+                    transaction.balance_before,
+                    transaction.balance_after,
+                    heap_offset + len(heap),
+                    len(description),
+                )
+            except struct.error as error:
+                raise ValueError(f"Transaction of {transaction.date} doesn't fit in a record: {error}")
+            heap += description
+
+        # names first: records must never refer to ids that are not saved
+        self._save_names()
+        with open(self.heap_filename, "ab") as file:
+            file.write(heap)
+        with open(self.filename, "ab") as file:
+            file.write(records)
+
+    def records(self) -> Iterator[Tuple]:
+        """Yields the raw record tuples, in the order of RECORD"""
+
+        with open(self.filename, "rb") as file:
+            data = file.read()
+        usable = len(data) - len(data) % self.RECORD.size
+        yield from self.RECORD.iter_unpack(memoryview(data)[:usable])
+
+    def transactions(self) -> Iterator[Transaction]:
+        """Yields the Transaction objects of the log"""
+
+        with open(self.heap_filename, "rb") as file:
+            heap = file.read()
+        for record in self.records():
+            yield self._transaction(record, heap)
+
+    def array(self):
+        """
+        Returns the records as a numpy structured array, see dtype().
+        The descriptions stay in the heap file. Needs numpy
+        """
+
+        with open(self.filename, "rb") as file:
+            data = file.read()
+        usable = len(data) - len(data) % self.RECORD.size
+        return np.frombuffer(data, dtype=self.dtype(), count=usable // self.RECORD.size)
+
+    @staticmethod
+    def dtype():
+        """numpy dtype of a record, same layout as RECORD"""
+
+        if np is None:
+            raise ImportError("Reading the binary log as an array needs numpy: pip install numpy")
+        return np.dtype([
+            ("date", "<u4"),
+            ("wallet", "<u4"),
+            ("type_flags", "<u2"),
+            ("amount", "<i8"),
+            ("balance_before", "<i8"),
+            ("balance_after", "<i8"),
+            ("description_offset", "<u4"),
+            ("description_length", "<u4"),
+        ])
+
+    def _transaction(self, record: Tuple, heap: bytes) -> Transaction:
+        date, wallet, type_flags, amount, balance_before, balance_after, offset, length = record
+        return Transaction(
+            date=date_from_key(date),
+            wallet=self.wallet_names[wallet],
+            transaction_type=self.type_names[type_flags >> 1],
+            amount=amount,
+            description=heap[offset:offset + length].decode(),
+            balance_before=balance_before,
+            balance_after=balance_after,
+        )
+
+    def _save_names(self) -> None:
+        names = {"headers": self.headers, "wallets": self.wallet_names, "types": self.type_names}
+        temporary_filename = f"{self.names_filename}.tmp"
+        with open(temporary_filename, "w") as file:
+            json.dump(names, file)
+        os.replace(temporary_filename, self.names_filename)
+
+    @staticmethod
+    def _id(ids: Dict[str, int], names: List[str], name: str) -> int:
+        """Returns the id of a name, adding it if it's new"""
+
+        number = ids.get(name)
+        if number is None:
+            number = ids[name] = len(names)
+            names.append(name)
+        return number
+
+
+def _csv_line(transaction: Transaction, quoted: bool) -> str:
+    """The csv line of a transaction, as AccountTransactionHandler writes it"""
+
+    description = transaction.description
+    if quoted:
+        description = '"' + description.replace('"', '""') + '"'
+    return (
+        f"{transaction.date.strftime(DATE_FORMAT)},{transaction.wallet},{transaction.transaction_type},"
+        f"{transaction.amount},{description},{transaction.balance_before},{transaction.balance_after}\n"
+    )
+
+
+def _csv_rows(file) -> Iterator[str]:
+    """Yields the raw rows of a csv file, a quoted field may span lines"""
+
+    pending = ""
+    for line in file:
+        pending += line
+        if pending.count('"') % 2 == 0:
+            yield pending
+            pending = ""
+    if pending:
+        yield pending
+
+
+def csv_to_binary(csv_filename: str, binary_filename: str, batch_size: int = 10000) -> int:
+    """
+    Converts a transactions csv file to a new binary log.
+    Raises ValueError if a row can't be written back exactly as it is,
+    so converting back with binary_to_csv gives the same file
+
+    returns: number of transactions converted
+    """
+
+    for filename in (binary_filename, f"{binary_filename}.heap", f"{binary_filename}.names"):
+        if os.path.exists(filename):
+            os.remove(filename)
+    log = BinaryTransactionLog(binary_filename)
+
+    count = 0
+    with open(csv_filename, newline="") as file:
+        rows = _csv_rows(file)
+        log.headers = next(rows, log.headers)
+        fieldnames = next(csv.reader([log.headers]))
+        batch, quoted = [], []
+        for line_number, raw_row in enumerate(rows, start=2):
+            entry = dict(zip(fieldnames, next(csv.reader([raw_row]))))
+            try:
+                transaction = Transaction(
+                    date=parse_date(entry["date"]),
+                    wallet=entry["wallet"],
+                    transaction_type=entry["transaction_type"],
+                    amount=int(entry["amount"]),
+                    description=entry["description"],
+                    balance_before=int(entry["balance_before"]),
+                    balance_after=int(entry["balance_after"]),
+                )
+            except (KeyError, ValueError) as error:
+                raise ValueError(f"Row {line_number} of {csv_filename} is not valid: {error}")
+
+            if _csv_line(transaction, False) == raw_row:
+                quoted.append(False)
+            elif _csv_line(transaction, True) == raw_row:
+                quoted.append(True)
+            else:
+                raise ValueError(f"Row {line_number} of {csv_filename} can't be converted without changes")
+            batch.append(transaction)
+            if len(batch) == batch_size:
+                log.append(batch, quoted)
+                count += len(batch)
+                batch, quoted = [], []
+        log.append(batch, quoted)
+        count += len(batch)
+    return count
+
+
+def binary_to_csv(binary_filename: str, csv_filename: str) -> int:
+    """
+    Writes the transactions of a binary log to a csv file
+
+    returns: number of transactions converted
+    """
+
+    log = BinaryTransactionLog(binary_filename)
+    with open(log.heap_filename, "rb") as file:
+        heap = file.read()
+
+    count = 0
+    with open(csv_filename, "w", newline="") as file:
+        file.write(log.headers)
+        for record in log.records():
+            quoted = bool(record[2] & BinaryTransactionLog.QUOTED_DESCRIPTION)
+            file.write(_csv_line(log._transaction(record, heap), quoted))
+            count += 1
+    return count
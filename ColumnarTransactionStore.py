@@ -0,0 +1,299 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+from Transaction import Transaction
+from TransactionDate import date_from_key, date_key
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class ColumnarTransactionStore:
+    """
+    Keeps the transactions of the history in columns instead of one
+    Transaction object per row:
+
+        dates: int64 seconds since the epoch (see TransactionDate.date_key)
+        amounts, balances before and after: int64
+        wallets and transaction types: int32 codes into a list of names
+        descriptions: utf-8 bytes of all descriptions one after the other,
+                      plus the int64 position where each one ends
+
+    It behaves like a read-only list of Transaction objects, creating them
+    only when rows are read. Filters and sums run on whole columns with numpy.
+
+    Rows are kept sorted by date, so date ranges are found with a binary
+    search. Rows added out of date order are merged into their place.
+
+    Each wallet code has a posting list with the positions and dates of
+    its rows, so a query for one wallet searches only that wallet's dates.
+
+    numpy is an optional dependency, only needed for this store.
+    """
+
+    _columns = {
+        "_dates": "int64",
+        "_amounts": "int64",
+        "_balances_before": "int64",
+        "_balances_after": "int64",
+        "_wallets": "int32",
+        "_types": "int32",
+        "_description_ends": "int64",
+    }
+
+    def __init__(self):
+        if np is None:
+            raise ImportError("The columnar transactions store needs numpy: pip install numpy")
+        self._size = 0
+        for column, dtype in self._columns.items():
+            setattr(self, column, np.empty(0, dtype=dtype))
+        self._descriptions = bytearray()
+        self.wallet_names: List[str] = []
+        self.type_names: List[str] = []
+        self._wallet_codes: Dict[str, int] = {}
+        self._type_codes: Dict[str, int] = {}
+        self._postings: Dict[int, _Posting] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Transaction]:
+        for row in range(self._size):
+            yield self.transaction(row)
+
+    def __getitem__(self, row: int) -> Transaction:
+        if row < 0:
+            row += self._size
+        if not 0 <= row < self._size:
+            raise IndexError("transaction index out of range")
+        return self.transaction(row)
+
+    def clear(self) -> None:
+        """Removes all transactions"""
+        self.__init__()
+
+    def extend(self, transactions: Iterable[Transaction]) -> None:
+        """Appends transactions at the end of the columns"""
+
+        transactions = list(transactions)
+        self.extend_columns(
+            [date_key(transaction.date) for transaction in transactions],
+            [transaction.wallet for transaction in transactions],
+            [transaction.transaction_type for transaction in transactions],
+            [transaction.amount for transaction in transactions],
+            [transaction.description for transaction in transactions],
+            [transaction.balance_before for transaction in transactions],
+            [transaction.balance_after for transaction in transactions],
+        )
+
+    def extend_columns(
+        self, dates: List[int], wallets: List[str], transaction_types: List[str], amounts: List[int],
+        descriptions: List[str], balances_before: List[int], balances_after: List[int]
+    ) -> None:
+        """
+        Appends transactions given as one list per field of Transaction, with
+        the dates as date_key. Loads rows without creating Transaction objects
+        """
+
+        if not dates:
+            return
+        start = self._size
+        end = start + len(dates)
+        self._reserve(end)
+
+        self._dates[start:end] = dates
+        self._amounts[start:end] = amounts
+        self._balances_before[start:end] = balances_before
+        self._balances_after[start:end] = balances_after
+        self._wallets[start:end] = [self._code(self._wallet_codes, self.wallet_names, wallet) for wallet in wallets]
+        self._types[start:end] = [
+            self._code(self._type_codes, self.type_names, transaction_type) for transaction_type in transaction_types
+        ]
+
+        descriptions = [description.encode() for description in descriptions]
+        self._description_ends[start:end] = np.cumsum(
+            [len(description) for description in descriptions], dtype=np.int64
+        ) + len(self._descriptions)
+        self._descriptions += b"".join(descriptions)
+        self._size = end
+
+        new_dates = self._dates[start:end]
+        if (start and new_dates[0] < self._dates[start - 1]) or np.any(new_dates[1:] < new_dates[:-1]):
+            self._sort_rows()
+            self._postings.clear()
+            self._add_postings(0, end)
+        else:
+            self._add_postings(start, end)
+
+    def transaction(self, row: int) -> Transaction:
+        """Creates the Transaction object of a row"""
+
+        row = int(row)
+        description_start = int(self._description_ends[row - 1]) if row else 0
+        description_end = int(self._description_ends[row])
+        return Transaction(
+            date=date_from_key(self._dates[row]),
+            wallet=self.wallet_names[self._wallets[row]],
+            transaction_type=self.type_names[self._types[row]],
+            amount=int(self._amounts[row]),
+            description=self._descriptions[description_start:description_end].decode(),
+            balance_before=int(self._balances_before[row]),
+            balance_after=int(self._balances_after[row]),
+        )
+
+    def select(self, from_date: datetime, to_date: datetime, wallet: Optional[str] = None) -> ColumnarSelection:
+        """Returns the transactions between both dates (included), of a wallet if given"""
+
+        if wallet is not None:
+            code = self._wallet_codes.get(wallet)
+            if code is None:
+                return ColumnarSelection(self, np.empty(0, dtype=np.int64))
+            rows, dates = self._postings[code].arrays()
+        else:
+            rows, dates = None, self._dates[:self._size]
+
+        start = int(np.searchsorted(dates, date_key(from_date), side="left"))
+        end = max(start, int(np.searchsorted(dates, date_key(to_date), side="right")))
+        if rows is None:
+            return ColumnarSelection(self, np.arange(start, end))
+        return ColumnarSelection(self, rows[start:end])
+
+    def _add_postings(self, start: int, end: int) -> None:
+        """Adds the rows from start to end to the posting lists of their wallets"""
+
+        codes = self._wallets[start:end]
+        order = np.argsort(codes, kind="stable")
+        groups = np.split(order, np.flatnonzero(np.diff(codes[order])) + 1)
+        for group in groups:
+            if not len(group):
+                continue
+            rows = group + start
+            code = int(codes[group[0]])
+            if code not in self._postings:
+                self._postings[code] = _Posting()
+            self._postings[code].add(rows, self._dates[rows])
+
+    def _sort_rows(self) -> None:
+        """
+        Sorts all rows by date, rows with the same date keep their order.
+        numpy's stable sort merges the already sorted runs in linear time
+        """
+
+        size = self._size
+        order = np.argsort(self._dates[:size], kind="stable")
+        for column in self._columns:
+            if column != "_description_ends":
+                values = getattr(self, column)
+                values[:size] = values[:size][order]
+
+        # move each description to its new place in the blob
+        ends = self._description_ends[:size]
+        all_lengths = np.diff(ends, prepend=0)
+        starts = (ends - all_lengths)[order]
+        lengths = all_lengths[order]
+        new_ends = np.cumsum(lengths)
+        new_starts = new_ends - lengths
+        positions = np.arange(int(new_ends[-1])) + np.repeat(starts - new_starts, lengths)
+        blob = np.frombuffer(bytes(self._descriptions), dtype=np.uint8)
+        self._descriptions = bytearray(blob[positions].tobytes())
+        self._description_ends[:size] = new_ends
+
+    def _reserve(self, size: int) -> None:
+        """Makes room in the columns for size rows"""
+
+        capacity = len(self._dates)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, 1024)
+        for column in self._columns:
+            old = getattr(self, column)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, column, new)
+
+    @staticmethod
+    def _code(codes: Dict[str, int], names: List[str], name: str) -> int:
+        """Returns the code of a name in a dictionary, adding it if it's new"""
+
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(names)
+            names.append(name)
+        return code
+
+
+class _Posting:
+    """
+    Positions and dates of the rows of one wallet, in date order.
+    New rows are kept in chunks, joined when the posting list is read
+    """
+
+    def __init__(self):
+        self._rows = []
+        self._dates = []
+
+    def add(self, rows, dates) -> None:
+        self._rows.append(rows)
+        self._dates.append(dates)
+
+    def arrays(self):
+        """Returns the row positions and their dates"""
+        if len(self._rows) > 1:
+            self._rows = [np.concatenate(self._rows)]
+            self._dates = [np.concatenate(self._dates)]
+        return self._rows[0], self._dates[0]
+
+
+class ColumnarSelection:
+    """
+    Rows selected from a ColumnarTransactionStore, by position.
+    Behaves like a list of Transaction objects created on demand.
+    """
+
+    def __init__(self, store: ColumnarTransactionStore, rows):
+        self.store = store
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[Transaction]:
+        for row in self.rows:
+            yield self.store.transaction(row)
+
+    def __getitem__(self, position: int) -> Transaction:
+        return self.store.transaction(self.rows[position])
+
+    def clear(self) -> None:
+        """Unselects all rows"""
+        self.rows = self.rows[:0]
+
+    def total(self) -> int:
+        """Sum of the amounts of the selected transactions"""
+        return int(self.store._amounts[self.rows].sum())
+
+    def wallet_statistics(self) -> Dict[str, Dict[str, int]]:
+        """
+        Total amount and number of transactions of each wallet,
+        with the wallets in the order they first appear in the selection
+        """
+
+        codes = self.store._wallets[self.rows]
+        amounts = self.store._amounts[self.rows]
+        wallet_count = len(self.store.wallet_names)
+        counts = np.bincount(codes, minlength=wallet_count)
+        # bincount weights are floats, add.at keeps the int64 sums exact
+        totals = np.zeros(wallet_count, dtype=np.int64)
+        np.add.at(totals, codes, amounts)
+
+        present, first_positions = np.unique(codes, return_index=True)
+        order = present[np.argsort(first_positions)]
+        return {
+            self.store.wallet_names[code]: {
+                "total": int(totals[code]),
+                "transactions": int(counts[code]),
+            }
+            for code in order
+        }
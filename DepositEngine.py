@@ -0,0 +1,141 @@
+from __future__ import annotations
+from typing import List, NamedTuple
+from WalletList import WalletList
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class DepositResult(NamedTuple):
+    """What a deposit did: wallets that got a part, wallets capped, money sent to main"""
+
+    amount: int
+    deposited: int
+    capped: List[str]
+    to_main: int
+
+
+class DepositEngine:
+    """
+    Splits deposits among the wallets of a WalletList in one step.
+
+    The percents, balances and caps of the wallets are kept in integer
+    arrays, rebuilt only when the list changes (see WalletList.version).
+    Parts, cap clipping and the overflow to main are then computed for all
+    the wallets at once with numpy, or in a single plain loop without it.
+    The results are the same as Account.deposit: each wallet but main gets
+    (amount * percent) // 100, a wallet over its cap keeps the cap, sends
+    the rest to main and gets its percent set to 0, and main gets whatever
+    is left of the amount.
+    """
+
+    def __init__(self, wallets: WalletList, use_numpy: bool = True):
+        self.wallets = wallets
+        self.use_numpy = use_numpy and np is not None
+        self._version = None
+
+    def refresh(self) -> None:
+        """Copies the wallet data into the arrays if the list changed"""
+
+        if self._version == self.wallets.version:
+            return
+        self._wallets = list(self.wallets)
+        percents = [wallet.percent for wallet in self._wallets]
+        balances = [wallet.balance for wallet in self._wallets]
+        caps = [wallet.cap for wallet in self._wallets]
+        main = self.wallets.get('main')
+        self._main = self._wallets.index(main) if main is not None else None
+        self._percents, self._balances, self._caps = percents, balances, caps
+        self._arrays = self.use_numpy and all(self._fits(value) for value in balances + caps)
+        if self._arrays:
+            self._percents = np.array(percents, dtype=np.int64)
+            self._balances = np.array(balances, dtype=np.int64)
+            self._caps = np.array(caps, dtype=np.int64)
+        self._version = self.wallets.version
+
+    def percent_total(self) -> int:
+        """Sum of the percents of all wallets"""
+        self.refresh()
+        return int(sum(self._percents))
+
+    def deposit(self, amount: int) -> DepositResult:
+        """
+        Deposits the amount among the wallets and returns what was done.
+        The list must have a main wallet
+        """
+
+        self.refresh()
+        if self._main is None:
+            raise ValueError("Deposits need a main wallet")
+        if self._arrays and self._fits(amount * 100):
+            changed, capped, to_main = self._split_arrays(amount)
+        else:
+            if self._arrays:
+                # too large for 64 bit integers, go on with python integers
+                self._percents = self._percents.tolist()
+                self._balances = self._balances.tolist()
+                self._caps = self._caps.tolist()
+                self._arrays = False
+            changed, capped, to_main = self._split_lists(amount)
+
+        for position in changed:
+            wallet = self._wallets[position]
+            wallet.balance = int(self._balances[position])
+            if position in capped:
+                wallet.percent = 0
+        main = self._wallets[self._main]
+        main.balance += to_main
+        if self._arrays and not self._fits(main.balance):
+            self._version = None
+            return self._result(amount, changed, capped, to_main)
+        self._balances[self._main] = main.balance
+        # the arrays already hold what was just written to the wallets
+        self._version = self.wallets.version
+        return self._result(amount, changed, capped, to_main)
+
+    def _result(self, amount: int, changed: List[int], capped: set, to_main: int) -> DepositResult:
+        return DepositResult(
+            amount=amount,
+            deposited=len(changed),
+            capped=[self._wallets[position].name for position in sorted(capped)],
+            to_main=to_main,
+        )
+
+    @staticmethod
+    def _fits(value: int) -> bool:
+        """Whether sums of such values still fit in 64 bit integers"""
+        return abs(value) < 2 ** 60
+
+    def _split_arrays(self, amount: int):
+        receives = self._percents > 0
+        receives[self._main] = False
+        parts = np.where(receives, amount * self._percents // 100, 0)
+        balances = self._balances + parts
+        over = receives & (self._caps != 0) & (balances > self._caps)
+        overflow = np.where(over, balances - self._caps, 0)
+
+        self._balances = np.where(over, self._caps, balances)
+        self._percents = np.where(over, 0, self._percents)
+        to_main = amount - int(parts.sum()) + int(overflow.sum())
+        return np.flatnonzero(receives).tolist(), set(np.flatnonzero(over).tolist()), to_main
+
+    def _split_lists(self, amount: int):
+        changed, capped = [], set()
+        to_main = amount
+        for position, percent in enumerate(self._percents):
+            if percent <= 0 or position == self._main:
+                continue
+            part = (amount * percent) // 100
+            balance = self._balances[position] + part
+            to_main -= part
+            cap = self._caps[position]
+            if cap and balance > cap:
+                to_main += balance - cap
+                balance = cap
+                self._percents[position] = 0
+                capped.add(position)
+            self._balances[position] = balance
+            changed.append(position)
+        return changed, capped, to_main
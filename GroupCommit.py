@@ -0,0 +1,153 @@
+from __future__ import annotations
+from typing import Iterable, Optional, Set
+import os
+import threading
+import time
+
+
+class GroupCommit:
+    """
+    Makes saved files durable (fsync) with the chosen durability:
+
+        "none": never fsyncs, the OS writes the files when it wants.
+                Fastest, a crash may lose the last saves
+        "periodic": fsyncs the files saved since the last fsync every
+                    interval seconds, from a background thread.
+                    A crash loses at most the last interval of saves
+        "commit": sync() returns once the files are on disk. Commits that
+                  arrive within window seconds of each other (or until
+                  max_batch of them) share a single fsync per file.
+                  A commit only waits for others while an earlier group
+                  is still syncing, a lone commit is synced at once
+
+    Share one GroupCommit among the accounts of a deployment so their
+    commits are grouped together. sync() also takes directories, to make
+    renames durable. Errors of an fsync are raised by the sync() calls
+    that were waiting for it.
+    """
+
+    durabilities = ("none", "periodic", "commit")
+
+    def __init__(self, durability: str = "commit", window: float = 0.002, max_batch: int = 64, interval: float = 1.0):
+        if durability not in self.durabilities:
+            raise ValueError(f"Unknown durability {durability}, use one of {self.durabilities}")
+        self.durability = durability
+        self.window = window
+        self.max_batch = max_batch
+        self.interval = interval
+        # number of fsync calls done, for benchmarks and tests
+        self.fsyncs = 0
+
+        self._condition = threading.Condition()
+        self._pending: Set[str] = set()
+        self._waiting = 0
+        self._leader = False
+        # groups are numbered, a commit waits until its group is synced
+        self._group = 0
+        self._synced_group = -1
+        self._errors = {}
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        if durability == "periodic":
+            self._thread = threading.Thread(target=self._run_periodic, name="GroupCommit", daemon=True)
+            self._thread.start()
+
+    def sync(self, paths: Iterable[str]) -> None:
+        """Makes the files and directories given durable, according to the durability"""
+
+        if self.durability == "none":
+            return
+        with self._condition:
+            self._pending.update(paths)
+            if self.durability == "periodic":
+                return
+            group = self._group
+            self._waiting += 1
+            if self._leader:
+                if self._waiting >= self.max_batch:
+                    self._condition.notify_all()
+                while self._synced_group < group:
+                    self._condition.wait()
+                self._raise_error(group)
+                return
+
+            # the first commit of a group waits for others and syncs for all.
+            # With no earlier group still syncing it's alone, and syncs at once
+            self._leader = True
+            if self._synced_group < group - 1:
+                deadline = time.monotonic() + self.window
+                while self._waiting < self.max_batch and (remaining := deadline - time.monotonic()) > 0:
+                    self._condition.wait(remaining)
+            paths, self._pending = self._pending, set()
+            members, self._waiting = self._waiting, 0
+            self._leader = False
+            self._group += 1
+
+        error = self._sync_paths(paths)
+        with self._condition:
+            if error is not None:
+                # kept until every commit of the group has raised it
+                self._errors[group] = [error, members]
+            # groups are done in order, so a commit is never told its
+            # group is synced while an earlier one is still syncing
+            while self._synced_group < group - 1:
+                self._condition.wait()
+            self._synced_group = group
+            self._condition.notify_all()
+            self._raise_error(group)
+
+    def close(self) -> None:
+        """Syncs whatever is pending and stops the periodic thread"""
+
+        with self._condition:
+            self._closed = True
+            paths, self._pending = self._pending, set()
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        error = self._sync_paths(paths)
+        if error is not None:
+            raise error
+
+    def _raise_error(self, group: int) -> None:
+        entry = self._errors.get(group)
+        if entry is None:
+            return
+        error, entry[1] = entry[0], entry[1] - 1
+        if not entry[1]:
+            del self._errors[group]
+        raise error
+
+    def _run_periodic(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait(self.interval)
+                if self._closed:
+                    return
+                paths, self._pending = self._pending, set()
+            # there's no caller waiting, a failed fsync is retried next time
+            if self._sync_paths(paths) is not None:
+                with self._condition:
+                    self._pending.update(paths)
+
+    def _sync_paths(self, paths: Iterable[str]) -> Optional[OSError]:
+        """fsyncs the paths, returns the first error. Missing paths are skipped"""
+
+        error = None
+        for path in sorted(paths):
+            try:
+                descriptor = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            except OSError as open_error:
+                error = error or open_error
+                continue
+            try:
+                os.fsync(descriptor)
+                with self._condition:
+                    self.fsyncs += 1
+            except OSError as fsync_error:
+                error = error or fsync_error
+            finally:
+                os.close(descriptor)
+        return error
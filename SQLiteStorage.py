@@ -0,0 +1,349 @@
+from __future__ import annotations
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+from Transaction import Transaction
+from TransactionDate import DATE_FORMAT, date_from_key, date_key, parse_date
+from TransactionHistory import TransactionHistory
+from WalletJournal import WalletJournal
+from WalletList import WalletList
+import csv
+import os
+import sqlite3
+
+
+class SQLiteStorage:
+    """
+    Keeps the wallets and the transactions of an account together
+    in a SQLite database (in WAL mode).
+
+    Saves only touch the wallets that changed since the last save, and
+    write them in the same database transaction as the queued transactions,
+    so both are committed together or not at all.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS wallets (
+            name TEXT PRIMARY KEY,
+            balance INTEGER NOT NULL,
+            percent INTEGER NOT NULL,
+            cap INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            wallet_type TEXT,
+            location TEXT
+        );
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY,
+            date INTEGER NOT NULL,
+            wallet TEXT NOT NULL,
+            transaction_type TEXT NOT NULL,
+            amount INTEGER NOT NULL,
+            description TEXT NOT NULL,
+            balance_before INTEGER NOT NULL,
+            balance_after INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS transactions_date ON transactions (date);
+        CREATE INDEX IF NOT EXISTS transactions_wallet_date ON transactions (wallet, date);
+    """
+
+    def __init__(self, filename: str, readonly: bool = False):
+        """
+        args:
+            filename: name of the database file, created if it doesn't exist
+            readonly (Optional): opens an existing database only to read it,
+                                 without creating or changing anything
+        """
+        self.filename = filename
+        if readonly:
+            self.connection = sqlite3.connect(f"{Path(filename).absolute().as_uri()}?mode=ro", uri=True)
+            return
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(self.schema)
+        self._add_wallet_columns()
+
+    def _wallet_columns(self) -> set:
+        return {row[1] for row in self.connection.execute("PRAGMA table_info(wallets)")}
+
+    def _add_wallet_columns(self) -> None:
+        """Adds the columns of the wallet types and locations to databases made before them"""
+
+        columns = self._wallet_columns()
+        with self.connection:
+            for column in ("wallet_type", "location"):
+                if column not in columns:
+                    self.connection.execute(f"ALTER TABLE wallets ADD COLUMN {column} TEXT")
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def backup(self, filename: str) -> None:
+        """
+        Copies the database to filename, including the changes still in
+        its write-ahead log, consistently even while it's being written
+        """
+
+        target = sqlite3.connect(filename)
+        try:
+            self.connection.backup(target)
+        finally:
+            target.close()
+
+    def is_initialized(self) -> bool:
+        """Returns True once wallets have been saved in the database"""
+        return self.connection.execute("PRAGMA user_version").fetchone()[0] > 0
+
+    def load_wallets(self) -> Optional[List[dict]]:
+        """
+        Returns the saved wallets in display order,
+        or None if nothing has been saved yet
+        """
+
+        if not self.is_initialized():
+            return None
+        # a read only connection can't add the columns to an older database
+        extra = "wallet_type, location" if "location" in self._wallet_columns() else "NULL, NULL"
+        rows = self.connection.execute(
+            f"SELECT name, balance, percent, cap, {extra} FROM wallets ORDER BY position"
+        )
+        return [
+            {
+                "name": name, "balance": balance, "percent": percent, "cap": cap,
+                "wallet_type": wallet_type, "location": location or "",
+            }
+            for name, balance, percent, cap, wallet_type, location in rows
+        ]
+
+    @staticmethod
+    def rows_from_lines(lines: Iterable[str]) -> List[List[str]]:
+        """Returns the fields of queued transaction csv lines (see AccountTransactionHandler)"""
+        return [next(csv.reader([line])) for line in lines]
+
+    def save(self, wallets: WalletList, transaction_rows: Iterable[List[str]] = ()) -> None:
+        """
+        Saves the wallet changes and inserts the transactions, given as
+        csv fields in the usual column order, in one database transaction
+        """
+
+        with self.connection:
+            if not self.is_initialized():
+                self.connection.execute("DELETE FROM wallets")
+                changes = [{"op": "put", "wallet": wallet.to_dict()} for wallet in wallets]
+            else:
+                changes = wallets.pending_changes()
+            self._apply_changes(changes)
+            self._insert_rows(transaction_rows)
+            self.connection.execute("PRAGMA user_version = 1")
+        wallets.mark_saved()
+
+    def _apply_changes(self, changes: List[dict]) -> None:
+        """Applies the changes of WalletList.pending_changes to the wallets table"""
+
+        for change in changes:
+            if change["op"] == "rename":
+                self.connection.execute(
+                    "UPDATE wallets SET name = ? WHERE name = ?", (change["new_name"], change["name"])
+                )
+            elif change["op"] == "delete":
+                self.connection.execute("DELETE FROM wallets WHERE name = ?", (change["name"],))
+            else:
+                wallet = change["wallet"]
+                self.connection.execute(
+                    """
+                    INSERT INTO wallets (name, balance, percent, cap, wallet_type, location, position)
+                    VALUES (
+                        :name, :balance, :percent, :cap, :wallet_type, :location,
+                        (SELECT COALESCE(MAX(position), 0) + 1 FROM wallets)
+                    )
+                    ON CONFLICT (name) DO UPDATE SET
+                        balance = excluded.balance, percent = excluded.percent, cap = excluded.cap,
+                        wallet_type = excluded.wallet_type, location = excluded.location
+                    """,
+                    wallet,
+                )
+
+    def _insert_rows(self, rows: Iterable[List[str]]) -> None:
+        """Inserts transactions given as csv fields in the usual column order"""
+
+        self.connection.executemany(
+            """
+            INSERT INTO transactions
+                (date, wallet, transaction_type, amount, description, balance_before, balance_after)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (date_key(parse_date(date)), wallet, transaction_type, int(amount),
+                 description, int(balance_before), int(balance_after))
+                for date, wallet, transaction_type, amount, description, balance_before, balance_after
+                in rows
+            ],
+        )
+
+    def _where(self, from_date: datetime, to_date: datetime, wallet: Optional[str]) -> Tuple[str, tuple]:
+        if wallet is None:
+            return "date BETWEEN ? AND ?", (date_key(from_date), date_key(to_date))
+        return "wallet = ? AND date BETWEEN ? AND ?", (wallet, date_key(from_date), date_key(to_date))
+
+    def transactions(self, from_date: datetime, to_date: datetime, wallet: Optional[str] = None) -> List[Transaction]:
+        """Returns the transactions between both dates (included), of a wallet if given"""
+        return list(self.iter_transactions(from_date, to_date, wallet))
+
+    def iter_transactions(
+        self, from_date: datetime, to_date: datetime, wallet: Optional[str] = None
+    ) -> Iterator[Transaction]:
+        """Yields the transactions between both dates (included), of a wallet if given, as the cursor reads them"""
+
+        where, parameters = self._where(from_date, to_date, wallet)
+        rows = self.connection.execute(
+            f"""
+            SELECT date, wallet, transaction_type, amount, description, balance_before, balance_after
+            FROM transactions WHERE {where} ORDER BY date, id
+            """,
+            parameters,
+        )
+        for date, wallet, transaction_type, amount, description, balance_before, balance_after in rows:
+            yield Transaction(
+                date_from_key(date), wallet, transaction_type, amount, description, balance_before, balance_after
+            )
+
+    def total(self, from_date: datetime, to_date: datetime, wallet: Optional[str] = None) -> int:
+        """Sum of the amounts of the transactions between both dates"""
+
+        where, parameters = self._where(from_date, to_date, wallet)
+        row = self.connection.execute(f"SELECT SUM(amount) FROM transactions WHERE {where}", parameters)
+        return row.fetchone()[0] or 0
+
+    def wallet_statistics(self, from_date: datetime, to_date: datetime, wallet: Optional[str] = None) -> dict:
+        """
+        Total amount and number of transactions of each wallet between
+        both dates, in the order the wallets first appear
+        """
+
+        where, parameters = self._where(from_date, to_date, wallet)
+        rows = self.connection.execute(
+            f"""
+            SELECT wallet, SUM(amount), COUNT(*) FROM transactions WHERE {where}
+            GROUP BY wallet ORDER BY MIN(date), MIN(id)
+            """,
+            parameters,
+        )
+        return {wallet: {"total": total, "transactions": count} for wallet, total, count in rows}
+
+    def totals(
+        self, from_date: datetime, to_date: datetime, wallet: Optional[str] = None, transaction_type: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """Sum of the amounts and number of the transactions between both dates, of a transaction type if given"""
+
+        where, parameters = self._where(from_date, to_date, wallet)
+        if transaction_type is not None:
+            where, parameters = f"{where} AND transaction_type = ?", parameters + (transaction_type,)
+        row = self.connection.execute(f"SELECT SUM(amount), COUNT(*) FROM transactions WHERE {where}", parameters)
+        total, count = row.fetchone()
+        return total or 0, count
+
+    def wallet_summary(self) -> dict:
+        """
+        All-time statistics of each wallet (see TransactionSummary),
+        in the order the wallets first appear
+        """
+
+        rows = self.connection.execute(
+            """
+            SELECT wallet, SUM(amount), COUNT(*), MIN(date), MAX(date), MIN(amount), MAX(amount)
+            FROM transactions GROUP BY wallet ORDER BY MIN(id)
+            """
+        )
+        return {
+            wallet: {
+                "total": total, "transactions": count,
+                "first": f"{date_from_key(first):{DATE_FORMAT}}", "last": f"{date_from_key(last):{DATE_FORMAT}}",
+                "min": smallest, "max": biggest,
+            }
+            for wallet, total, count, first, last, smallest, biggest in rows
+        }
+
+
+class SQLiteTransactionHistory(TransactionHistory):
+    """
+    TransactionHistory for accounts saved with SQLiteStorage.
+    Queries and their aggregates run as SQL on the indexed transactions
+    table, so there are no summary or rollups files
+    """
+
+    def __init__(self, database_filename: str):
+        super().__init__(database_filename)
+        self.summary = self.rollups = None
+        self.storage = SQLiteStorage(database_filename)
+        self._query_range = None
+
+    def load_transactions(self) -> int:
+        """Loads all the transactions of the database in self.transactions"""
+
+        self.transactions.clear()
+        self.transactions.extend(self.storage.transactions(datetime.min, datetime.max))
+        print("Transactions data loaded")
+        return 0
+
+    def iter_query(self, from_date: str = None, to_date: str = None, wallet: str = None):
+        from_date, to_date = self._date_range(from_date, to_date)
+        yield from self.storage.iter_transactions(from_date, to_date, wallet or None)
+
+    def query(self, from_date: str = None, to_date: str = None, wallet: str = None) -> bool:
+        self.queried_transactions.clear()
+        from_date, to_date = self._date_range(from_date, to_date)
+        self._query_range = (from_date, to_date, wallet or None)
+        self.queried_transactions.extend(self.storage.transactions(*self._query_range))
+
+        if not self.queried_transactions:
+            print("No query data to show")
+            return False
+
+        self.show_queried_transactions()
+        self.show_aggregated_transactions()
+        print(f"\nTotal transaction amount: {self.queried_balance()}")
+        print(f"Number of transactions: {len(self.queried_transactions)}")
+        return True
+
+    def totals(
+        self, from_date: str = None, to_date: str = None, wallet: str = None, transaction_type: str = None
+    ) -> Tuple[int, int]:
+        from_date, to_date = self._date_range(from_date, to_date)
+        return self.storage.totals(from_date, to_date, wallet or None, transaction_type)
+
+    def wallet_summary(self) -> dict:
+        return self.storage.wallet_summary()
+
+    def queried_balance(self) -> int:
+        if self._query_range is None:
+            return 0
+        return self.storage.total(*self._query_range)
+
+    def _wallet_statistics(self) -> dict:
+        if self._query_range is None:
+            return {}
+        return self.storage.wallet_statistics(*self._query_range)
+
+
+def migrate_to_sqlite(wallets_filename: str, transactions_filename: str, database_filename: str) -> None:
+    """
+    Copies the wallets (with their journal, if any) and the transactions
+    of an account saved in JSON and csv files into a new SQLite database
+    """
+
+    storage = SQLiteStorage(database_filename)
+    try:
+        if storage.is_initialized():
+            raise ValueError(f"Database {database_filename} already has an account")
+
+        wallets = WalletList()
+        if os.path.exists(wallets_filename):
+            wallets.extend_data(WalletJournal(wallets_filename).load() or [])
+
+        rows = []
+        if os.path.exists(transactions_filename):
+            headers = TransactionHistory(transactions_filename).headers
+            with open(transactions_filename, newline="") as file:
+                rows = [[entry[field] for field in headers] for entry in csv.DictReader(file)]
+        storage.save(wallets, rows)
+    finally:
+        storage.close()
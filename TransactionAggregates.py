@@ -0,0 +1,98 @@
+"""
+Streaming aggregates over transactions.
+
+Each aggregate takes transactions one at a time with add() and keeps
+only its running result, so they work on generators like
+TransactionHistory.iter_query in constant memory. Several aggregates
+can share a single pass over the transactions:
+
+    total, count, wallets = Sum(), Count(), WalletTotals()
+    aggregate(history.iter_query(wallet="main"), total, count, wallets)
+
+and feed() lets the transactions go on to another consumer (an export,
+for example) while they are being aggregated.
+"""
+
+from typing import Dict, Iterable, Iterator
+from Transaction import Transaction
+
+
+class Aggregate:
+    """Base class of the streaming aggregates"""
+
+    def add(self, transaction: Transaction) -> None:
+        raise NotImplementedError
+
+    @property
+    def result(self):
+        raise NotImplementedError
+
+
+class Sum(Aggregate):
+    """Sum of the amounts"""
+
+    def __init__(self):
+        self.total = 0
+
+    def add(self, transaction: Transaction) -> None:
+        self.total += transaction.amount
+
+    @property
+    def result(self) -> int:
+        return self.total
+
+
+class Count(Aggregate):
+    """Number of transactions"""
+
+    def __init__(self):
+        self.count = 0
+
+    def add(self, transaction: Transaction) -> None:
+        self.count += 1
+
+    @property
+    def result(self) -> int:
+        return self.count
+
+
+class WalletTotals(Aggregate):
+    """
+    Total amount and number of transactions of each wallet,
+    in the order the wallets first appear
+    """
+
+    def __init__(self):
+        self.wallets: Dict[str, Dict[str, int]] = {}
+
+    def add(self, transaction: Transaction) -> None:
+        statistics = self.wallets.get(transaction.wallet)
+        if statistics is None:
+            statistics = self.wallets[transaction.wallet] = {"total": 0, "transactions": 0}
+        statistics["total"] += transaction.amount
+        statistics["transactions"] += 1
+
+    @property
+    def result(self) -> Dict[str, Dict[str, int]]:
+        return self.wallets
+
+
+def feed(transactions: Iterable[Transaction], *aggregates: Aggregate) -> Iterator[Transaction]:
+    """Yields the transactions, adding each one to all the aggregates first"""
+
+    adders = [aggregate.add for aggregate in aggregates]
+    for transaction in transactions:
+        for add in adders:
+            add(transaction)
+        yield transaction
+
+
+def aggregate(transactions: Iterable[Transaction], *aggregates: Aggregate) -> list:
+    """
+    Adds all the transactions to the aggregates in one pass,
+    returns the result of each aggregate
+    """
+
+    for _ in feed(transactions, *aggregates):
+        pass
+    return [aggregate.result for aggregate in aggregates]
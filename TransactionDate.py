@@ -0,0 +1,99 @@
+"""
+Parsing and formatting of the dates of the transactions file.
+
+Every row of the transactions file has a date in the fixed layout
+dd-mm-yyyy hh:mm:ss. Parsing it with datetime.strptime is the most
+expensive part of loading the transactions history, so parse_date reads
+the fields by position instead and caches the validated day part,
+which repeats a lot because there are many transactions per day.
+
+Anything that doesn't match the fixed layout exactly is handed over to
+datetime.strptime, so parse_date accepts and rejects the same strings
+with the same errors.
+"""
+
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Tuple
+
+
+DATE_FORMAT = "%d-%m-%Y %H:%M:%S"
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+@lru_cache(maxsize=4096)
+def _parse_day(day: str) -> Tuple[int, int, int]:
+    """
+    Returns year, month and day of a dd-mm-yyyy string,
+    raises ValueError if it's not a valid date
+    """
+
+    if not (day[2] == day[5] == "-" and _digits(day[0:2] + day[3:5] + day[6:10])):
+        raise ValueError(day)
+    year, month, day_of_month = int(day[6:10]), int(day[3:5]), int(day[0:2])
+    # let datetime validate the ranges, including the days of each month
+    datetime(year, month, day_of_month)
+    return year, month, day_of_month
+
+
+def _digits(text: str) -> bool:
+    """Returns True if text only has ASCII digits"""
+    return text.isdigit() and text.isascii()
+
+
+def parse_date(text: str, date_format: str = DATE_FORMAT) -> datetime:
+    """
+    Same as datetime.strptime(text, date_format), faster for DATE_FORMAT
+    """
+
+    if date_format == DATE_FORMAT and len(text) == 19:
+        try:
+            year, month, day = _parse_day(text[:10])
+            if text[10] == " " and text[13] == text[16] == ":" and _digits(text[11:13] + text[14:16] + text[17:19]):
+                return datetime(year, month, day, int(text[11:13]), int(text[14:16]), int(text[17:19]))
+        except ValueError:
+            # strptime raises the error with its own message below
+            pass
+    return datetime.strptime(text, date_format)
+
+
+
+def date_key(date: datetime) -> int:
+    """
+    Returns the date as whole seconds since 01-01-1970 00:00:00.
+    Dates are naive, so they are counted as if they were UTC: keys keep
+    the order of the dates and have no daylight saving gaps
+    """
+    return (date - _EPOCH) // _SECOND
+
+
+def parse_date_key(text: str, date_format: str = DATE_FORMAT) -> int:
+    """
+    Same as date_key(parse_date(text, date_format)), without creating
+    the datetime for DATE_FORMAT
+    """
+
+    if date_format == DATE_FORMAT and len(text) == 19:
+        try:
+            day_key = _day_key(text[:10])
+            if text[10] == " " and text[13] == text[16] == ":" and _digits(text[11:13] + text[14:16] + text[17:19]):
+                hours, minutes, seconds = int(text[11:13]), int(text[14:16]), int(text[17:19])
+                if hours < 24 and minutes < 60 and seconds < 60:
+                    return day_key + hours * 3600 + minutes * 60 + seconds
+        except ValueError:
+            # parse_date raises the error with its own message below
+            pass
+    return date_key(parse_date(text, date_format))
+
+
+@lru_cache(maxsize=4096)
+def _day_key(day: str) -> int:
+    """Returns the date_key of the start of a dd-mm-yyyy day"""
+    return date_key(datetime(*_parse_day(day)))
+
+
+def date_from_key(key: int) -> datetime:
+    """Returns the date of a date_key"""
+    return _EPOCH + timedelta(seconds=int(key))
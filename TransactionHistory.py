@@ -1,19 +1,45 @@
-from datetime import datetime
+from datetime import datetime, time, timedelta
+from typing import Iterator, List, Optional, Tuple
 from Transaction import Transaction, TransactionType
+from TransactionDate import DATE_FORMAT, parse_date, parse_date_key
+from ColumnarTransactionStore import ColumnarTransactionStore
+from TransactionList import TransactionList
+from TransactionScanner import TransactionScanner
+from TransactionAggregates import WalletTotals, aggregate
+from TransactionRollups import TransactionRollups
+from TransactionSummary import TransactionSummary
 import csv
+import io
+import os
 
 
 class TransactionHistory:
-    
 
-    def __init__(self, transactions_filename: str):
+    backends = ("list", "columnar", "scan")
+
+    def __init__(self, transactions_filename: str, backend: str = "list"):
         """
         You can provide either the name of the transactions filename
         or use acc.get_transactions_filename()
+
+        backend (optional) selects how the loaded transactions are kept:
+            "list": a list of Transaction objects sorted by date (default)
+            "columnar": numpy columns, see ColumnarTransactionStore.
+                        Queries and aggregates run vectorized and Transaction
+                        objects are only created to show them. Needs numpy
+            "scan": queries read the file directly with a TransactionScanner,
+                    parsing only the matching rows, so memory use doesn't
+                    grow with the size of the file
         """
-        self.transactions = []
+        if backend not in self.backends:
+            raise ValueError(f"Unknown backend {backend}, use one of {self.backends}")
+        self.backend = backend
+        if backend == "columnar":
+            self.transactions = ColumnarTransactionStore()
+        else:
+            self.transactions = TransactionList()
         self.queried_transactions = []
-        self.date_format = "%d-%m-%Y %H:%M:%S"
+        self.date_format = DATE_FORMAT
         self.headers = [
             "date",
             "wallet",
@@ -24,6 +50,16 @@ class TransactionHistory:
             "balance_after"
         ]
         self.filename = transactions_filename
+        self.scanner = TransactionScanner(transactions_filename, self._parse_transaction_entry)
+        self.summary = TransactionSummary(transactions_filename)
+        self.rollups = TransactionRollups(transactions_filename)
+
+        # what has been ingested from the transactions file so far,
+        # so later loads only parse the rows appended since then
+        self._offset = 0
+        self._file_identity = None
+        self._mtime = None
+        self._tail = b""
 
     def load_transactions(self) -> int:
         """
@@ -32,6 +68,9 @@ class TransactionHistory:
         creates a transaction object for each entry,
         and appends it to self.transactions list attribute
 
+        Only the rows appended since the last load are parsed. The whole file
+        is loaded again if it was truncated, rewritten or replaced.
+
         args:
             None
 
@@ -42,24 +81,93 @@ class TransactionHistory:
         """
 
         try:
-            self.transactions.clear()
-            with open(self.filename, "r", newline="") as csvfile:
-                transaction_entries = csv.DictReader(csvfile)
-                transactions = [
-                    self._parse_transaction_entry(row) 
-                    for row 
-                    in transaction_entries
-                ]
-                if any(transaction is None for transaction in transactions):
-                    return 2
-                self.transactions.extend(transactions)
+            with open(self.filename, "rb") as csvfile:
+                stat = os.fstat(csvfile.fileno())
+                if not self._is_same_file(csvfile, stat):
+                    self.transactions.clear()
+                    self._offset = 0
+                    self._tail = b""
+                    self._file_identity = (stat.st_dev, stat.st_ino)
+
+                if stat.st_size != self._offset or stat.st_mtime_ns != self._mtime:
+                    csvfile.seek(self._offset)
+                    data = csvfile.read()
+                    # leave a partially written last row for the next load
+                    data = data[:data.rfind(b"\n") + 1]
+                    if self.backend == "columnar":
+                        columns = self._parse_columns(data, header=not self._offset)
+                        if columns is None:
+                            return 2
+                        self.transactions.extend_columns(*columns)
+                    else:
+                        transactions = self._parse_rows(data, header=not self._offset)
+                        if any(transaction is None for transaction in transactions):
+                            return 2
+                        self.transactions.extend(transactions)
+                    self._offset += len(data)
+                    self._tail = (self._tail + data)[-64:]
+                    self._mtime = stat.st_mtime_ns
         except FileNotFoundError:
             print(f"File {self.filename} not found")
             return 1
         else:
             print("Transactions data loaded")
             return 0
+
+    def _is_same_file(self, csvfile, stat: os.stat_result) -> bool:
+        """
+        Returns True if the open file is the one already loaded,
+        only grown by appending rows to it
+        """
+
+        if self._file_identity != (stat.st_dev, stat.st_ino) or stat.st_size < self._offset:
+            return False
+        if stat.st_size == self._offset and stat.st_mtime_ns == self._mtime:
+            return True
+        csvfile.seek(self._offset - len(self._tail))
+        return csvfile.read(len(self._tail)) == self._tail
+
+    def _parse_rows(self, data: bytes, header: bool) -> List[Transaction]:
+        """
+        Return Transaction objects from a chunk of rows of the transactions file
+
+        args:
+            data: complete rows of the transactions file
+            header: True if the chunk starts with the headers row
+        """
+
+        csvfile = io.StringIO(data.decode(), newline="")
+        fieldnames = None if header else self.headers
+        return [
+            self._parse_transaction_entry(row)
+            for row
+            in csv.DictReader(csvfile, fieldnames=fieldnames)
+        ]
         
+    def _parse_columns(self, data: bytes, header: bool) -> Optional[List[list]]:
+        """
+        Same as _parse_rows for the columnar store: returns one list per column,
+        in the order of the headers and with the dates as date_key, without
+        creating Transaction objects. Returns None if a row can't be parsed
+        """
+
+        reader = csv.reader(io.StringIO(data.decode(), newline=""))
+        fieldnames = next(reader, self.headers) if header else self.headers
+        rows = list(reader)
+        fields = dict(zip(fieldnames, zip(*rows)))
+        columns = [list(fields.get(name, ())) for name in self.headers]
+        try:
+            columns[0] = [parse_date_key(date, self.date_format) for date in columns[0]]
+            for position in (3, 5, 6):
+                columns[position] = list(map(int, columns[position]))
+        except ValueError:
+            # the row at fault is reported as _parse_rows does
+            for row in rows:
+                if self._parse_transaction_entry(dict(zip(fieldnames, row))) is None:
+                    break
+            return None
+        return columns
+
     def _parse_transaction_entry(self, transaction_entry: dict) -> Transaction:
         """
         Return a Transaction object from a transaction entry in dict data
@@ -67,7 +175,7 @@ class TransactionHistory:
 
         try:
             transaction = Transaction(
-                date=datetime.strptime(transaction_entry["date"], self.date_format),
+                date=parse_date(transaction_entry["date"], self.date_format),
                 wallet=transaction_entry["wallet"],
                 transaction_type=transaction_entry["transaction_type"],
                 amount=int(transaction_entry["amount"]),
@@ -96,32 +204,34 @@ class TransactionHistory:
         """
 
         self.queried_transactions.clear()
-        self.load_transactions()
+        if self.backend != "scan":
+            self.load_transactions()
 
-        if not from_date:
-            from_date = datetime.fromtimestamp(0)
-        else:
-            from_date = f"{from_date} 00:00:00"
-            from_date = datetime.strptime(from_date, self.date_format)
-        
-        if not to_date:
-            to_date = datetime.now()
+        from_date, to_date = self._date_range(from_date, to_date)
+
+        if self.backend == "scan":
+            try:
+                filtered_transactions = sorted(
+                    self.scanner.scan(from_date, to_date, wallet or None),
+                    key=lambda transaction: transaction.date
+                )
+            except FileNotFoundError:
+                print(f"File {self.filename} not found")
+                filtered_transactions = []
         else:
-            to_date = f"{to_date} 23:59:59"
-            to_date = datetime.strptime(to_date, self.date_format)
+            # the loaded transactions are sorted by date,
+            # so the date range is found with a binary search
+            filtered_transactions = self.transactions.select(from_date, to_date, wallet or None)
 
-        filtered_transactions = []
-        for transaction in self.transactions:
-            if from_date <= transaction.date <= to_date:
-                filtered_transactions.append(transaction)
-        if wallet:
-            filtered_transactions = [transaction for transaction in filtered_transactions if transaction.wallet == wallet]
+        if self.backend == "columnar":
+            self.queried_transactions = filtered_transactions
+        else:
+            self.queried_transactions.extend(filtered_transactions)
 
-        if not filtered_transactions:
+        if not self.queried_transactions:
             print("No query data to show")
             return False
         
-        self.queried_transactions.extend(filtered_transactions)
         self.show_queried_transactions()
         self.show_aggregated_transactions()
         print(f"\nTotal transaction amount: {self.queried_balance()}")
@@ -129,11 +239,114 @@ class TransactionHistory:
         return True
 
         
+    def iter_query(self, from_date: str = None, to_date: str = None, wallet: str = None) -> Iterator[Transaction]:
+        """
+        Yields the transactions of the given date range and/or wallet,
+        reading them lazily from the transactions file in file order.
+
+        Unlike query, nothing is printed or kept in queried_transactions,
+        so big exports and reports run in constant memory and can stop early.
+        See TransactionAggregates to compute totals in the same pass
+
+        args:
+            from_date (Optional): date in day-month-year format. No upper boundary by default
+            to_date (Optional): date in day-month-year format. No lower boundary by default
+            wallet (Optional): name of a given wallet. Gets transactions from all wallets by default
+        """
+
+        from_date, to_date = self._date_range(from_date, to_date)
+        yield from self.scanner.scan(from_date, to_date, wallet or None)
+
+    def totals(
+        self, from_date: str = None, to_date: str = None, wallet: str = None, transaction_type: str = None
+    ) -> Tuple[int, int]:
+        """
+        Returns the sum of the amounts and the number of the transactions
+        of the given date range, wallet and/or transaction type, without
+        keeping or printing them.
+
+        The whole days of the range are answered from the daily and monthly
+        rollups (see TransactionRollups), which only read the rows appended
+        since they were last used. Only the rows of the partial days at the
+        edges of the range, like today when to_date is not given, are read
+        from the transactions file, from the part of it where those days are.
+
+        args:
+            from_date (Optional): date in day-month-year format. No upper boundary by default
+            to_date (Optional): date in day-month-year format. No lower boundary by default
+            wallet (Optional): name of a given wallet. Gets transactions from all wallets by default
+            transaction_type (Optional): transaction type, like deduction. All types by default
+        """
+
+        from_date, to_date = self._date_range(from_date, to_date)
+        try:
+            self.rollups.load()
+        except FileNotFoundError:
+            print(f"File {self.filename} not found")
+            return 0, 0
+
+        end_of_day = time(23, 59, 59)
+        first_day = from_date.date() if from_date.time() == time.min else from_date.date() + timedelta(days=1)
+        last_day = to_date.date() if to_date.time() == end_of_day else to_date.date() - timedelta(days=1)
+        total = count = 0
+        if first_day <= last_day:
+            total, count = self.rollups.totals(first_day, last_day, wallet or None, transaction_type)
+            edges = []
+            if from_date.date() < first_day:
+                edges.append((from_date, datetime.combine(from_date.date(), end_of_day)))
+            if to_date.date() > last_day:
+                edges.append((datetime.combine(to_date.date(), time.min), to_date))
+        else:
+            edges = [(from_date, to_date)] if from_date <= to_date else []
+
+        for start, end in edges:
+            for transaction in self._scan_days(start, end, wallet or None):
+                if transaction_type is None or transaction.transaction_type == transaction_type:
+                    total += transaction.amount
+                    count += 1
+        return total, count
+
+    def _scan_days(self, from_date: datetime, to_date: datetime, wallet: str = None) -> Iterator[Transaction]:
+        """
+        Yields the transactions between both dates, only reading the
+        part of the file of each day (see TransactionRollups.spans)
+        """
+
+        day = from_date.date()
+        while day <= to_date.date():
+            span = self.rollups.spans.get(day.isoformat())
+            if span is not None:
+                start = max(from_date, datetime.combine(day, time.min))
+                end = min(to_date, datetime.combine(day, time(23, 59, 59)))
+                yield from self.scanner.scan(start, end, wallet, *span)
+            day += timedelta(days=1)
+
+    def _date_range(self, from_date: str = None, to_date: str = None) -> Tuple[datetime, datetime]:
+        """
+        Returns the boundaries of a query from its day-month-year dates,
+        from the epoch to now by default
+        """
+
+        if not from_date:
+            from_date = datetime.fromtimestamp(0)
+        else:
+            from_date = f"{from_date} 00:00:00"
+            from_date = parse_date(from_date, self.date_format)
+        
+        if not to_date:
+            to_date = datetime.now()
+        else:
+            to_date = f"{to_date} 23:59:59"
+            to_date = parse_date(to_date, self.date_format)
+        return from_date, to_date
+
     def queried_balance(self) -> int:
         """
         Return the sum of all amount values of the transactions queried
         """
 
+        if self.backend == "columnar":
+            return self.queried_transactions.total()
         return sum([transaction.amount for transaction in self.queried_transactions])
         
     def show_queried_transactions(self) -> None:
@@ -149,16 +362,45 @@ class TransactionHistory:
         Prints the aggregated transactions
         """
 
-        wallet_statistics = {}
-        for transaction in self.queried_transactions:
-            if transaction.wallet not in wallet_statistics:
-                wallet_statistics[transaction.wallet] = {
-                    "total": 0,
-                    "transactions": 0
-                }
-            wallet_statistics[transaction.wallet]["total"] += transaction.amount
-            wallet_statistics[transaction.wallet]["transactions"] += 1
+        if self.backend == "columnar":
+            wallet_statistics = self.queried_transactions.wallet_statistics()
+        else:
+            wallet_statistics = self._wallet_statistics()
         
         print("\nAggregated transactions:")
         for wallet, stats in wallet_statistics.items():
             print(f"{wallet}: ${stats['total']} ({stats['transactions']} transactions)")
+
+    def wallet_summary(self) -> dict:
+        """
+        Returns the all-time statistics of each wallet (total, transactions,
+        first and last dates, min and max amounts) from the summary file of
+        the transactions file, see TransactionSummary. Only the rows
+        appended since the summary was last updated are read
+        """
+
+        try:
+            return self.summary.load()
+        except FileNotFoundError:
+            print(f"File {self.filename} not found")
+            return {}
+
+    def show_wallet_summary(self) -> None:
+        """
+        Prints the all-time statistics of each wallet
+        """
+
+        for wallet, stats in self.wallet_summary().items():
+            print(
+                f"{wallet}: ${stats['total']} ({stats['transactions']} transactions) "
+                f"from {stats['first']} to {stats['last']}, amounts from ${stats['min']} to ${stats['max']}"
+            )
+
+    def _wallet_statistics(self) -> dict:
+        """
+        Returns the total amount and number of transactions
+        of each wallet in the queried transactions
+        """
+
+        wallet_statistics, = aggregate(self.queried_transactions, WalletTotals())
+        return wallet_statistics
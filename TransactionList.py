@@ -0,0 +1,87 @@
+from __future__ import annotations
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from heapq import merge
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional
+from Transaction import Transaction
+
+
+class TransactionList(list):
+    """
+    List of transactions always sorted by date, with the dates kept in a
+    parallel list so date ranges are found with a binary search.
+
+    Transactions are added with extend (or append). The transactions file
+    is written in date order, so new rows normally go at the end; rows
+    older than the last one are merged into their place.
+
+    Each wallet also gets its own TransactionList with only its rows
+    (a posting list), so queries for one wallet don't look at the rows
+    of the others.
+    """
+
+    _by_date = attrgetter("date")
+
+    def __init__(self, transactions: Iterable[Transaction] = (), index_wallets: bool = True):
+        super().__init__()
+        self.dates: List[datetime] = []
+        self.wallets: Optional[Dict[str, TransactionList]] = {} if index_wallets else None
+        self.extend(transactions)
+
+    def append(self, transaction: Transaction) -> None:
+        self.extend([transaction])
+
+    def extend(self, transactions: Iterable[Transaction]) -> None:
+        transactions = list(transactions)
+        if not transactions:
+            return
+        if self.wallets is not None:
+            self._extend_wallets(transactions)
+        dates = [transaction.date for transaction in transactions]
+        if any(earlier > later for earlier, later in zip(dates, dates[1:])):
+            transactions.sort(key=self._by_date)
+            dates = [transaction.date for transaction in transactions]
+
+        if not self.dates or self.dates[-1] <= dates[0]:
+            super().extend(transactions)
+            self.dates.extend(dates)
+            return
+
+        # merge the new rows with the rows after the first new date,
+        # the rows with the same date keep the order they were added in
+        position = bisect_right(self.dates, dates[0])
+        merged = list(merge(self[position:], transactions, key=self._by_date))
+        super().__delitem__(slice(position, None))
+        super().extend(merged)
+        self.dates[position:] = [transaction.date for transaction in merged]
+
+    def _extend_wallets(self, transactions: List[Transaction]) -> None:
+        """Adds the transactions to the posting list of their wallet"""
+
+        wallet_transactions: Dict[str, List[Transaction]] = {}
+        for transaction in transactions:
+            wallet_transactions.setdefault(transaction.wallet, []).append(transaction)
+        for wallet, transactions in wallet_transactions.items():
+            if wallet not in self.wallets:
+                self.wallets[wallet] = TransactionList(index_wallets=False)
+            self.wallets[wallet].extend(transactions)
+
+    def clear(self) -> None:
+        super().clear()
+        self.dates.clear()
+        if self.wallets is not None:
+            self.wallets.clear()
+
+    def select(self, from_date: datetime, to_date: datetime, wallet: Optional[str] = None) -> List[Transaction]:
+        """Returns the transactions between both dates (included), of a wallet if given"""
+
+        if wallet is not None and self.wallets is not None:
+            if wallet not in self.wallets:
+                return []
+            return self.wallets[wallet].select(from_date, to_date)
+
+        transactions = self[bisect_left(self.dates, from_date):bisect_right(self.dates, to_date)]
+        if wallet is not None:
+            transactions = [transaction for transaction in transactions if transaction.wallet == wallet]
+        return transactions
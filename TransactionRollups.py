@@ -0,0 +1,124 @@
+from __future__ import annotations
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from TransactionDate import parse_date
+from TransactionScanner import TransactionScanner
+from TransactionSummary import TransactionSidecar
+import csv
+
+
+class TransactionRollups(TransactionSidecar):
+    """
+    Sum of the amounts and number of transactions of every day and every
+    month, by wallet and transaction type, kept in
+    <transactions file>.rollups (see TransactionSidecar).
+
+    They are extended with the rows appended since the last load, so
+    reports over many date ranges read each row of the transactions file
+    once. totals answers a range of whole days from the buckets: the
+    months it covers entirely from the monthly ones, the rest of the days
+    from the daily ones. TransactionHistory.totals adds the rows of the
+    partial days at the edges of a range, reading only the part of the
+    file where the rows of each of those days are (see spans).
+    """
+
+    suffix = ".rollups"
+
+    def _reset(self) -> None:
+        # bucket (yyyy-mm-dd or yyyy-mm) -> wallet -> transaction type -> [sum, count]
+        self.days: Dict[str, Dict[str, Dict[str, List[int]]]] = {}
+        self.months: Dict[str, Dict[str, Dict[str, List[int]]]] = {}
+        # day (yyyy-mm-dd) -> [start, end) bytes of the transactions file holding all its rows
+        self.spans: Dict[str, List[int]] = {}
+
+    def _add_data(self, data: bytes, offset: int) -> None:
+        self._add_rows(self._rows(data, offset))
+
+    def _rows(self, data: bytes, offset: int) -> Iterator[list]:
+        """Yields the csv rows of data, widening the span of the day of each of them"""
+
+        spans = TransactionScanner.row_spans(data)
+        if not offset:
+            next(spans, None)
+        for start, end in spans:
+            line = data[start:end].decode()
+            # rows without quotes are split faster by hand
+            row = next(csv.reader([line]), None) if '"' in line else line.split(",")
+            if not row:
+                continue
+            date_text = row[0]
+            if len(date_text) == 19 and date_text[2] == date_text[5] == "-":
+                day = f"{date_text[6:10]}-{date_text[3:5]}-{date_text[0:2]}"
+                start, end = offset + start, offset + end + 1
+                span = self.spans.get(day)
+                if span is None:
+                    self.spans[day] = [start, end]
+                elif end > span[1]:
+                    span[1] = end
+                elif start < span[0]:
+                    span[0] = start
+            yield row
+
+    def _add_rows(self, rows: Iterable[list]) -> None:
+        for row in rows:
+            try:
+                date_text, wallet, transaction_type, amount = row[0], row[1], row[2], int(row[3])
+                parse_date(date_text)
+            except (IndexError, ValueError):
+                continue
+            day = f"{date_text[6:10]}-{date_text[3:5]}-{date_text[0:2]}"
+            for buckets, key in ((self.days, day), (self.months, day[:7])):
+                types = buckets.setdefault(key, {}).setdefault(wallet, {})
+                bucket = types.get(transaction_type)
+                if bucket is None:
+                    types[transaction_type] = [amount, 1]
+                else:
+                    bucket[0] += amount
+                    bucket[1] += 1
+
+    def _state(self) -> dict:
+        return {"days": self.days, "months": self.months, "spans": self.spans}
+
+    def _restore(self, state: dict) -> None:
+        days, months, spans = state["days"], state["months"], state["spans"]
+        if not isinstance(days, dict) or not isinstance(months, dict) or not isinstance(spans, dict):
+            raise TypeError(state)
+        self.days, self.months, self.spans = days, months, spans
+
+    def totals(
+        self, first_day: date, last_day: date, wallet: Optional[str] = None, transaction_type: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """
+        Returns the sum of the amounts and the number of transactions from
+        the start of first_day to the end of last_day, of a wallet and/or
+        transaction type if given. Call load first to include the rows
+        appended since the last load
+        """
+
+        total = count = 0
+        for buckets, key in self._buckets(first_day, last_day):
+            wallets = buckets.get(key)
+            if not wallets:
+                continue
+            if wallet is not None:
+                wallets = {wallet: wallets[wallet]} if wallet in wallets else {}
+            for types in wallets.values():
+                if transaction_type is not None:
+                    types = {transaction_type: types[transaction_type]} if transaction_type in types else {}
+                for bucket_total, bucket_count in types.values():
+                    total += bucket_total
+                    count += bucket_count
+        return total, count
+
+    def _buckets(self, first_day: date, last_day: date) -> Iterator[Tuple[dict, str]]:
+        """Yields the fewest buckets covering the days, as (buckets, key) pairs"""
+
+        day = first_day
+        while day <= last_day:
+            next_month = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+            if day.day == 1 and next_month - timedelta(days=1) <= last_day:
+                yield self.months, f"{day.year:04d}-{day.month:02d}"
+                day = next_month
+            else:
+                yield self.days, day.isoformat()
+                day += timedelta(days=1)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Callable, Iterator, Optional, Tuple
+from Transaction import Transaction
+import csv
+import mmap
+
+
+class TransactionScanner:
+    """
+    Finds the transactions of a date range and/or wallet straight from the
+    transactions file, without loading the whole file first.
+
+    The file is memory mapped and walked line by line. The date and wallet
+    of each row are checked on the raw bytes, and only the rows that match
+    are parsed into Transaction objects, so memory use doesn't depend on
+    the size of the file.
+    """
+
+    def __init__(self, filename: str, parse_entry: Callable[[dict], Optional[Transaction]]):
+        """
+        args:
+            filename: name of the transactions file
+            parse_entry: turns a row dict into a Transaction, or None if
+                         the row is not valid (TransactionHistory._parse_transaction_entry)
+        """
+        self.filename = filename
+        self.parse_entry = parse_entry
+
+    def scan(
+        self,
+        from_date: Optional[datetime] = None,
+        to_date: Optional[datetime] = None,
+        wallet: Optional[str] = None,
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> Iterator[Transaction]:
+        """
+        Yields the valid transactions between both dates (included),
+        of a wallet if given, in the order of the file. start and end
+        (Optional) limit the scan to the rows between those bytes of the
+        file, they must be the start of a row
+        """
+
+        with open(self.filename, "rb") as file:
+            try:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # empty files can't be mapped
+                return
+            with buffer:
+                yield from self._scan_buffer(buffer, from_date, to_date, wallet, start, end)
+
+    def _scan_buffer(self, buffer: mmap.mmap, from_date, to_date, wallet, start=0, end=None) -> Iterator[Transaction]:
+        header = next(self.row_spans(buffer), None)
+        if header is None:
+            return
+        headers = next(csv.reader([buffer[header[0]:header[1]].rstrip(b"\r").decode()]))
+        # the raw checks need the date and the wallet as the first columns
+        raw_checks = headers[:2] == ["date", "wallet"]
+
+        from_key = self._sort_key(from_date) if from_date else None
+        to_key = self._sort_key(to_date) if to_date else None
+        wallet_field = wallet.encode() if wallet is not None else None
+
+        for line in self._lines(buffer, max(start, header[1] + 1), end):
+            if raw_checks and not self._raw_match(line, from_key, to_key, wallet_field):
+                continue
+            row = next(csv.reader([line.decode()]), None)
+            if not row:
+                continue
+            transaction = self.parse_entry(dict(zip(headers, row)))
+            if transaction is None:
+                continue
+            if from_date and transaction.date < from_date or to_date and transaction.date > to_date:
+                continue
+            if wallet is not None and transaction.wallet != wallet:
+                continue
+            yield transaction
+
+    @staticmethod
+    def row_spans(data, position: int = 0, size: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """
+        Yields where the complete rows of data (bytes or a memory map)
+        start and end, without their line end, from byte position to size.
+        A row goes on to the next line while it has an open quote
+        """
+
+        if size is None:
+            size = len(data)
+        quoted = data.find(b'"', position, size) != -1
+        while position < size:
+            end = data.find(b"\n", position, size)
+            while quoted and end != -1 and data[position:end].count(b'"') % 2:
+                end = data.find(b"\n", end + 1, size)
+            if end == -1:
+                # a partially written last row
+                return
+            yield position, end
+            position = end + 1
+
+    @classmethod
+    def _lines(cls, buffer: mmap.mmap, position: int = 0, size: Optional[int] = None) -> Iterator[bytes]:
+        """Yields the complete rows of the file, without their line end"""
+
+        for start, end in cls.row_spans(buffer, position, size):
+            yield buffer[start:end].rstrip(b"\r")
+
+    @staticmethod
+    def _sort_key(date: datetime) -> bytes:
+        """Returns the date as yyyymmddhhmmss bytes, comparable with _raw_date_key"""
+        return b"%04d%02d%02d%02d%02d%02d" % (
+            date.year, date.month, date.day, date.hour, date.minute, date.second
+        )
+
+    @staticmethod
+    def _raw_match(line: bytes, from_key: Optional[bytes], to_key: Optional[bytes], wallet: Optional[bytes]) -> bool:
+        """
+        Checks the date and wallet of a raw row. Rows that are not in the
+        usual layout pass, they are checked again once parsed
+        """
+
+        if from_key is not None or to_key is not None:
+            if len(line) > 19 and line[19:20] == b"," and line[2:3] == b"-":
+                # dd-mm-yyyy hh:mm:ss -> yyyymmddhhmmss
+                key = line[6:10] + line[3:5] + line[0:2] + line[11:13] + line[14:16] + line[17:19]
+                if from_key is not None and key < from_key or to_key is not None and key > to_key:
+                    return False
+
+        if wallet is not None:
+            start = line.find(b",") + 1
+            end = line.find(b",", start)
+            if start and end != -1 and line[start:start + 1] != b'"':
+                return line[start:end] == wallet
+        return True
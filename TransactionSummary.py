@@ -0,0 +1,209 @@
+from __future__ import annotations
+from typing import Dict, Iterable
+from TransactionDate import parse_date
+import csv
+import io
+import json
+import os
+
+
+class TransactionSidecar:
+    """
+    Base class of the data computed from the rows of a transactions file
+    and kept in a file next to it (<transactions file><suffix>), so it
+    comes back without reading the transactions.
+
+    The sidecar file remembers how much of the transactions file it covers
+    and the last bytes of it: rows appended since then are read on load,
+    and everything is computed again from the whole transactions file if
+    the sidecar file is missing or unreadable, or the transactions file
+    was rewritten or replaced.
+
+    Rows added with add are only kept in memory until save, so appending
+    to the transactions file never waits for the sidecar file.
+
+    Subclasses keep their data with _reset, _add_rows, _state and _restore,
+    and can override _add_data to know where each row is in the file.
+    """
+
+    suffix = ".sidecar"
+    # how many bytes of the end of the covered part are kept to recognize the file
+    tail_size = 64
+
+    def __init__(self, transactions_filename: str):
+        """
+        args:
+            transactions_filename: name of the transactions file
+        """
+        self.transactions_filename = transactions_filename
+        self.filename = f"{transactions_filename}{self.suffix}"
+        self._offset = 0
+        self._tail = b""
+        self._loaded = False
+        # changes not written to the sidecar file yet
+        self._dirty = False
+        self._reset()
+
+    def load(self, save: bool = True) -> None:
+        """
+        Brings the data up to date with the transactions file, reading the
+        sidecar file first if it wasn't yet, and saves it if it changed
+        (unless save is False). Raises FileNotFoundError if there is no
+        transactions file
+        """
+
+        with open(self.transactions_filename, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if not self._loaded:
+                self._read()
+            if not self._covers(file, size):
+                self._reset()
+                self._offset, self._tail = 0, b""
+            if size == self._offset:
+                return
+            file.seek(self._offset)
+            data = file.read()
+        # leave a partially written last row for the next load
+        data = data[:data.rfind(b"\n") + 1]
+        self._add_data(data, self._offset)
+        self._offset += len(data)
+        self._tail = (self._tail + data)[-self.tail_size:]
+        self._dirty = True
+        if save:
+            self.save()
+
+    def add(self, lines: Iterable[str], start: int, end: int) -> None:
+        """
+        Adds transaction lines just appended to the transactions file, from
+        byte start to end, in memory (see save). Does nothing if the data
+        wasn't loaded or doesn't end at start, the next load reads them
+        """
+
+        if not self._loaded or start != self._offset:
+            return
+        self._add_data("".join(lines).encode(), start)
+        with open(self.transactions_filename, "rb") as file:
+            file.seek(max(end - self.tail_size, 0))
+            self._tail = file.read(end - file.tell())
+        self._offset = end
+        self._dirty = True
+
+    def save(self) -> None:
+        """Writes the sidecar file if the data changed since it was last written"""
+        if self._dirty:
+            self._write()
+
+    def _covers(self, file, size: int) -> bool:
+        """Returns True if the sidecar covers the start of the open transactions file"""
+
+        if size < self._offset:
+            return False
+        file.seek(self._offset - len(self._tail))
+        return file.read(len(self._tail)) == self._tail
+
+    def _read(self) -> None:
+        """Reads the sidecar file, if it can't be read the data starts empty"""
+
+        self._loaded = True
+        try:
+            with open(self.filename) as file:
+                sidecar = json.load(file)
+            self._restore(sidecar["data"])
+            self._offset, self._tail = sidecar["offset"], bytes.fromhex(sidecar["tail"])
+        except (OSError, ValueError, KeyError, TypeError):
+            self._reset()
+            self._offset, self._tail = 0, b""
+
+    def _write(self) -> None:
+        # write aside and rename, so a crash never leaves half a file
+        temporary_filename = f"{self.filename}.tmp"
+        with open(temporary_filename, "w") as file:
+            json.dump({"offset": self._offset, "tail": self._tail.hex(), "data": self._state()}, file)
+        os.replace(temporary_filename, self.filename)
+        self._dirty = False
+
+    def _add_data(self, data: bytes, offset: int) -> None:
+        """Adds the complete rows of data, read from byte offset of the transactions file on"""
+
+        rows = csv.reader(io.StringIO(data.decode(), newline=""))
+        if not offset:
+            next(rows, None)
+        self._add_rows(rows)
+
+    def _reset(self) -> None:
+        """Empties the data"""
+        raise NotImplementedError
+
+    def _add_rows(self, rows: Iterable[list]) -> None:
+        """Adds csv rows in the usual column order, skipping the ones that are not valid"""
+        raise NotImplementedError
+
+    def _state(self):
+        """Returns the data to save in the sidecar file, as JSON values"""
+        raise NotImplementedError
+
+    def _restore(self, state) -> None:
+        """Sets the data saved by _state, raises KeyError, TypeError or ValueError if it's not valid"""
+        raise NotImplementedError
+
+
+class TransactionSummary(TransactionSidecar):
+    """
+    All-time statistics of each wallet of a transactions file: total
+    amount, number of transactions, first and last dates and smallest and
+    biggest amounts, kept in <transactions file>.summary (see
+    TransactionSidecar). AccountTransactionHandler adds the rows it
+    appends to a loaded summary (see add) and writes it when it's closed.
+    """
+
+    suffix = ".summary"
+
+    def load(self, save: bool = True) -> Dict[str, dict]:
+        """
+        Returns the statistics of each wallet, by wallet name, in the order
+        the wallets first appear. See TransactionSidecar.load
+        """
+
+        super().load(save)
+        return self.wallets
+
+    def _reset(self) -> None:
+        self.wallets: Dict[str, dict] = {}
+
+    def _add_rows(self, rows: Iterable[list]) -> None:
+        for row in rows:
+            try:
+                date, wallet, amount = row[0], row[1], int(row[3])
+                parse_date(date)
+            except (IndexError, ValueError):
+                continue
+            statistics = self.wallets.get(wallet)
+            if statistics is None:
+                self.wallets[wallet] = {
+                    "total": amount, "transactions": 1, "first": date, "last": date, "min": amount, "max": amount,
+                }
+                continue
+            statistics["total"] += amount
+            statistics["transactions"] += 1
+            key = sort_key(date)
+            if key < sort_key(statistics["first"]):
+                statistics["first"] = date
+            if key >= sort_key(statistics["last"]):
+                statistics["last"] = date
+            if amount < statistics["min"]:
+                statistics["min"] = amount
+            elif amount > statistics["max"]:
+                statistics["max"] = amount
+
+    def _state(self) -> Dict[str, dict]:
+        return self.wallets
+
+    def _restore(self, state: Dict[str, dict]) -> None:
+        if not isinstance(state, dict):
+            raise TypeError(state)
+        self.wallets = state
+
+
+def sort_key(date: str) -> str:
+    """Returns a valid dd-mm-yyyy hh:mm:ss date as yyyy-mm-dd hh:mm:ss, which sorts like the dates"""
+    return f"{date[6:10]}-{date[3:5]}-{date[0:2]}{date[10:]}"
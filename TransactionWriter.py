@@ -0,0 +1,111 @@
+from __future__ import annotations
+from typing import Iterable, List, Optional
+import queue
+import threading
+
+
+class TransactionWriter:
+    """
+    Appends transaction lines to the transactions file from a background
+    thread, so the caller doesn't wait for the disk.
+
+    write() puts the lines in a bounded queue and returns; it only blocks
+    when the queue is full. The thread takes everything that is queued at
+    once and appends it with a single writelines call.
+
+    flush() waits until everything written before it is on the file, and
+    close() also stops the thread. If the thread fails to write, the error
+    is raised by the next write, flush or close call, and the lines are
+    not written; the writer can't be used after that.
+    """
+
+    def __init__(self, filename: str, max_queued: int = 1000):
+        """
+        args:
+            filename: name of the transactions file
+            max_queued (Optional): most write calls waiting in the queue
+        """
+        self.filename = filename
+        self._queue: queue.Queue = queue.Queue(max_queued)
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="TransactionWriter", daemon=True)
+        self._thread.start()
+
+    def write(self, lines: Iterable[str]) -> None:
+        """Queues lines to append to the file"""
+
+        self._check()
+        lines = list(lines)
+        if lines:
+            self._queue.put(lines)
+
+    def flush(self) -> None:
+        """Waits until all the lines written so far are on the file"""
+
+        self._check()
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+        self._raise_error()
+
+    def close(self) -> None:
+        """Flushes and stops the writer thread"""
+
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_error()
+
+    def _check(self) -> None:
+        if self._closed:
+            raise ValueError("The transaction writer is closed")
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _run(self) -> None:
+        file = None
+        try:
+            while True:
+                items = [self._queue.get()]
+                # coalesce everything queued meanwhile into one write
+                while True:
+                    try:
+                        items.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                lines: List[str] = []
+                for item in items:
+                    if isinstance(item, list):
+                        lines.extend(item)
+                        continue
+                    # a barrier: the lines before it must be written first
+                    file = self._write(file, lines)
+                    lines = []
+                    if item is None:
+                        return
+                    item.set()
+                file = self._write(file, lines)
+        finally:
+            if file is not None:
+                file.close()
+
+    def _write(self, file, lines: List[str]):
+        """Appends the lines, unless a previous write failed. Returns the open file"""
+
+        if not lines or self._error is not None:
+            return file
+        try:
+            if file is None:
+                file = open(self.filename, "a")
+            file.writelines(lines)
+            file.flush()
+        except Exception as error:
+            self._error = error
+        return file
@@ -1,4 +1,6 @@
 from __future__ import annotations
+from WalletTable import WalletTable
+
 
 class Wallet():
     """
@@ -7,13 +9,153 @@ class Wallet():
     percent (integer): Optional, 0 if not provided
     balance (integer): Optional, 0 if not provided
     cap (integer): Optional, 0 if not provided
+    wallet_type (string): Optional, one of Wallet.types. If not provided
+                          'main' for the main wallet, 'savings' for the
+                          names that were savings before wallets had
+                          types (see legacy_savings), 'regular' otherwise
+    location (string): Optional, where the money is (cash, bank...)
+
+    The data lives in a row of a WalletTable and the wallet is a small view
+    over it: the table of its WalletList, or Wallet.loose while it's in none
+    (or the table a WalletList had when it was cleared). A wallet can be in
+    one WalletList at a time, copies (copy.copy, copy.deepcopy, pickle) get
+    their own row in Wallet.loose.
+    Changes are notified to the listener of the table, if any
     """
-    
-    def __init__(self, name: str, balance: int = 0, percent: int = 0, cap: int = 0):
-        self.name = name
-        self.percent = percent
-        self.balance = balance
-        self.cap = cap
+
+    __slots__ = ('_table', '_row')
+
+    fields = ('name', 'balance', 'percent', 'cap', 'wallet_type', 'location')
+    types = ('savings', 'regular', 'debts', 'main', 'lends')
+    # the wallets counted as savings when they were listed by name,
+    # so files saved before wallets had types keep their meaning
+    legacy_savings = ('emergencies', 'savings', 'investing', 'binance-btc', 'travels')
+    # table of the wallets that are not in a WalletList
+    loose = WalletTable()
+
+    def __init__(
+        self, name: str, balance: int = 0, percent: int = 0, cap: int = 0, wallet_type: str = None, location: str = ''
+    ):
+        self._table = Wallet.loose
+        self._row = Wallet.loose.add(*self.data(name, balance, percent, cap, wallet_type, location))
+
+    @classmethod
+    def data(
+        cls, name: str, balance: int = 0, percent: int = 0, cap: int = 0, wallet_type: str = None, location: str = ''
+    ) -> tuple:
+        """Row of the wallet made with these arguments, see WalletTable.row"""
+
+        if wallet_type is None:
+            wallet_type = cls.default_type(name)
+        return name, balance, percent, cap, wallet_type, location
+
+    @classmethod
+    def view(cls, table: WalletTable, row: int) -> Wallet:
+        """Wallet over a row of table that already has its data, see WalletList.extend_data"""
+
+        wallet = cls.__new__(cls)
+        wallet._table = table
+        wallet._row = row
+        return wallet
+
+    @classmethod
+    def default_type(cls, name: str) -> str:
+        """Type of a wallet created without one"""
+
+        if name == 'main':
+            return 'main'
+        return 'savings' if name in cls.legacy_savings else 'regular'
+
+    @property
+    def name(self) -> str:
+        return self._table.names[self._row]
+
+    @name.setter
+    def name(self, value: str) -> None:
+        self._set('name', 'names', value)
+
+    @property
+    def balance(self) -> int:
+        return self._table.balances[self._row]
+
+    @balance.setter
+    def balance(self, value: int) -> None:
+        self._set('balance', 'balances', value)
+
+    @property
+    def percent(self) -> int:
+        return self._table.percents[self._row]
+
+    @percent.setter
+    def percent(self, value: int) -> None:
+        self._set('percent', 'percents', value)
+
+    @property
+    def cap(self) -> int:
+        return self._table.caps[self._row]
+
+    @cap.setter
+    def cap(self, value: int) -> None:
+        self._set('cap', 'caps', value)
+
+    @property
+    def wallet_type(self) -> str:
+        return self._table.types[self._row]
+
+    @wallet_type.setter
+    def wallet_type(self, value: str) -> None:
+        self._set('wallet_type', 'types', value)
+
+    @property
+    def location(self) -> str:
+        return self._table.locations[self._row]
+
+    @location.setter
+    def location(self, value: str) -> None:
+        self._set('location', 'locations', value)
+
+    def _set(self, attr: str, column: str, value) -> None:
+        """ Notifies the listener (if any) about changes on wallet data """
+        table, row = self._table, self._row
+        old_value = getattr(table, column)[row]
+        table.set(column, row, value)
+        if table.listener is not None:
+            table.listener(self, attr, old_value)
+
+    def _move(self, table: WalletTable) -> None:
+        """Moves the data of the wallet to a row of another table"""
+
+        if table is self._table:
+            return
+        old_table, old_row = self._table, self._row
+        self._row = table.add(*old_table.row(old_row))
+        self._table = table
+        old_table.remove(old_row)
+
+    def __del__(self):
+        try:
+            table, row = self._table, self._row
+        except AttributeError:
+            # __init__ didn't get to store the wallet
+            return
+        # the table of a cleared list goes away with its last wallet, its rows aren't reused
+        if table.listener is not None or table is Wallet.loose:
+            table.remove(row)
+
+    def __reduce__(self):
+        """Copies and pickles are new wallets with the same data, outside any list"""
+        return Wallet, self._table.row(self._row)
+
+    def to_dict(self) -> dict:
+        """ Returns the wallet data as a dict, ready to be serialized """
+        return {
+            'name': self.name,
+            'percent': self.percent,
+            'balance': self.balance,
+            'cap': self.cap,
+            'wallet_type': self.wallet_type,
+            'location': self.location,
+        }
 
     def __repr__(self) -> str:
         return f"{self.name} (${self.balance})"
@@ -22,8 +164,8 @@ class Wallet():
         """ Sums the balance when the wallet is on addition operations """
         self.balance += value
         return self
-    
+
     def __sub__(self, value: int) -> Wallet:
         """ Substracts the wallet balance from the value """
         self.balance -= value
-        return self
\ No newline at end of file
+        return self
@@ -0,0 +1,149 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Tuple
+from WalletList import WalletList
+
+
+class WalletBatch:
+    """
+    Runs a batch of Account operations on a copy of the wallet data, to
+    check that every one of them is valid before any wallet is touched.
+
+    Operations are tuples of an Account method name and its arguments:
+
+        ("add", name, amount)
+        ("transfer", from_name, to_name, amount=None)
+        ("deduct", name, description=None, amount=None)
+        ("deposit", amount)
+        ("set_cap", name, cap)
+
+    They work as the Account methods of the same name, without printing.
+    Only the wallets an operation touches are copied, so big batches on
+    a few wallets stay cheap. After run(), errors has an (index, message)
+    pair for each operation that can't be done, and if there are none,
+    state has the new data of the wallets touched and deductions the
+    transactions to queue.
+    """
+
+    operations = ("add", "transfer", "deduct", "deposit", "set_cap")
+
+    def __init__(self, wallets: WalletList):
+        self.wallets = wallets
+        # name -> [balance, percent, cap] of the wallets touched by the batch
+        self.state: Dict[str, List[int]] = {}
+        self.errors: List[Tuple[int, str]] = []
+        # (name, amount, balance_before, balance_after, description)
+        self.deductions: List[Tuple[str, int, int, int, str]] = []
+
+    def run(self, operations: Iterable[tuple]) -> bool:
+        """Checks and runs all the operations on the copy, returns True if all are valid"""
+
+        for index, operation in enumerate(operations):
+            if not operation or operation[0] not in self.operations:
+                self.errors.append((index, f"Unknown operation {operation!r}"))
+                continue
+            try:
+                error = getattr(self, f"_{operation[0]}")(*operation[1:])
+            except TypeError:
+                error = f"Wrong arguments for {operation[0]}"
+            if error:
+                self.errors.append((index, error))
+        return not self.errors
+
+    def _wallet(self, name: str) -> Optional[List[int]]:
+        """The copy of a wallet data, None if there's no such wallet"""
+
+        data = self.state.get(name)
+        if data is None:
+            wallet = self.wallets.get(name)
+            if wallet is None:
+                return None
+            data = self.state[name] = [wallet.balance, wallet.percent, wallet.cap]
+        return data
+
+    @staticmethod
+    def _valid_number(value) -> bool:
+        return type(value) is int and value >= 0
+
+    def _correct_cap(self, wallet: List[int]) -> Optional[str]:
+        balance, _, cap = wallet
+        if cap and balance > cap:
+            main = self._wallet('main')
+            if main is None:
+                return "There is no main wallet to move the money over the cap to"
+            main[0] += balance - cap
+            wallet[0] = cap
+            wallet[1] = 0
+        return None
+
+    def _add(self, name: str, amount: int) -> Optional[str]:
+        wallet = self._wallet(name)
+        if wallet is None:
+            return f"Wallet {name} could not be found"
+        if not self._valid_number(amount):
+            return "Not a valid number format"
+        wallet[0] += amount
+        return self._correct_cap(wallet)
+
+    def _transfer(self, from_name: str, to_name: str, amount: int = None) -> Optional[str]:
+        from_wallet = self._wallet(from_name)
+        to_wallet = self._wallet(to_name)
+        if from_wallet is None or to_wallet is None:
+            return "Please insert valid wallet names"
+        if amount is None:
+            amount = from_wallet[0]
+            from_wallet[0] -= amount
+            to_wallet[0] += amount
+            return None
+        if not self._valid_number(amount):
+            return "Only positive integers are permitted"
+        if amount > from_wallet[0]:
+            return "Money to transfer surpasses wallet amount"
+        from_wallet[0] -= amount
+        to_wallet[0] += amount
+        return self._correct_cap(to_wallet)
+
+    def _deduct(self, name: str, description: str = None, amount: int = None) -> Optional[str]:
+        wallet = self._wallet(name)
+        if wallet is None:
+            return "No wallet under that name could be found"
+        if not wallet[0]:
+            return "No available balance to deduct from"
+        if amount is None:
+            amount = wallet[0]
+        elif not self._valid_number(amount) or amount > wallet[0]:
+            return "Error with the amount input"
+        self.deductions.append((name, amount, wallet[0], wallet[0] - amount, description or "no_description"))
+        wallet[0] -= amount
+        return None
+
+    def _deposit(self, amount: int) -> Optional[str]:
+        if not self._valid_number(amount):
+            return "Not a valid number format"
+        names = list(self.wallets.names())
+        wallets = [self._wallet(name) for name in names]
+        if sum(wallet[1] for wallet in wallets) != 100:
+            return "Percent values among wallets do not add up to 100"
+        main = self._wallet('main')
+        if main is None:
+            return "There is no main wallet to deposit the rest to"
+
+        remaining = amount
+        for name, wallet in zip(names, wallets):
+            if wallet[1] > 0 and name != 'main':
+                part = (amount * wallet[1]) // 100
+                wallet[0] += part
+                remaining -= part
+                self._correct_cap(wallet)
+        main[0] += remaining
+        return None
+
+    def _set_cap(self, name: str, cap: int) -> Optional[str]:
+        if not self._valid_number(cap):
+            return "Not a valid cap value"
+        if name == 'main':
+            return "You can't do this operation on the main wallet"
+        wallet = self._wallet(name)
+        if wallet is None:
+            return "Wallet not found"
+        wallet[2] = cap
+        return self._correct_cap(wallet)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+from WalletList import WalletList
+import json
+import os
+import zlib
+
+
+class WalletJournal:
+    """
+    Journaled storage for the wallets of an account.
+
+    The wallets file keeps being a full JSON snapshot, exactly like the
+    plain storage writes it. Saves only append the changes since the last
+    save to a journal file next to it (<wallets file>.journal), one JSON
+    record per line, so the cost of a save depends on what changed
+    and not on the number of wallets.
+
+    Once the journal grows past compact_every records, the next save writes
+    a fresh snapshot and starts an empty journal (compaction).
+
+    The first line of the journal holds the checksum of the snapshot it
+    applies to, so a journal left behind by an interrupted compaction
+    is ignored instead of being replayed twice.
+    """
+
+    def __init__(self, wallets_filename: str, compact_every: int = 1000):
+        self.wallets_filename = wallets_filename
+        self.journal_filename = f"{wallets_filename}.journal"
+        self.compact_every = compact_every
+        self._records = 0
+        self._snapshot_checksum: Optional[int] = None
+
+    def load(self) -> Optional[List[dict]]:
+        """
+        Rebuild the saved wallets from the snapshot plus the journal
+
+        returns:
+            list of wallet dicts in display order
+            None if there is no data saved at all (empty wallets file)
+        """
+
+        with open(self.wallets_filename, 'rb') as file:
+            snapshot = file.read()
+        self._snapshot_checksum = zlib.crc32(snapshot)
+        self._records = 0
+
+        records, complete = self._read_journal()
+        if not snapshot and not records:
+            return None
+
+        wallets: Dict[str, dict] = {}
+        if snapshot:
+            for wallet_dict in json.loads(snapshot):
+                wallets[wallet_dict['name']] = wallet_dict
+        for record in records:
+            self._replay(wallets, record)
+        # an incomplete journal gets compacted on the next save
+        self._records = len(records) if complete else self.compact_every
+        return list(wallets.values())
+
+    def save(self, wallets: WalletList) -> None:
+        """Persist the changes of the wallets since the last save"""
+
+        if (
+            self._snapshot_checksum is None
+            or not os.path.exists(self.journal_filename)
+            or self._records >= self.compact_every
+        ):
+            self.compact(wallets)
+            return
+
+        records = wallets.pending_changes()
+        if records:
+            lines = [json.dumps(record) + '\n' for record in records]
+            with open(self.journal_filename, 'a') as file:
+                file.writelines(lines)
+            self._records += len(records)
+        wallets.mark_saved()
+
+    def compact(self, wallets: WalletList) -> None:
+        """Write a fresh snapshot of all the wallets and start an empty journal"""
+
+        snapshot = json.dumps([wallet.to_dict() for wallet in wallets]).encode()
+        self._replace(self.wallets_filename, snapshot)
+        self._snapshot_checksum = zlib.crc32(snapshot)
+        header = json.dumps({'base': self._snapshot_checksum}) + '\n'
+        self._replace(self.journal_filename, header.encode())
+        self._records = 0
+        wallets.mark_saved()
+
+    def _read_journal(self) -> Tuple[List[dict], bool]:
+        """
+        Returns the journal records that apply to the current snapshot,
+        and whether the journal was read completely
+        """
+
+        if not os.path.exists(self.journal_filename):
+            return [], True
+        with open(self.journal_filename) as file:
+            lines = file.read().splitlines()
+        if not lines or json.loads(lines[0]).get('base') != self._snapshot_checksum:
+            return [], True
+
+        records = []
+        for line in lines[1:]:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # a save interrupted halfway leaves an incomplete last line
+                return records, False
+        return records, True
+
+    @staticmethod
+    def _replay(wallets: Dict[str, dict], record: dict) -> None:
+        """Apply a journal record to the wallet dicts, keeping their order"""
+
+        op = record['op']
+        if op == 'put':
+            wallet_dict = record['wallet']
+            wallets[wallet_dict['name']] = wallet_dict
+        elif op == 'delete':
+            wallets.pop(record['name'], None)
+        elif op == 'rename':
+            old_name, new_name = record['name'], record['new_name']
+            if old_name in wallets:
+                renamed = {
+                    (new_name if name == old_name else name): wallet_dict
+                    for name, wallet_dict in wallets.items()
+                }
+                renamed[new_name] = dict(renamed[new_name], name=new_name)
+                wallets.clear()
+                wallets.update(renamed)
+
+    @staticmethod
+    def _replace(filename: str, content: bytes) -> None:
+        """Atomically replace the content of a file"""
+
+        temporary_filename = f"{filename}.tmp"
+        with open(temporary_filename, 'wb') as file:
+            file.write(content)
+        os.replace(temporary_filename, filename)
@@ -0,0 +1,317 @@
+from __future__ import annotations
+from array import array
+from contextlib import nullcontext
+from typing import Dict, Iterable, List, Optional
+from Wallet import Wallet
+from WalletTable import WalletTable
+
+
+class WalletList(list):
+    """
+    List of wallets that keeps a name -> Wallet index in sync with its items,
+    so wallets can be looked up by name in constant time while the list order
+    is still kept for display.
+
+    It also records which wallets changed since the last save, so storages
+    can persist only the changes (see pending_changes and mark_saved).
+    version goes up on every change of the list or its wallets, so copies of
+    the wallet data (see DepositEngine) know when they are out of date.
+
+    The data of the wallets in the list is kept in its table (see
+    WalletTable), so sums over all of them run on its columns. The total
+    balance is kept running, updated by every change, so reading it costs
+    the same with any number of wallets. The wallets are also grouped by
+    type and by location (see group_fields), each group with its members
+    and its running total. With check_totals the totals are compared with
+    full sums on every read (for debugging). Set totals_lock when wallets
+    of the list change from many threads at once.
+    """
+
+    check_totals = False
+    group_fields = ('wallet_type', 'location')
+
+    def __init__(self, wallets: Iterable[Wallet] = ()):
+        super().__init__()
+        self.table = WalletTable(self._wallet_changed)
+        self._index: Dict[str, Wallet] = {}
+        # structural changes (renames, deletes) in the order they happened
+        self._changes: List[dict] = []
+        # wallets whose data changed, by identity, in the order they changed
+        self._dirty: Dict[int, Wallet] = {}
+        self.version = 0
+        self.totals_lock = None
+        self._balance_total = 0
+        # field -> group -> table rows of the members, field -> position of each row in its group
+        # (by row), and field -> group -> total balance
+        self._groups: Dict[str, Dict[str, array]] = {field: {} for field in self.group_fields}
+        self._positions: Dict[str, array] = {field: array('q') for field in self.group_fields}
+        self._group_totals: Dict[str, Dict[str, int]] = {field: {} for field in self.group_fields}
+        self.extend(wallets)
+
+    def get(self, name: str) -> Optional[Wallet]:
+        """Returns the wallet with the given name, None if it's not in the list"""
+        return self._index.get(name)
+
+    def names(self):
+        """Returns a view of the names of all wallets in the list"""
+        return self._index.keys()
+
+    def rename_wallet(self, wallet: Wallet, new_name: str) -> None:
+        """Renames a wallet of the list keeping the index up to date"""
+        wallet.name = new_name
+
+    def reindex(self) -> None:
+        """Rebuilds the whole index from the list items"""
+        self._index = {wallet.name: wallet for wallet in self}
+
+    def pending_changes(self) -> List[dict]:
+        """
+        Returns the changes since the last save as journal records:
+        renames and deletes first, in order, then the full data of every
+        wallet that changed and is still in the list
+        """
+
+        records = list(self._changes)
+        for wallet in self._dirty.values():
+            if self._index.get(wallet.name) is wallet:
+                records.append({'op': 'put', 'wallet': wallet.to_dict()})
+        return records
+
+    def has_changes(self) -> bool:
+        """Returns True if there are changes not saved yet"""
+        return bool(self._changes or self._dirty)
+
+    def mark_saved(self) -> None:
+        """Forget the pending changes, they have been persisted"""
+        self._changes.clear()
+        self._dirty.clear()
+
+    def _wallet_changed(self, wallet: Wallet, attr: str, old_value) -> None:
+        """Listener called by the wallets of the list when their data changes"""
+        if attr == 'name' and old_value != wallet.name:
+            if self._index.get(old_value) is wallet:
+                del self._index[old_value]
+            self._index[wallet.name] = wallet
+            self._changes.append({'op': 'rename', 'name': old_value, 'new_name': wallet.name})
+        elif attr == 'balance':
+            self._balance_changed(wallet, wallet.balance - old_value)
+        elif attr in self.group_fields and old_value != getattr(wallet, attr):
+            self._regroup(wallet, attr, old_value)
+        self._dirty[id(wallet)] = wallet
+        self.version += 1
+
+    def total(self, column: str = 'balances') -> int:
+        """Sum of a column of the table (balances, percents or caps) over all the wallets"""
+
+        if column != 'balances':
+            return self.table.total(column)
+        if self.check_totals:
+            self._check_totals()
+        return self._balance_total
+
+    def group(self, field: str, key: str) -> List[Wallet]:
+        """Wallets whose field (wallet_type or location) is key, in no particular order"""
+        names = self.table.names
+        return [self._index[names[row]] for row in self._groups[field].get(key, ())]
+
+    def group_total(self, field: str, key: str) -> int:
+        """Total balance of the wallets whose field (wallet_type or location) is key"""
+
+        if self.check_totals:
+            self._check_totals()
+        return self._group_totals[field].get(key, 0)
+
+    def group_totals(self, field: str) -> Dict[str, int]:
+        """Total balance of every group of a field (wallet_type or location)"""
+
+        if self.check_totals:
+            self._check_totals()
+        return dict(self._group_totals[field])
+
+    def _check_totals(self) -> None:
+        """Compares the running totals with full sums, raises AssertionError if they differ"""
+
+        expected = self.table.total()
+        if self._balance_total != expected:
+            raise AssertionError(f"Running total {self._balance_total} differs from the sum {expected}")
+        for field in self.group_fields:
+            expected = {}
+            for wallet in self._index.values():
+                key = getattr(wallet, field)
+                expected[key] = expected.get(key, 0) + wallet.balance
+            if self._group_totals[field] != expected:
+                raise AssertionError(f"Running totals by {field} {self._group_totals[field]} differ from {expected}")
+
+    def _join(self, field: str, key: str, wallet: Wallet, balance: int) -> None:
+        members = self._groups[field].setdefault(key, array('q'))
+        positions = self._positions[field]
+        row = wallet._row
+        if row >= len(positions):
+            positions.extend([0] * (row + 1 - len(positions)))
+        positions[row] = len(members)
+        members.append(row)
+        totals = self._group_totals[field]
+        totals[key] = totals.get(key, 0) + balance
+
+    def _leave(self, field: str, key: str, wallet: Wallet, balance: int) -> None:
+        # the last member takes the place of the one leaving
+        members = self._groups[field][key]
+        positions = self._positions[field]
+        last = members.pop()
+        if last != wallet._row:
+            position = positions[wallet._row]
+            members[position] = last
+            positions[last] = position
+        if members:
+            self._group_totals[field][key] -= balance
+        else:
+            del self._groups[field][key]
+            del self._group_totals[field][key]
+
+    def _count(self, wallet: Wallet) -> None:
+        """Adds a wallet that joins the list to the totals and its groups"""
+
+        with self.totals_lock or nullcontext():
+            balance = wallet.balance
+            self._balance_total += balance
+            for field in self.group_fields:
+                self._join(field, getattr(wallet, field), wallet, balance)
+
+    def _uncount(self, wallet: Wallet) -> None:
+        """Takes a wallet that leaves the list out of the totals and its groups"""
+
+        with self.totals_lock or nullcontext():
+            balance = wallet.balance
+            self._balance_total -= balance
+            for field in self.group_fields:
+                self._leave(field, getattr(wallet, field), wallet, balance)
+
+    def _balance_changed(self, wallet: Wallet, amount: int) -> None:
+        with self.totals_lock or nullcontext():
+            self._balance_total += amount
+            for field in self.group_fields:
+                self._group_totals[field][getattr(wallet, field)] += amount
+
+    def _regroup(self, wallet: Wallet, field: str, old_key: str) -> None:
+        with self.totals_lock or nullcontext():
+            balance = wallet.balance
+            self._leave(field, old_key, wallet, balance)
+            self._join(field, getattr(wallet, field), wallet, balance)
+
+    def _attach(self, wallet: Wallet) -> None:
+        # only the table of a list has a listener
+        if wallet._table is not self.table and wallet._table.listener is not None:
+            raise ValueError(f"Wallet {wallet.name} is already in another list, remove it from there first")
+        if wallet._table is not self.table:
+            wallet._move(self.table)
+            self._count(wallet)
+        self._index[wallet.name] = wallet
+        self._dirty[id(wallet)] = wallet
+        self.version += 1
+
+    def _detach(self, wallet: Wallet) -> None:
+        if self._index.get(wallet.name) is wallet:
+            del self._index[wallet.name]
+        if wallet._table is self.table:
+            self._uncount(wallet)
+            wallet._move(Wallet.loose)
+        self._dirty.pop(id(wallet), None)
+        self._changes.append({'op': 'delete', 'name': wallet.name})
+        self.version += 1
+
+    def __contains__(self, item) -> bool:
+        if isinstance(item, Wallet):
+            return self._index.get(item.name) is item
+        return super().__contains__(item)
+
+    # list mutators
+
+    def append(self, wallet: Wallet) -> None:
+        super().append(wallet)
+        self._attach(wallet)
+
+    def extend(self, wallets: Iterable[Wallet]) -> None:
+        # one at a time, so new wallets leave Wallet.loose as they're made
+        for wallet in wallets:
+            super().append(wallet)
+            self._attach(wallet)
+
+    def extend_data(self, wallets: Iterable[dict]) -> None:
+        """
+        Adds new wallets made from their data (the arguments of Wallet, like
+        Wallet.to_dict gives it), stored straight in the table of the list
+        """
+
+        table = self.table
+        added = [Wallet.view(table, row) for row in table.extend(Wallet.data(**data) for data in wallets)]
+        super().extend(added)
+        for wallet in added:
+            self._index[wallet.name] = wallet
+            self._dirty[id(wallet)] = wallet
+        # the totals and groups of all of them at once
+        with self.totals_lock or nullcontext():
+            balances = table.balances
+            self._balance_total += sum(balances[wallet._row] for wallet in added)
+            for field, column in zip(self.group_fields, (table.types, table.locations)):
+                groups, totals, positions = self._groups[field], self._group_totals[field], self._positions[field]
+                positions.extend([0] * (len(column) - len(positions)))
+                for wallet in added:
+                    row = wallet._row
+                    key = column[row]
+                    members = groups.get(key)
+                    if members is None:
+                        members = groups[key] = array('q')
+                    positions[row] = len(members)
+                    members.append(row)
+                    totals[key] = totals.get(key, 0) + balances[row]
+        self.version += 1
+
+    def insert(self, position: int, wallet: Wallet) -> None:
+        super().insert(position, wallet)
+        self._attach(wallet)
+
+    def remove(self, wallet: Wallet) -> None:
+        super().remove(wallet)
+        self._detach(wallet)
+
+    def pop(self, position: int = -1) -> Wallet:
+        wallet = super().pop(position)
+        self._detach(wallet)
+        return wallet
+
+    def clear(self) -> None:
+        # all the totals and groups go at once, instead of wallet by wallet
+        with self.totals_lock or nullcontext():
+            self._balance_total = 0
+            for field in self.group_fields:
+                self._groups[field].clear()
+                self._positions[field] = array('q')
+                self._group_totals[field].clear()
+        self._changes.extend({'op': 'delete', 'name': wallet.name} for wallet in self)
+        # the wallets keep their rows in the old table, which no list listens to anymore
+        self.table.listener = None
+        self.table = WalletTable(self._wallet_changed)
+        super().clear()
+        self._index.clear()
+        self._dirty.clear()
+        self.version += 1
+
+    def __setitem__(self, key, value) -> None:
+        removed = self[key] if isinstance(key, slice) else [self[key]]
+        added = value if isinstance(key, slice) else [value]
+        added = list(added)
+        for wallet in removed:
+            self._detach(wallet)
+        super().__setitem__(key, added if isinstance(key, slice) else value)
+        for wallet in added:
+            self._attach(wallet)
+
+    def __delitem__(self, key) -> None:
+        removed = self[key] if isinstance(key, slice) else [self[key]]
+        super().__delitem__(key)
+        for wallet in removed:
+            self._detach(wallet)
+
+    def __iadd__(self, wallets: Iterable[Wallet]) -> WalletList:
+        self.extend(wallets)
+        return self
@@ -0,0 +1,126 @@
+from __future__ import annotations
+from array import array
+from typing import Callable, Iterable, List, Optional, Tuple
+import sys
+import threading
+
+
+class WalletTable:
+    """
+    Data of many wallets as a struct of arrays, one row per wallet:
+    the names, types and locations in lists (interned) and the balances,
+    percents and caps in arrays of 64 bit integers, so a wallet costs a few bytes per field
+    instead of an object per value, and sums run over contiguous memory.
+
+    A column that is given a value its array can't hold (too big, or not
+    an integer) becomes a plain list, so any value is still kept as is.
+
+    Wallet objects are views over a row (see Wallet). The rows of wallets
+    that leave the table are zeroed and reused by the next ones.
+    listener, if set, is called by the wallets of the table when their
+    data changes, with the wallet, the field name and its old value.
+    """
+
+    columns = ('balances', 'percents', 'caps')
+    text_columns = ('names', 'types', 'locations')
+
+    def __init__(self, listener: Optional[Callable] = None):
+        self.listener = listener
+        self.names: List[Optional[str]] = []
+        self.balances = array('q')
+        self.percents = array('q')
+        self.caps = array('q')
+        self.types: List[Optional[str]] = []
+        self.locations: List[Optional[str]] = []
+        self._free: List[int] = []
+        # reentrant: a wallet collected while a row is added frees its row
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """Number of rows in use"""
+        return len(self.names) - len(self._free)
+
+    def add(
+        self, name: str, balance: int, percent: int, cap: int, wallet_type: str = 'regular', location: str = ''
+    ) -> int:
+        """Stores the data of a wallet in a free row, returns the row"""
+
+        if type(name) is str:
+            name = sys.intern(name)
+        if type(wallet_type) is str:
+            wallet_type = sys.intern(wallet_type)
+        if type(location) is str:
+            location = sys.intern(location)
+        numbers = (('balances', balance), ('percents', percent), ('caps', cap))
+        with self._lock:
+            if self._free:
+                row = self._free.pop()
+                self.names[row], self.types[row], self.locations[row] = name, wallet_type, location
+                for column, value in numbers:
+                    self.set(column, row, value)
+                return row
+            row = len(self.names)
+            self.names.append(name)
+            self.types.append(wallet_type)
+            self.locations.append(location)
+            for column, value in numbers:
+                values = getattr(self, column)
+                try:
+                    values.append(value)
+                except (OverflowError, TypeError):
+                    setattr(self, column, list(values) + [value])
+            return row
+
+    def extend(self, rows: Iterable[tuple]) -> range:
+        """Stores the data of many wallets (see row) in new rows at the end, returns their rows"""
+
+        rows = list(rows)
+        if not rows:
+            return range(0)
+        names, balances, percents, caps, types, locations = zip(*rows)
+        with self._lock:
+            start = len(self.names)
+            for column, values in (('names', names), ('types', types), ('locations', locations)):
+                getattr(self, column).extend(sys.intern(value) if type(value) is str else value for value in values)
+            for column, values in (('balances', balances), ('percents', percents), ('caps', caps)):
+                try:
+                    values = array('q', values)
+                except (OverflowError, TypeError):
+                    setattr(self, column, list(getattr(self, column)))
+                getattr(self, column).extend(values)
+            return range(start, len(self.names))
+
+    def remove(self, row: int) -> None:
+        """Frees a row for the next wallet"""
+
+        with self._lock:
+            self.names[row] = self.types[row] = self.locations[row] = None
+            for column in self.columns:
+                self.set(column, row, 0)
+            self._free.append(row)
+
+    def row(self, row: int) -> Tuple[str, int, int, int, str, str]:
+        """Returns the name, balance, percent, cap, type and location of a row"""
+        return (
+            self.names[row], self.balances[row], self.percents[row], self.caps[row], self.types[row], self.locations[row]
+        )
+
+    def set(self, column: str, row: int, value) -> None:
+        """Sets a value of a column, turning the column into a list if its array can't hold it"""
+
+        if column in self.text_columns:
+            getattr(self, column)[row] = sys.intern(value) if type(value) is str else value
+            return
+        # locked so a write can't land on an array that is being replaced by a list
+        with self._lock:
+            values = getattr(self, column)
+            try:
+                values[row] = value
+            except (OverflowError, TypeError):
+                values = list(values)
+                values[row] = value
+                setattr(self, column, values)
+
+    def total(self, column: str = 'balances') -> int:
+        """Sum of a column over all the rows in use"""
+        return sum(getattr(self, column))
@@ -0,0 +1,73 @@
+"""
+Size on disk and load time of the transactions csv file compared with
+the binary transactions log, on a generated transactions file.
+
+    python3 benchmarks/bench_binary_log.py [--rows 1000000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_date_parser import generate_transactions_file  # noqa: E402
+from BinaryTransactionLog import BinaryTransactionLog, csv_to_binary  # noqa: E402
+from TransactionHistory import TransactionHistory  # noqa: E402
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_filename = os.path.join(directory, "transactions.csv")
+        binary_filename = os.path.join(directory, "transactions.bin")
+        generate_transactions_file(csv_filename, args.rows)
+        _, convert_seconds = timed(lambda: csv_to_binary(csv_filename, binary_filename))
+        log = BinaryTransactionLog(binary_filename)
+
+        csv_size = os.path.getsize(csv_filename)
+        binary_size = sum(
+            os.path.getsize(filename)
+            for filename in (binary_filename, log.heap_filename, log.names_filename)
+        )
+        print(f"Rows: {args.rows:,}")
+        print("Size")
+        print(f"  csv:    {csv_size / 2 ** 20:8.1f} MiB")
+        print(f"  binary: {binary_size / 2 ** 20:8.1f} MiB (records + descriptions heap + names)")
+        print(f"  record: {BinaryTransactionLog.RECORD.size:8d} bytes, csv row: {csv_size / args.rows:.1f} bytes on average")
+        print(f"Conversion csv -> binary: {convert_seconds:.2f}s")
+
+        print("Load time")
+        with patch("builtins.print"):
+            _, seconds = timed(lambda: TransactionHistory(csv_filename).load_transactions())
+        print(f"  csv, TransactionHistory.load_transactions: {seconds:8.3f}s")
+        _, seconds = timed(lambda: list(log.transactions()))
+        print(f"  binary, Transaction objects:               {seconds:8.3f}s")
+        _, seconds = timed(lambda: list(log.records()))
+        print(f"  binary, record tuples (struct):            {seconds:8.3f}s")
+        if numpy is not None:
+            records, seconds = timed(log.array)
+            print(f"  binary, numpy array (frombuffer):          {seconds:8.3f}s")
+            _, seconds = timed(lambda: int(records["amount"].sum()))
+            print(f"  binary, numpy sum of amounts:              {seconds:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Rows per second parsing transaction dates with datetime.strptime (before)
+and with TransactionDate.parse_date (after), on a generated transactions
+file.
+
+    python3 benchmarks/bench_date_parser.py [--rows 1000000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from TransactionDate import DATE_FORMAT, parse_date  # noqa: E402
+from TransactionHistory import TransactionHistory  # noqa: E402
+
+
+HEADERS = "date,wallet,transaction_type,amount,description,balance_before,balance_after\n"
+
+
+def generate_transactions_file(filename: str, rows: int) -> None:
+    """Write a transactions file with rows entries a few minutes apart"""
+
+    random.seed(0)
+    wallets = [f"wallet_{number}" for number in range(50)]
+    date = datetime(2015, 1, 1)
+    with open(filename, "w") as file:
+        file.write(HEADERS)
+        for number in range(rows):
+            date += timedelta(seconds=random.randint(1, 3600))
+            amount = random.randint(1, 500)
+            file.write(
+                f"{date.strftime(DATE_FORMAT)},{random.choice(wallets)},deduction,"
+                f"{amount},\"description {number}\",{amount + 100},100\n"
+            )
+
+
+def rate(rows: int, seconds: float) -> str:
+    return f"{rows / seconds:>12,.0f} rows/s ({seconds:.2f}s)"
+
+
+def bench_dates(dates: list) -> None:
+    start = time.perf_counter()
+    for date in dates:
+        datetime.strptime(date, DATE_FORMAT)
+    before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for date in dates:
+        parse_date(date)
+    after = time.perf_counter() - start
+
+    print("Date column only")
+    print(f"  strptime:   {rate(len(dates), before)}")
+    print(f"  parse_date: {rate(len(dates), after)}")
+    print(f"  speedup:    {before / after:.1f}x")
+
+
+def bench_load(filename: str, rows: int) -> None:
+    def strptime(text, date_format=DATE_FORMAT):
+        return datetime.strptime(text, date_format)
+
+    with patch("TransactionHistory.parse_date", strptime), patch("builtins.print"):
+        start = time.perf_counter()
+        TransactionHistory(filename).load_transactions()
+        before = time.perf_counter() - start
+
+    with patch("builtins.print"):
+        start = time.perf_counter()
+        TransactionHistory(filename).load_transactions()
+        after = time.perf_counter() - start
+
+    print("TransactionHistory.load_transactions")
+    print(f"  strptime:   {rate(rows, before)}")
+    print(f"  parse_date: {rate(rows, after)}")
+    print(f"  speedup:    {before / after:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "transactions.csv")
+        generate_transactions_file(filename, args.rows)
+        with open(filename) as file:
+            next(file)
+            dates = [line[:19] for line in file]
+        bench_dates(dates)
+        bench_load(filename, args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Time of a deposit among many wallets: the per wallet loop of
+Account.deposit compared with DepositEngine, with and without numpy.
+
+    python3 benchmarks/bench_deposit.py [--wallets 10000] [--deposits 100]
+"""
+
+import argparse
+import os
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Account import Account  # noqa: E402
+from DepositEngine import DepositEngine, np  # noqa: E402
+from Wallet import Wallet  # noqa: E402
+from WalletList import WalletList  # noqa: E402
+
+
+def make_wallets(count: int) -> WalletList:
+    """
+    main plus count wallets. Percents are whole numbers adding up to 100,
+    so at most 99 wallets get 1% each, spread over the list; every third
+    wallet has a cap
+    """
+
+    receivers = min(99, count)
+    step = max(1, count // receivers)
+    wallets = WalletList([Wallet("main", 0, 100 - receivers, 0)])
+    for number in range(count):
+        percent = 1 if number % step == 0 and number // step < receivers else 0
+        wallets.append(Wallet(f"wallet_{number}", 0, percent, 10 ** 9 if number % 3 == 0 else 0))
+    return wallets
+
+
+def timed(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wallets", type=int, default=10_000)
+    parser.add_argument("--deposits", type=int, default=100)
+    args = parser.parse_args()
+
+    with patch("builtins.print"):
+        account = Account()
+    account.wallets.clear()
+    account.wallets.extend(make_wallets(args.wallets))
+    with patch("builtins.print"), patch.object(Account, "deposit_engine_threshold", args.wallets + 2):
+        loop = timed(lambda: account.deposit(100_000), args.deposits)
+
+    python_engine = DepositEngine(make_wallets(args.wallets), use_numpy=False)
+    python_seconds = timed(lambda: python_engine.deposit(100_000), args.deposits)
+
+    print(f"Wallets: {args.wallets:,}, deposits: {args.deposits}")
+    print(f"Account.deposit loop:      {loop * 1000:8.2f} ms per deposit")
+    print(f"DepositEngine (python):    {python_seconds * 1000:8.2f} ms per deposit")
+    if np is not None:
+        numpy_engine = DepositEngine(make_wallets(args.wallets))
+        numpy_seconds = timed(lambda: numpy_engine.deposit(100_000), args.deposits)
+        print(f"DepositEngine (numpy):     {numpy_seconds * 1000:8.2f} ms per deposit")
+    else:
+        print("numpy is not installed, skipping the numpy engine")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Commit throughput for each GroupCommit durability: threads append lines
+to a shared transactions file and commit each one, and a single account
+saves in a loop.
+
+    python3 benchmarks/bench_group_commit.py [--threads 8] [--commits 200] [--window 0.002]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Account import Account  # noqa: E402
+from GroupCommit import GroupCommit  # noqa: E402
+
+
+def concurrent_commits(filename: str, commit: GroupCommit, threads: int, commits: int) -> float:
+    lock = threading.Lock()
+    line = "01-01-2024 00:00:00,main,deduction,1,no_description,10,9\n"
+
+    def worker():
+        for _ in range(commits):
+            with lock, open(filename, "a") as file:
+                file.write(line)
+            commit.sync([filename])
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    commit.close()
+    return time.perf_counter() - start
+
+
+def account_saves(directory: str, commit: GroupCommit, saves: int) -> float:
+    wallets_filename = os.path.join(directory, "wallets.json")
+    transactions_filename = os.path.join(directory, "transactions.csv")
+    with open(wallets_filename, "w") as file:
+        json.dump([{"name": "main", "percent": 100, "balance": 10 ** 9, "cap": 0}], file)
+    account = Account(wallets_filename, transactions_name=transactions_filename, output=None, group_commit=commit)
+    start = time.perf_counter()
+    for _ in range(saves):
+        account.deduct("main", "bench", 1)
+        account.save()
+    commit.close()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--commits", type=int, default=200, help="commits per thread")
+    parser.add_argument("--window", type=float, default=0.002, help="group commit window in seconds")
+    args = parser.parse_args()
+
+    total = args.threads * args.commits
+    print(f"{args.threads} threads x {args.commits} commits, window {args.window * 1000:.1f} ms")
+    print(f"{'durability':<12}{'commits/s':>12}{'fsyncs':>10}{'saves/s':>12}")
+    for durability in GroupCommit.durabilities:
+        with tempfile.TemporaryDirectory() as directory:
+            commit = GroupCommit(durability, window=args.window, interval=0.1)
+            seconds = concurrent_commits(os.path.join(directory, "commits.csv"), commit, args.threads, args.commits)
+            fsyncs = commit.fsyncs
+            save_seconds = account_saves(directory, GroupCommit(durability, window=0, interval=0.1), args.commits)
+        print(f"{durability:<12}{total / seconds:>12,.0f}{fsyncs:>10}{args.commits / save_seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Startup time of a report: a new Python process imports Account, opens an
+account and calls total(), with Account(...) and with Account.open_readonly.
+Each run is a fresh process, so the import time is counted.
+
+    python3 benchmarks/bench_open.py [--wallets 10000] [--runs 10]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+from Account import Account
+account = {open}({wallets!r}, transactions_name={transactions!r}, output=None)
+opened = time.perf_counter()
+account.total()
+print(opened - start, time.perf_counter() - start)
+"""
+
+
+def startup(open_call: str, wallets_filename: str, transactions_filename: str, runs: int):
+    """Median seconds to open the account and to get the first total, each in a new process"""
+
+    script = SCRIPT.format(root=ROOT, open=open_call, wallets=wallets_filename, transactions=transactions_filename)
+    opened, totals = [], []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True).stdout
+        open_seconds, total_seconds = map(float, output.split())
+        opened.append(open_seconds)
+        totals.append(total_seconds)
+    return statistics.median(opened), statistics.median(totals)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wallets", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        wallets_filename = os.path.join(directory, "wallets.json")
+        transactions_filename = os.path.join(directory, "transactions.csv")
+        wallets = [{"name": "main", "percent": 100, "balance": 1000, "cap": 0}]
+        wallets += [{"name": f"wallet_{number}", "percent": 0, "balance": number, "cap": 0} for number in range(args.wallets)]
+        with open(wallets_filename, "w") as file:
+            json.dump(wallets, file)
+
+        print(f"{args.wallets} wallets, median of {args.runs} processes")
+        print(f"{'':<24}{'open (ms)':>12}{'first total (ms)':>18}")
+        for label, open_call in (("Account", "Account"), ("Account.open_readonly", "Account.open_readonly")):
+            opened, total = startup(open_call, wallets_filename, transactions_filename, args.runs)
+            print(f"{label:<24}{opened * 1000:>12.1f}{total * 1000:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
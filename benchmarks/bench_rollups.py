@@ -0,0 +1,114 @@
+"""
+A monthly spending report (amount and count per month and per wallet)
+made with a TransactionHistory.query per month and wallet against
+TransactionHistory.totals, which answers from the daily and monthly
+rollups: the first report builds them, the next ones only read the rows
+appended since. Then the totals of an open-ended range (up to now, with
+some rows today), whose partial last day is read from the part of the
+file holding it.
+
+    python3 benchmarks/bench_rollups.py [--rows 200000] [--wallets 10] [--months 12]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AccountTransactionHandler import AccountTransactionHandler  # noqa: E402
+from TransactionHistory import TransactionHistory  # noqa: E402
+
+
+def month_ranges(months: int):
+    """Yields the first and last day of each month of 2023 and on, in day-month-year format"""
+
+    first = datetime(2023, 1, 1)
+    for _ in range(months):
+        next_month = (first.replace(day=28) + timedelta(days=4)).replace(day=1)
+        yield f"{first:%d-%m-%Y}", f"{next_month - timedelta(days=1):%d-%m-%Y}"
+        first = next_month
+
+
+def report_with_queries(history: TransactionHistory, months: int, wallets: int) -> dict:
+    report = {}
+    with redirect_stdout(open(os.devnull, "w")):
+        for from_date, to_date in month_ranges(months):
+            for number in range(wallets):
+                history.query(from_date, to_date, f"wallet_{number}")
+                report[from_date, number] = (history.queried_balance(), len(history.queried_transactions))
+    return report
+
+
+def report_with_totals(history: TransactionHistory, months: int, wallets: int) -> dict:
+    return {
+        (from_date, number): history.totals(from_date, to_date, f"wallet_{number}")
+        for from_date, to_date in month_ranges(months)
+        for number in range(wallets)
+    }
+
+
+def open_ended_totals(history: TransactionHistory, wallets: int) -> dict:
+    return {number: history.totals("15-06-2023", wallet=f"wallet_{number}") for number in range(wallets)}
+
+
+def open_ended_sums(history: TransactionHistory, wallets: int) -> dict:
+    sums = {}
+    for number in range(wallets):
+        transactions = list(history.iter_query("15-06-2023", wallet=f"wallet_{number}"))
+        sums[number] = (sum(transaction.amount for transaction in transactions), len(transactions))
+    return sums
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--wallets", type=int, default=10)
+    parser.add_argument("--months", type=int, default=12)
+    args = parser.parse_args()
+    generator = random.Random(1)
+    seconds = args.months * 30 * 24 * 3600
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "transactions.csv")
+        with open(filename, "w") as file:
+            file.write(AccountTransactionHandler.headers)
+            for _ in range(args.rows):
+                moment = datetime(2023, 1, 1) + timedelta(seconds=generator.randrange(seconds))
+                wallet = generator.randrange(args.wallets)
+                file.write(f"{moment:%d-%m-%Y %H:%M:%S},wallet_{wallet},deduction,{generator.randrange(1, 500)},test,0,0\n")
+            today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            for second in range(0, 1000 * 60, 60):
+                moment = today + timedelta(seconds=second)
+                wallet = generator.randrange(args.wallets)
+                file.write(f"{moment:%d-%m-%Y %H:%M:%S},wallet_{wallet},deduction,{generator.randrange(1, 500)},test,0,0\n")
+
+        expected, queries = timed(report_with_queries, TransactionHistory(filename), args.months, args.wallets)
+        report, built = timed(report_with_totals, TransactionHistory(filename), args.months, args.wallets)
+        assert report == expected
+        _, reused = timed(report_with_totals, TransactionHistory(filename), args.months, args.wallets)
+        expected, scanned = timed(open_ended_sums, TransactionHistory(filename), args.wallets)
+        report, open_ended = timed(open_ended_totals, TransactionHistory(filename), args.wallets)
+        assert report == expected
+
+    print(f"{args.rows} rows, {args.months} months x {args.wallets} wallets")
+    print(f"query per month and wallet: {queries * 1000:9.1f} ms")
+    print(f"totals, building rollups:   {built * 1000:9.1f} ms")
+    print(f"totals, saved rollups:      {reused * 1000:9.1f} ms")
+    print(f"open-ended range, scan:     {scanned * 1000:9.1f} ms")
+    print(f"open-ended range, totals:   {open_ended * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
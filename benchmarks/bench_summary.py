@@ -0,0 +1,74 @@
+"""
+All-time statistics of each wallet: aggregating the loaded transactions
+against the summary file kept next to the transactions file, when it's
+built from scratch, up to date, and after some rows were appended.
+
+    python3 benchmarks/bench_summary.py [--rows 500000] [--wallets 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AccountTransactionHandler import AccountTransactionHandler  # noqa: E402
+from TransactionAggregates import WalletTotals, aggregate  # noqa: E402
+from TransactionHistory import TransactionHistory  # noqa: E402
+from TransactionSummary import TransactionSummary  # noqa: E402
+
+
+def rows(count: int, wallets: int, generator: random.Random):
+    for number in range(count):
+        day = 1 + number * 28 // count
+        yield f"{day:02d}-05-2023 12:00:00,wallet_{generator.randrange(wallets)},deduction,{generator.randrange(1, 500)},test,0,0\n"
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--wallets", type=int, default=200)
+    args = parser.parse_args()
+    generator = random.Random(1)
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "transactions.csv")
+        with open(filename, "w") as file:
+            file.write(AccountTransactionHandler.headers)
+            file.writelines(rows(args.rows, args.wallets, generator))
+
+        def load_and_aggregate():
+            history = TransactionHistory(filename)
+            with redirect_stdout(open(os.devnull, "w")):
+                history.load_transactions()
+            return aggregate(history.transactions, WalletTotals())[0]
+
+        expected, loaded = timed(load_and_aggregate)
+        summary, built = timed(lambda: TransactionSummary(filename).load())
+        assert {wallet: statistics["total"] for wallet, statistics in summary.items()} == {
+            wallet: statistics["total"] for wallet, statistics in expected.items()
+        }
+        _, fresh = timed(lambda: TransactionSummary(filename).load())
+        with open(filename, "a") as file:
+            file.writelines(rows(1000, args.wallets, generator))
+        _, appended = timed(lambda: TransactionSummary(filename).load())
+
+    print(f"{args.rows} rows, {args.wallets} wallets")
+    print(f"load and aggregate:         {loaded * 1000:9.1f} ms")
+    print(f"summary, built:             {built * 1000:9.1f} ms")
+    print(f"summary, up to date:        {fresh * 1000:9.1f} ms")
+    print(f"summary, 1000 rows appended:{appended * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
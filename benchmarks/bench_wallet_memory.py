@@ -0,0 +1,46 @@
+"""
+Memory taken by the wallets of a WalletList, and the time of a total of
+their balances: a loop over the wallets against a sum of the table column.
+
+    python3 benchmarks/bench_wallet_memory.py [--wallets 200000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Wallet import Wallet  # noqa: E402
+from WalletList import WalletList  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wallets", type=int, default=200_000)
+    args = parser.parse_args()
+
+    names = [f"wallet_{number}" for number in range(args.wallets)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    wallets = WalletList(Wallet(name, 1000 + number, 0, 10 ** 6) for number, name in enumerate(names))
+    wallets.mark_saved()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{args.wallets} wallets: {(after - before) / args.wallets:.0f} bytes per wallet, names not counted")
+
+    start = time.perf_counter()
+    loop_total = sum(wallet.balance for wallet in wallets)
+    loop = time.perf_counter() - start
+    start = time.perf_counter()
+    column_total = wallets.total()
+    column = time.perf_counter() - start
+    assert loop_total == column_total
+    print(f"total, loop over wallets: {loop * 1000:8.2f} ms")
+    print(f"total, table column:      {column * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
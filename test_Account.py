@@ -3,7 +3,6 @@ import unittest
 from unittest.mock import patch, Mock
 
 from Account import Account
-from AccountTransactionHandler import AccountTransactionHandler
 from Wallet import Wallet
 import json
 
@@ -18,9 +17,9 @@ class TestAccount(unittest.TestCase):
 
     def setUp(self):
         test_wallet_data = [
-            {"name": "main", "percent": 70, "balance": 1500, "cap": 0}, 
-            {"name": "emergencies", "percent": 20, "balance": 500, "cap": 50000}, 
-            {"name": "charity", "percent": 10, "balance": 200, "cap": 0}
+            {"name": "main", "percent": 70, "balance": 1500, "cap": 0, "wallet_type": "main", "location": ""}, 
+            {"name": "emergencies", "percent": 20, "balance": 500, "cap": 50000, "wallet_type": "savings", "location": ""}, 
+            {"name": "charity", "percent": 10, "balance": 200, "cap": 0, "wallet_type": "regular", "location": ""}
         ]
         with open("test_wallet.json", "w") as file:
             file.write(json.dumps(test_wallet_data))
@@ -30,7 +29,6 @@ class TestAccount(unittest.TestCase):
         self.emergencies = self.account.get_wallet('emergencies')
         self.charity = self.account.get_wallet('charity')
         self.savings_wallets = ['savings', 'emergencies', 'investing', 'travels', 'retirement']
-        AccountTransactionHandler._empty_queued_transactions()
         
         with open(self.account.get_transactions_file_name(), "w") as file:
             transaction_headers = "date,wallet,transaction_type,amount,description,balance_before,balance_after\n"
@@ -247,11 +245,11 @@ class TestAccount(unittest.TestCase):
         # Save a new wallet to json file
         self.account.deduct('main', "test_deduct", 100)
         entry = f"{self.date_string},main,deduction,100,\"test_deduct\",1500,1400\n"
-        self.assertEqual(len(AccountTransactionHandler._transactions), 1)
-        self.assertEqual(AccountTransactionHandler._transactions[0], entry)
+        self.assertEqual(len(self.account.transaction_handler._transactions), 1)
+        self.assertEqual(self.account.transaction_handler._transactions[0], entry)
         
         self.account.save()
-        self.assertListEqual(AccountTransactionHandler._transactions, [])
+        self.assertListEqual(self.account.transaction_handler._transactions, [])
 
         # read json file and confirm new wallet values
         with open(self.account.get_transactions_file_name(), "r") as file:
@@ -261,6 +259,24 @@ class TestAccount(unittest.TestCase):
         self.account.add("main", 100)
         self.account.save()
 
+    def test_accounts_keep_their_own_transactions(self):
+        """Saving an account doesn't save the transactions of another one"""
+        with open("test_other_wallet.json", "w") as file:
+            file.write(json.dumps([{"name": "main", "percent": 100, "balance": 300, "cap": 0}]))
+        other = Account("test_other_wallet.json", transactions_name="test_other_transactions.csv", output=None)
+        self.addCleanup(os.remove, "test_other_wallet.json")
+        self.addCleanup(os.remove, "test_other_transactions.csv")
+        self.addCleanup(other.close)
+
+        other.deduct('main', "other deduction", 100)
+        self.account.deduct('main', "test deduction", 100)
+        self.account.save()
+        self.assertEqual(len(other.transaction_handler._transactions), 1)
+        with open(self.account.get_transactions_file_name()) as file:
+            rows = file.readlines()
+        self.assertEqual(len(rows), 2)
+        self.assertIn("test deduction", rows[1])
+
     def test_deduct(self):
         """Deduct method correctly working"""
         self.account.deduct('main', "test", 500)
@@ -270,7 +286,7 @@ class TestAccount(unittest.TestCase):
         """Deduct method correctly working"""
         self.account.add_wallet('test')
         self.account.deduct("test", "test invalid transaction")
-        self.assertEqual(len(AccountTransactionHandler._transactions), 0)
+        self.assertEqual(len(self.account.transaction_handler._transactions), 0)
 
     def test_deduct_surpass_amount(self):
         """Cant deduct money that surpasses wallet balance"""
@@ -370,10 +386,10 @@ class TestAccount(unittest.TestCase):
         """Load function works properly"""
         acc = Account("test_wallet.json")
         acc.deduct('main', "test deduction", 100)
-        self.assertEqual(len(AccountTransactionHandler._transactions), 1)
+        self.assertEqual(len(acc.transaction_handler._transactions), 1)
         
         acc.reset()
-        self.assertEqual(len(AccountTransactionHandler._transactions), 0)
+        self.assertEqual(len(acc.transaction_handler._transactions), 0)
 
     def test_calc_percents_valid_1(self):
         """The calc_percents work correctly under valid situations"""
@@ -438,6 +454,22 @@ class TestAccount(unittest.TestCase):
         """non_usable method works correctly"""
         self.assertEqual(self.account.non_usable(), '$500')
 
+    def test_running_totals(self):
+        """The totals stay right through every operation that moves money"""
+        self.account.wallets.check_totals = True
+        self.account.deposit(800)
+        self.account.transfer('main', 'emergencies', 300)
+        self.account.set_cap('charity', 100)
+        self.account.edit('charity', 'charity', 50, 10, 0)
+        self.account.clear('emergencies')
+        self.assertEqual(self.account.total(), '$1990')
+        self.assertEqual(self.account.non_usable(), '$0')
+        self.account.reset()
+        self.assertEqual(self.account.total(), '$2200')
+        self.assertEqual(self.account.usable(), '$1700')
+        self.account.wipe()
+        self.assertEqual(self.account.total(), '$0')
+
     def test_add_wallet_fails_balance_above_cap(self):
         """You can't add wallets if the balance is higher than the cap"""
         self.account.add_wallet('test', 2000, 40, 1000)
@@ -587,6 +619,18 @@ class TestAccount(unittest.TestCase):
         self.account.rename('charity', 'emergencies')
         self.assertEqual(self.charity.name, 'charity')
 
+    def test_rename_updates_wallet_lookup(self):
+        """Renamed wallets are found under their new name only"""
+        self.account.rename('charity', 'givings')
+        self.assertIs(self.account.get_wallet('givings'), self.charity)
+        self.assertIsNone(self.account.get_wallet('charity'))
+
+    def test_edit_updates_wallet_lookup(self):
+        """Edited wallet names are found under their new name only"""
+        self.account.edit('charity', 'givings', 500, 50, 1000)
+        self.assertIs(self.account.get_wallet('givings'), self.charity)
+        self.assertIsNone(self.account.get_wallet('charity'))
+
     def test_rename_non_existing_wallet(self):
         """Can't rename a nonexistant wallet"""
         self.account.rename('test', 'unit')
@@ -698,7 +742,7 @@ class TestAccount(unittest.TestCase):
         self.account.deduct("main", "test transaction", 500)
         expected_output = f'{self.date_string},main,deduction,500,"test transaction",1500,1000\n'
 
-        transaction = AccountTransactionHandler._transactions[0]
+        transaction = self.account.transaction_handler._transactions[0]
 
         self.assertEqual(transaction, expected_output)
 
@@ -709,7 +753,7 @@ class TestAccount(unittest.TestCase):
         self.account.deduct("main", "test transaction")
         expected_output = f"{self.date_string},main,deduction,1500,\"test transaction\",1500,0\n"
 
-        transaction = AccountTransactionHandler._transactions[0]
+        transaction = self.account.transaction_handler._transactions[0]
 
         self.assertEqual(transaction, expected_output)
 
@@ -720,7 +764,7 @@ class TestAccount(unittest.TestCase):
         self.account.deduct("main")
         expected_output = f"{self.date_string},main,deduction,1500,\"no_description\",1500,0\n"
 
-        transaction = AccountTransactionHandler._transactions[0]
+        transaction = self.account.transaction_handler._transactions[0]
 
         self.assertEqual(transaction, expected_output)
 
@@ -733,8 +777,8 @@ class TestAccount(unittest.TestCase):
         expected_output1 = f"{self.date_string},main,deduction,500,\"test transaction\",1500,1000\n"
         expected_output2 = f"{self.date_string},emergencies,deduction,300,\"another test transaction\",500,200\n"
 
-        transaction1 = AccountTransactionHandler._transactions[0]
-        transaction2 = AccountTransactionHandler._transactions[1]
+        transaction1 = self.account.transaction_handler._transactions[0]
+        transaction2 = self.account.transaction_handler._transactions[1]
 
         self.assertEqual(transaction1, expected_output1)
         self.assertEqual(transaction2, expected_output2)
@@ -743,7 +787,7 @@ class TestAccount(unittest.TestCase):
         """Deduct method records the transaction in the file"""
         self.account.deduct("invalid_wallet_name")
         with self.assertRaises(IndexError):
-            AccountTransactionHandler._transactions[0]
+            self.account.transaction_handler._transactions[0]
 
     def test_get_transactions_file_name(self):
         self.assertEqual(self.account.get_transactions_file_name(), "test_transactions.csv")
@@ -772,6 +816,96 @@ class TestAccount(unittest.TestCase):
         self.assertEqual(backup_transactions_data, original_transactions_data)
 
 
+    def test_total_type(self):
+        """Totals by type, savings count as non usable"""
+        self.account.add_wallet('loan', 300, wallet_type='debts')
+        self.assertEqual(self.account.total_type('savings'), '$500')
+        self.assertEqual(self.account.total_type('debts'), '$300')
+        self.assertEqual(self.account.total_type('lends'), '$0')
+        self.assertIsNone(self.account.total_type('unknown'))
+
+        self.account.set_type('charity', 'savings')
+        self.assertEqual(self.account.non_usable(), '$700')
+        self.assertEqual(self.account.usable(), '$1800')
+
+    def test_invalid_type(self):
+        """Only the types in Wallet.types are accepted"""
+        self.assertFalse(self.account.add_wallet('loan', wallet_type='loans'))
+        self.assertIsNone(self.account.get_wallet('loan'))
+        self.assertFalse(self.account.set_type('charity', 'loans'))
+        self.assertEqual(self.charity.wallet_type, 'regular')
+
+    def test_total_location(self):
+        """Totals by location"""
+        self.account.set_location('main', 'bank')
+        self.account.set_location('charity', 'bank')
+        self.assertEqual(self.account.total_location('bank'), '$1700')
+        self.assertEqual(self.account.total_location(''), '$500')
+        self.assertIsNone(self.account.total_location('cash'))
+
+    def test_show_by_type(self):
+        """Wallets are shown under their type"""
+        lines = []
+        self.account.output = lines.append
+        self.account.show_by_type()
+        self.assertEqual(lines, ['savings ($500): emergencies ($500)', 'regular ($200): charity ($200)', 'main ($1500): main ($1500)'])
+
+    def test_show_by_type_without_output(self):
+        """Without an output the wallets aren't formatted at all"""
+        self.account.output = None
+        with patch.object(Wallet, '__repr__') as wallet_repr:
+            self.account.show_by_type()
+        wallet_repr.assert_not_called()
+
+    def test_types_saved(self):
+        """Types and locations are saved with the wallets"""
+        self.account.set_type('charity', 'lends')
+        self.account.set_location('charity', 'cash')
+        self.account.save()
+        account = Account("test_wallet.json")
+        self.addCleanup(account.close)
+        self.assertEqual(account.get_wallet('charity').wallet_type, 'lends')
+        self.assertEqual(account.total_location('cash'), '$200')
+
+class TestReadonlyAccount(unittest.TestCase):
+
+    def setUp(self):
+        test_wallet_data = [
+            {"name": "main", "percent": 70, "balance": 1500, "cap": 0},
+            {"name": "charity", "percent": 30, "balance": 200, "cap": 0}
+        ]
+        with open("test_readonly_wallet.json", "w") as file:
+            file.write(json.dumps(test_wallet_data))
+        self.addCleanup(os.remove, "test_readonly_wallet.json")
+
+    def test_wallets_read_on_first_use(self):
+        """Opening doesn't read the wallets file, the first total does"""
+        with patch("builtins.open", wraps=open) as opened:
+            account = Account.open_readonly("test_readonly_wallet.json", transactions_name="test_readonly.csv")
+            opened.assert_not_called()
+            self.assertEqual(account.total(), "$1700")
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual(account.get_wallet('charity').balance, 200)
+
+    def test_no_side_effects(self):
+        """No file is created, written or printed when opening a read only account"""
+        with patch("builtins.print") as mock_print:
+            account = Account.open_readonly("test_missing_wallet.json", transactions_name="test_readonly.csv")
+        mock_print.assert_not_called()
+        self.assertFalse(os.path.exists("test_missing_wallet.json"))
+        self.assertFalse(os.path.exists("test_readonly.csv"))
+        with self.assertRaises(FileNotFoundError):
+            account.total()
+
+    def test_save_fails(self):
+        """Changes to a read only account can't be saved"""
+        account = Account.open_readonly("test_readonly_wallet.json", transactions_name="test_readonly.csv", output=None)
+        account.add('main', 100)
+        self.assertFalse(account.save())
+        with open("test_readonly_wallet.json") as file:
+            self.assertEqual(json.load(file)[0]["balance"], 1500)
+
+
 if __name__ == '__main__':
     acc = Account("test_wallet.json")
     if (
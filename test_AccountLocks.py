@@ -0,0 +1,160 @@
+import json
+import os
+import random
+import sys
+import threading
+import time
+import unittest
+from Account import Account
+from AccountLocks import AccountLocks, ReadWriteLock
+
+
+TEST_LOCKS_WALLETS_FILENAME = "test_locks_wallets.json"
+TEST_LOCKS_TRANSACTIONS_FILENAME = "test_locks_transactions.csv"
+
+class TestReadWriteLock(unittest.TestCase):
+
+    def test_readers_share(self):
+        """Many threads read at the same time"""
+        lock = ReadWriteLock()
+        inside = threading.Barrier(3, timeout=5)
+
+        def read():
+            with lock.reading():
+                inside.wait()
+
+        threads = [threading.Thread(target=read) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertFalse(inside.broken)
+
+    def test_writer_is_alone(self):
+        """Readers wait while a thread writes"""
+        lock = ReadWriteLock()
+        events = []
+
+        def read():
+            with lock.reading():
+                events.append("read")
+
+        lock.acquire_write()
+        reader = threading.Thread(target=read)
+        reader.start()
+        time.sleep(0.05)
+        events.append("written")
+        lock.release_write()
+        reader.join()
+        self.assertEqual(events, ["written", "read"])
+
+    def test_reentrant(self):
+        """Writers may write and read again, readers may read again"""
+        lock = ReadWriteLock()
+        with lock.writing():
+            with lock.writing():
+                with lock.reading():
+                    pass
+        with lock.reading():
+            with lock.reading():
+                pass
+        with lock.writing():
+            pass
+
+    def test_upgrade_raises(self):
+        """A reader can't start writing"""
+        lock = ReadWriteLock()
+        with lock.reading():
+            with self.assertRaises(RuntimeError):
+                lock.acquire_write()
+        with lock.writing():
+            pass
+
+    def test_holding(self):
+        """Wallet locks are held in name order whatever order they are asked in"""
+        locks = AccountLocks()
+        with locks.holding(["b", "a", "b"]):
+            held = locks.acquire(["a"])
+            locks.release(held)
+        self.assertEqual(sorted(locks._wallets), ["a", "b"])
+
+
+class TestThreadSafeAccount(unittest.TestCase):
+
+    names = ["main", "one", "two", "three", "four", "five"]
+
+    def setUp(self):
+        test_wallet_data = [
+            {"name": name, "percent": percent, "balance": 10000, "cap": cap}
+            for name, percent, cap in zip(self.names, [50, 10, 10, 10, 10, 10], [0, 0, 0, 0, 25000, 0])
+        ]
+        with open(TEST_LOCKS_WALLETS_FILENAME, "w") as file:
+            file.write(json.dumps(test_wallet_data))
+        self.account = Account(
+            TEST_LOCKS_WALLETS_FILENAME, transactions_name=TEST_LOCKS_TRANSACTIONS_FILENAME, output=None, thread_safe=True
+        )
+
+    def tearDown(self):
+        self.account.close()
+        for filename in (TEST_LOCKS_WALLETS_FILENAME, TEST_LOCKS_TRANSACTIONS_FILENAME):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_balance_is_conserved(self):
+        """Concurrent operations neither create nor lose money"""
+        # switch threads often, so unsynchronized updates would collide
+        self.addCleanup(sys.setswitchinterval, sys.getswitchinterval())
+        sys.setswitchinterval(1e-6)
+        initial = sum(wallet.balance for wallet in self.account.wallets)
+        added, deducted, deposited = [], [], []
+
+        def work(seed):
+            rng = random.Random(seed)
+            for _ in range(300):
+                operation = rng.random()
+                name, other = rng.sample(self.names, 2)
+                amount = rng.randint(1, 500)
+                if operation < 0.55:
+                    self.account.transfer(name, other, amount)
+                elif operation < 0.7:
+                    if self.account.add(name, amount):
+                        added.append(amount)
+                elif operation < 0.85:
+                    result = self.account.deduct(name, "stress", amount)
+                    if result:
+                        deducted.append(amount)
+                elif operation < 0.9:
+                    if self.account.deposit(amount):
+                        deposited.append(amount)
+                elif operation < 0.95:
+                    self.account.set_cap(rng.choice(self.names[1:]), rng.choice([0, 20000, 30000]))
+                else:
+                    self.account.total()
+
+        threads = [threading.Thread(target=work, args=(seed,)) for seed in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        expected = initial + sum(added) + sum(deposited) - sum(deducted)
+        self.assertEqual(self.account.total(), f"${expected}")
+        for wallet in self.account.wallets:
+            self.assertGreaterEqual(wallet.balance, 0)
+            if wallet.cap:
+                self.assertLessEqual(wallet.balance, wallet.cap)
+        self.assertEqual(len(self.account.transaction_handler._transactions), len(deducted))
+
+    def test_main_created_without_upgrading(self):
+        """Operations that correct caps create a missing main without taking the write lock inside the read one"""
+        for operation in (lambda: self.account.add("c", 50), lambda: self.account.transfer("d", "c", 50),
+                          lambda: self.account.set_cap("c", 1)):
+            self.account.wipe()
+            self.account.add_wallet("c", 5, 0, 10)
+            self.account.add_wallet("d", 50)
+            self.assertTrue(operation())
+            self.assertTrue(self.account.get_wallet("main").balance)
+
+
+if __name__ == "__main__":
+    unittest.main()
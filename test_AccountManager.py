@@ -0,0 +1,152 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from Account import Account
+from AccountManager import AccountManager
+
+
+class TestAccountManager(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.manager = AccountManager(max_accounts=2, transactions_name=self.transactions_name)
+
+    def tearDown(self):
+        self.manager.close()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, f"{name}.json")
+
+    @staticmethod
+    def transactions_name(wallet_name: str) -> str:
+        return wallet_name.replace(".json", "_transactions.csv")
+
+    def write_account(self, name: str, wallets: int = 1) -> str:
+        data = [{"name": "main", "percent": 100, "balance": 1000, "cap": 0}]
+        data += [{"name": f"wallet{number}", "percent": 0, "balance": 0, "cap": 0} for number in range(1, wallets)]
+        with open(self.path(name), "w") as file:
+            json.dump(data, file)
+        return self.path(name)
+
+    def saved_balance(self, name: str) -> int:
+        with open(self.path(name)) as file:
+            return json.load(file)[0]["balance"]
+
+    def test_lazy_load_and_hits(self):
+        """Accounts are loaded on first access and then served from the cache"""
+        path = self.write_account("one")
+        self.assertNotIn(path, self.manager)
+        with patch("AccountManager.Account", wraps=Account) as account_class:
+            first = self.manager.get(path)
+            second = self.manager[path]
+        self.assertIs(first, second)
+        self.assertEqual(account_class.call_count, 1)
+        stats = self.manager.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.accounts, stats.wallets), (1, 1, 1, 1))
+        self.assertEqual(stats.hit_rate, 0.5)
+
+    def test_least_recently_used_is_evicted(self):
+        """Past max_accounts the account used longest ago is dropped"""
+        one, two, three = (self.write_account(name) for name in ("one", "two", "three"))
+        self.manager.get(one)
+        self.manager.get(two)
+        self.manager.get(one)
+        self.manager.get(three)
+        self.assertIn(one, self.manager)
+        self.assertNotIn(two, self.manager)
+        self.assertEqual(self.manager.stats().evictions, 1)
+
+    def test_wallet_limit(self):
+        """Past max_wallets accounts are evicted, but never the one asked for"""
+        manager = AccountManager(max_accounts=10, max_wallets=5, transactions_name=self.transactions_name)
+        self.addCleanup(manager.close)
+        small, big = self.write_account("small", 2), self.write_account("big", 6)
+        manager.get(small)
+        manager.get(big)
+        self.assertEqual(len(manager), 1)
+        self.assertIn(big, manager)
+
+    def test_default_transactions_files(self):
+        """Without transactions_name every account gets its own transactions file"""
+        manager = AccountManager()
+        self.addCleanup(manager.close)
+        one, two = manager.get(self.write_account("one")), manager.get(self.write_account("two"))
+        self.assertEqual(one.get_transactions_file_name(), os.path.join(self.directory.name, "one_transactions.csv"))
+        self.assertEqual(two.get_transactions_file_name(), os.path.join(self.directory.name, "two_transactions.csv"))
+        self.assertFalse(os.path.exists("transactions.csv"))
+
+    def test_dirty_account_saved_on_eviction(self):
+        """Unsaved changes and transactions are saved when their account is evicted"""
+        one, two, three = (self.write_account(name) for name in ("one", "two", "three"))
+        self.manager.get(one).deduct("main", "rent", 300)
+        self.manager.get(two).add("main", 50)
+        self.manager.get(three)
+        self.assertEqual(self.saved_balance("one"), 700)
+        with open(self.transactions_name(one)) as file:
+            self.assertEqual(len(file.readlines()), 2)
+        self.manager.close()
+        self.assertEqual(self.saved_balance("two"), 1050)
+
+    def test_clean_account_not_saved(self):
+        """Accounts without changes are just dropped"""
+        path = self.write_account("one")
+        account = self.manager.get(path)
+        with patch.object(account, "save") as save:
+            self.assertTrue(self.manager.evict(path))
+        save.assert_not_called()
+        self.assertFalse(self.manager.evict(path))
+
+    def test_failed_save_keeps_account(self):
+        """An account that can't be saved stays in the cache"""
+        path = self.write_account("one")
+        account = self.manager.get(path)
+        account.add("main", 10)
+        with patch.object(account, "save", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.manager.evict(path)
+        self.assertIs(self.manager.get(path), account)
+
+    def test_save_all(self):
+        """save_all only saves the accounts with changes"""
+        one, two = self.write_account("one"), self.write_account("two")
+        self.manager.get(one).add("main", 10)
+        self.manager.get(two)
+        self.assertEqual(self.manager.save_all(), 1)
+        self.assertEqual(self.saved_balance("one"), 1010)
+        self.assertEqual(self.manager.save_all(), 0)
+
+    def test_load_does_not_block_other_accounts(self):
+        """Cached accounts are served while another one loads, and an account loads once"""
+        one, two = self.write_account("one"), self.write_account("two")
+        cached = self.manager.get(one)
+        loading, release, loaded = threading.Event(), threading.Event(), threading.Event()
+        load = self.manager._load
+
+        def slow_load(wallet_name):
+            loading.set()
+            release.wait(5)
+            loaded.set()
+            return load(wallet_name)
+
+        results = []
+        with patch.object(self.manager, "_load", side_effect=slow_load) as patched_load:
+            threads = [threading.Thread(target=lambda: results.append(self.manager.get(two))) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            self.assertTrue(loading.wait(5))
+            self.assertIs(self.manager.get(one), cached)
+            self.assertFalse(loaded.is_set())
+            release.set()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(patched_load.call_count, 1)
+        self.assertIs(results[0], results[1])
+        self.assertEqual(self.manager.stats().misses, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
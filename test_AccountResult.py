@@ -0,0 +1,99 @@
+import json
+import os
+import unittest
+from unittest.mock import patch
+from Account import Account
+from AccountResult import AccountResult
+
+
+TEST_RESULT_WALLETS_FILENAME = "test_result_wallets.json"
+TEST_RESULT_TRANSACTIONS_FILENAME = "test_result_transactions.csv"
+
+
+class Unformattable:
+    def __format__(self, format_spec):
+        raise AssertionError("formatted")
+
+
+class TestAccountResult(unittest.TestCase):
+
+    def setUp(self):
+        test_wallet_data = [
+            {"name": "main", "percent": 70, "balance": 1500, "cap": 0},
+            {"name": "emergencies", "percent": 20, "balance": 500, "cap": 600},
+            {"name": "charity", "percent": 10, "balance": 200, "cap": 0}
+        ]
+        with open(TEST_RESULT_WALLETS_FILENAME, "w") as file:
+            file.write(json.dumps(test_wallet_data))
+        self.messages = []
+        self.account = Account(
+            TEST_RESULT_WALLETS_FILENAME, transactions_name=TEST_RESULT_TRANSACTIONS_FILENAME, output=self.messages.append
+        )
+        self.messages.clear()
+
+    def tearDown(self):
+        self.account.close()
+        for filename in (TEST_RESULT_WALLETS_FILENAME, TEST_RESULT_TRANSACTIONS_FILENAME):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_balance_changed(self):
+        """The first balance before of a wallet is kept"""
+        result = AccountResult('test')
+        result.balance_changed('main', 10, 20)
+        result.balance_changed('main', 20, 5)
+        self.assertEqual(result.balances, {'main': (10, 5)})
+
+    def test_messages_go_to_output(self):
+        """Messages are sent to the output instead of printed"""
+        with patch('builtins.print') as mock_print:
+            self.account.transfer('main', 'charity', 100)
+        mock_print.assert_not_called()
+        self.assertEqual(self.messages, [
+            'Balance of main changed from 1500 to 1400',
+            'Balance of charity changed from 200 to 300',
+        ])
+
+    def test_quiet(self):
+        """Without output nothing is printed nor formatted"""
+        self.account.output = None
+        with patch('builtins.print') as mock_print:
+            self.account.deposit(1000)
+            self.account.check_wallets()
+            self.account._say('{}', Unformattable())
+        mock_print.assert_not_called()
+
+    def test_deposit_result(self):
+        """Deposits return the balances they changed and the capped wallets"""
+        result = self.account.deposit(1000)
+        self.assertTrue(result)
+        self.assertEqual(result.operation, 'deposit')
+        self.assertEqual(result.balances, {
+            'emergencies': (500, 600),
+            'charity': (200, 300),
+            'main': (1500, 2300),
+        })
+        self.assertEqual(result.capped, ['emergencies'])
+
+    def test_failed_result(self):
+        """Operations that can't be done return a falsy result with the reason"""
+        result = self.account.transfer('main', 'charity', 5000)
+        self.assertFalse(result)
+        self.assertEqual(result.error, 'Money to transfer surpasses wallet amount. Please try again.')
+        self.assertEqual(self.messages, [result.error])
+        self.assertEqual(result.balances, {})
+
+    def test_deduct_result(self):
+        """Deductions return the balance change"""
+        result = self.account.deduct('charity', 'gift', 50)
+        self.assertEqual(result.balances, {'charity': (200, 150)})
+
+    def test_batch_errors(self):
+        """Batches return the errors of their operations"""
+        result = self.account.apply_batch([('add', 'charity', 10), ('add', 'travels', 10)])
+        self.assertFalse(result)
+        self.assertEqual([index for index, _ in result.errors], [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,33 +6,36 @@ from AccountTransactionHandler import AccountTransactionHandler
 class TestAccountTransactionHandler(unittest.TestCase):
     
     def setUp(self):
-        AccountTransactionHandler._empty_queued_transactions()
         self.transaction_filename = "test_transactions.csv"
+        self.handler = AccountTransactionHandler(self.transaction_filename)
         with open(self.transaction_filename, "w") as file:
             file.write(AccountTransactionHandler.headers)
 
+    def tearDown(self):
+        self.handler.close()
+
 
     def test_empty_queued_transactions(self):
         """List of queued transactions are emptied"""
-        AccountTransactionHandler._transactions.extend([1, 2, 3])
-        self.assertEqual(len(AccountTransactionHandler._transactions), 3)
+        self.handler._transactions.extend([1, 2, 3])
+        self.assertEqual(len(self.handler._transactions), 3)
 
-        AccountTransactionHandler._empty_queued_transactions()
-        self.assertEqual(len(AccountTransactionHandler._transactions), 0)
+        self.handler._empty_queued_transactions()
+        self.assertEqual(len(self.handler._transactions), 0)
 
     def test_empty_no_queued_transactions(self):
         """List of queued transactions doesn't raise error when already empty"""
-        AccountTransactionHandler._empty_queued_transactions()
-        self.assertEqual(len(AccountTransactionHandler._transactions), 0)
+        self.handler._empty_queued_transactions()
+        self.assertEqual(len(self.handler._transactions), 0)
 
     def test_show_queued_transactions(self):
         """Queued transactions are shown in standard output if they exist"""
-        AccountTransactionHandler._transactions.extend([1, 2, 3])
-        self.assertTrue(AccountTransactionHandler._show_queued_transactions())
+        self.handler._transactions.extend([1, 2, 3])
+        self.assertTrue(self.handler._show_queued_transactions())
 
     def test_show_queued_transactions_empty(self):
         """Shows error message when there are no queued transactions to show"""
-        self.assertFalse(AccountTransactionHandler._show_queued_transactions())
+        self.assertFalse(self.handler._show_queued_transactions())
 
     def test_queue_transaction(self):
         """Transactions are queued correctly"""
@@ -44,7 +47,7 @@ class TestAccountTransactionHandler(unittest.TestCase):
         balance_after1 = 30
         description1 = "test_description_1"
         entry1 = "12-06-1995 00:00:00,test_wallet_1,deduction,20,test_description_1,50,30\n"
-        AccountTransactionHandler._queue_transaction(
+        self.handler._queue_transaction(
             date=date1,
             wallet=wallet1,
             transaction_type=transaction_type,
@@ -53,8 +56,8 @@ class TestAccountTransactionHandler(unittest.TestCase):
             balance_after=balance_after1,
             description=description1
         )
-        self.assertEqual(len(AccountTransactionHandler._transactions), 1)
-        self.assertEqual(AccountTransactionHandler._transactions[0], entry1)
+        self.assertEqual(len(self.handler._transactions), 1)
+        self.assertEqual(self.handler._transactions[0], entry1)
         
         date2 = "12-06-1996 00:00:00"
         wallet2 = "test_wallet_2"
@@ -63,7 +66,7 @@ class TestAccountTransactionHandler(unittest.TestCase):
         balance_after2 = 40
         description2 = "test_description_2"
         entry2 = "12-06-1996 00:00:00,test_wallet_2,deduction,50,test_description_2,90,40\n"
-        AccountTransactionHandler._queue_transaction(
+        self.handler._queue_transaction(
             date=date2,
             wallet=wallet2,
             transaction_type=transaction_type,
@@ -72,9 +75,9 @@ class TestAccountTransactionHandler(unittest.TestCase):
             balance_after=balance_after2,
             description=description2
         )
-        self.assertEqual(len(AccountTransactionHandler._transactions), 2)
-        self.assertEqual(AccountTransactionHandler._transactions[0], entry1)
-        self.assertEqual(AccountTransactionHandler._transactions[1], entry2)
+        self.assertEqual(len(self.handler._transactions), 2)
+        self.assertEqual(self.handler._transactions[0], entry1)
+        self.assertEqual(self.handler._transactions[1], entry2)
 
     def test_queue_transaction_no_description(self):
         """Transactions are queued correctly"""
@@ -85,7 +88,7 @@ class TestAccountTransactionHandler(unittest.TestCase):
         balance_before1 = 50
         balance_after1 = 30
         entry1 = "12-06-1995 00:00:00,test_wallet_1,deduction,20,no_description,50,30\n"
-        AccountTransactionHandler._queue_transaction(
+        self.handler._queue_transaction(
             date=date1,
             wallet=wallet1,
             transaction_type=transaction_type,
@@ -93,13 +96,13 @@ class TestAccountTransactionHandler(unittest.TestCase):
             balance_before=balance_before1,
             balance_after=balance_after1,
         )
-        self.assertEqual(len(AccountTransactionHandler._transactions), 1)
-        self.assertEqual(AccountTransactionHandler._transactions[0], entry1)
+        self.assertEqual(len(self.handler._transactions), 1)
+        self.assertEqual(self.handler._transactions[0], entry1)
 
     def test_insert_transaction_error(self):
         """Returns False and do nothing if the transaction file doesn't exist"""
         os.remove(self.transaction_filename)
-        self.assertFalse(AccountTransactionHandler._insert_queued_transactions(self.transaction_filename))
+        self.assertFalse(self.handler._insert_queued_transactions())
         self.assertFalse(os.path.exists(self.transaction_filename))
 
     def test_insert_transaction_success(self):
@@ -112,7 +115,7 @@ class TestAccountTransactionHandler(unittest.TestCase):
         balance_after1 = 30
         description1 = "test_description_1"
         entry1 = "12-06-1995 00:00:00,test_wallet_1,deduction,20,test_description_1,50,30\n"
-        AccountTransactionHandler._queue_transaction(
+        self.handler._queue_transaction(
             date=date1,
             wallet=wallet1,
             transaction_type=transaction_type,
@@ -129,7 +132,7 @@ class TestAccountTransactionHandler(unittest.TestCase):
         balance_after2 = 40
         description2 = "test_description_2"
         entry2 = "12-06-1996 00:00:00,test_wallet_2,deduction,50,test_description_2,90,40\n"
-        AccountTransactionHandler._queue_transaction(
+        self.handler._queue_transaction(
             date=date2,
             wallet=wallet2,
             transaction_type=transaction_type,
@@ -139,8 +142,8 @@ class TestAccountTransactionHandler(unittest.TestCase):
             description=description2
         )
 
-        self.assertTrue(AccountTransactionHandler._insert_queued_transactions(self.transaction_filename))
-        self.assertListEqual(AccountTransactionHandler._transactions, [])
+        self.assertTrue(self.handler._insert_queued_transactions())
+        self.assertListEqual(self.handler._transactions, [])
         with open(self.transaction_filename, "r") as file:
             rows = file.readlines()
             self.assertEqual(len(rows), 3)
@@ -151,7 +154,7 @@ class TestAccountTransactionHandler(unittest.TestCase):
         """Transactions file is created if it doesn't exist"""
         os.remove(self.transaction_filename)
         self.assertFalse(os.path.exists(self.transaction_filename))
-        self.assertTrue(AccountTransactionHandler._init_transactions_file(self.transaction_filename))
+        self.assertTrue(self.handler._init_transactions_file())
         self.assertTrue(os.path.exists(self.transaction_filename))
         with open(self.transaction_filename, "r") as file:
             content = file.read()
@@ -160,13 +163,51 @@ class TestAccountTransactionHandler(unittest.TestCase):
     def test_init_transactions_file_already_exists(self):
         """Do nothing and return True if the transaction file already exists"""
         self.assertTrue(os.path.exists(self.transaction_filename))
-        self.assertFalse(AccountTransactionHandler._init_transactions_file(self.transaction_filename))
+        self.assertFalse(self.handler._init_transactions_file())
         self.assertTrue(os.path.exists(self.transaction_filename))
         with open(self.transaction_filename, "r") as file:
             content = file.read()
             self.assertEqual(content, AccountTransactionHandler.headers)
 
-    
+    def test_queues_are_per_handler(self):
+        """Each handler only inserts its own queued transactions"""
+        other = AccountTransactionHandler("test_other_transactions.csv")
+        self.addCleanup(os.remove, "test_other_transactions.csv")
+        self.addCleanup(other.close)
+        other._init_transactions_file()
+        other._queue_transaction("12-06-1995 00:00:00", "other", "deduction", 5, 10, 5)
+        self.handler._queue_transaction("12-06-1995 00:00:00", "mine", "deduction", 20, 50, 30)
+
+        self.assertTrue(self.handler._insert_queued_transactions())
+        self.assertEqual(len(other._transactions), 1)
+        with open(self.transaction_filename) as file:
+            rows = file.readlines()
+        self.assertEqual(len(rows), 2)
+        self.assertIn(",mine,", rows[1])
+
+    def test_file_kept_open(self):
+        """The transactions file is opened once for many inserts"""
+        self.handler._insert_queued_transactions()
+        file = self.handler._file
+        for amount in range(3):
+            self.handler._queue_transaction("12-06-1995 00:00:00", "main", "deduction", amount, 50, 50 - amount)
+            self.assertTrue(self.handler._insert_queued_transactions())
+            self.assertIs(self.handler._file, file)
+        with open(self.transaction_filename) as file:
+            self.assertEqual(len(file.readlines()), 4)
+
+    def test_replaced_file_is_reopened(self):
+        """Inserts go to the current file after it's replaced"""
+        self.handler._queue_transaction("12-06-1995 00:00:00", "main", "deduction", 20, 50, 30)
+        self.handler._insert_queued_transactions()
+        os.remove(self.transaction_filename)
+        self.handler._init_transactions_file()
+        self.handler._queue_transaction("12-06-1996 00:00:00", "main", "deduction", 10, 30, 20)
+        self.assertTrue(self.handler._insert_queued_transactions())
+        with open(self.transaction_filename) as file:
+            rows = file.readlines()
+        self.assertEqual(rows, [AccountTransactionHandler.headers, "12-06-1996 00:00:00,main,deduction,10,no_description,30,20\n"])
+
 
 if __name__ == "__main__":
     unittest.main(buffer=True)
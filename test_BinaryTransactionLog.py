@@ -0,0 +1,115 @@
+import os
+import unittest
+from datetime import datetime
+from BinaryTransactionLog import BinaryTransactionLog, binary_to_csv, csv_to_binary
+from TransactionDate import date_from_key
+from TransactionHistory import TransactionHistory
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+TEST_CSV_FILENAME = "test_binary_transactions.csv"
+TEST_BINARY_FILENAME = "test_binary_transactions.bin"
+TEST_CSV_COPY_FILENAME = "test_binary_transactions_copy.csv"
+
+CSV_CONTENT = (
+    "date,wallet,transaction_type,amount,description,balance_before,balance_after\n"
+    "01-05-2023 00:00:00,main,deduction,60,test description 1,100,40\n"
+    "12-05-2023 10:30:00,charity,deduction,50,\"quoted, with comma\",90,40\n"
+    "20-05-2023 23:59:59,main,deduction,40,\"say \"\"hi\"\"\nand bye\",40,0\n"
+    "03-06-2023 00:00:00,café,deduction,30,\"no_description\",30,0\n"
+)
+
+
+class TestBinaryTransactionLog(unittest.TestCase):
+
+    def setUp(self):
+        with open(TEST_CSV_FILENAME, "w", newline="") as file:
+            file.write(CSV_CONTENT)
+
+    def tearDown(self):
+        for filename in (
+            TEST_CSV_FILENAME,
+            TEST_CSV_COPY_FILENAME,
+            TEST_BINARY_FILENAME,
+            f"{TEST_BINARY_FILENAME}.heap",
+            f"{TEST_BINARY_FILENAME}.names",
+        ):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_round_trip(self):
+        """csv -> binary -> csv gives back the same file"""
+        self.assertEqual(csv_to_binary(TEST_CSV_FILENAME, TEST_BINARY_FILENAME, batch_size=3), 4)
+        self.assertEqual(binary_to_csv(TEST_BINARY_FILENAME, TEST_CSV_COPY_FILENAME), 4)
+        with open(TEST_CSV_COPY_FILENAME, newline="") as file:
+            self.assertEqual(file.read(), CSV_CONTENT)
+
+    def test_transactions(self):
+        """Records read back as the same transactions the csv file has"""
+        csv_to_binary(TEST_CSV_FILENAME, TEST_BINARY_FILENAME)
+        log = BinaryTransactionLog(TEST_BINARY_FILENAME)
+        history = TransactionHistory(TEST_CSV_FILENAME)
+        history.load_transactions()
+        self.assertEqual(len(log), 4)
+        self.assertEqual(list(log.transactions()), list(history.transactions))
+
+    def test_fixed_width_records(self):
+        """Every record has the same size"""
+        csv_to_binary(TEST_CSV_FILENAME, TEST_BINARY_FILENAME)
+        self.assertEqual(os.path.getsize(TEST_BINARY_FILENAME), 4 * BinaryTransactionLog.RECORD.size)
+        first = next(BinaryTransactionLog(TEST_BINARY_FILENAME).records())
+        self.assertEqual(first[3:6], (60, 100, 40))
+
+    def test_append(self):
+        """Appended transactions keep the ids of known names"""
+        csv_to_binary(TEST_CSV_FILENAME, TEST_BINARY_FILENAME)
+        log = BinaryTransactionLog(TEST_BINARY_FILENAME)
+        transaction = next(log.transactions())
+        BinaryTransactionLog(TEST_BINARY_FILENAME).append([transaction])
+        log = BinaryTransactionLog(TEST_BINARY_FILENAME)
+        self.assertEqual(log.wallet_names, ["main", "charity", "café"])
+        self.assertEqual(list(log.transactions())[-1], transaction)
+
+    def test_smaller_than_csv(self):
+        """Records and descriptions take less space than the csv rows"""
+        csv_to_binary(TEST_CSV_FILENAME, TEST_BINARY_FILENAME)
+        log = BinaryTransactionLog(TEST_BINARY_FILENAME)
+        self.assertLess(
+            os.path.getsize(TEST_BINARY_FILENAME) + os.path.getsize(log.heap_filename),
+            len(CSV_CONTENT.encode()) - len(log.headers),
+        )
+
+    def test_date_out_of_range(self):
+        """Dates a record can't hold are refused"""
+        with open(TEST_CSV_FILENAME, "a") as file:
+            file.write("03-06-1960 00:00:00,main,deduction,30,test,30,0\n")
+        with self.assertRaises(ValueError):
+            csv_to_binary(TEST_CSV_FILENAME, TEST_BINARY_FILENAME)
+
+    def test_not_convertible(self):
+        """Rows that would change are refused"""
+        with open(TEST_CSV_FILENAME, "a") as file:
+            file.write("03-06-2023 00:00:00,main,deduction,0030,test,30,0\n")
+        with self.assertRaises(ValueError):
+            csv_to_binary(TEST_CSV_FILENAME, TEST_BINARY_FILENAME)
+
+    @unittest.skipUnless(numpy, "numpy is not installed")
+    def test_array(self):
+        """Records can be read as a numpy array without parsing"""
+        csv_to_binary(TEST_CSV_FILENAME, TEST_BINARY_FILENAME)
+        records = BinaryTransactionLog(TEST_BINARY_FILENAME).array()
+        self.assertEqual(records.dtype.itemsize, BinaryTransactionLog.RECORD.size)
+        self.assertEqual(records["amount"].tolist(), [60, 50, 40, 30])
+        self.assertEqual((records["type_flags"] & BinaryTransactionLog.QUOTED_DESCRIPTION).tolist(), [0, 1, 1, 1])
+        self.assertEqual(
+            date_from_key(records["date"][1]),
+            datetime(2023, 5, 12, 10, 30)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
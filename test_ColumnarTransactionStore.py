@@ -0,0 +1,110 @@
+import unittest
+from datetime import datetime
+from Transaction import Transaction
+
+try:
+    import numpy
+    from ColumnarTransactionStore import ColumnarTransactionStore
+except ImportError:
+    numpy = None
+
+
+def make_transaction(day: int, wallet: str, amount: int, description: str = "test") -> Transaction:
+    return Transaction(
+        date=datetime(2023, 5, day, 12, 30),
+        wallet=wallet,
+        transaction_type="deduction",
+        amount=amount,
+        description=description,
+        balance_before=amount + 10,
+        balance_after=10,
+    )
+
+
+@unittest.skipUnless(numpy, "numpy is not installed")
+class TestColumnarTransactionStore(unittest.TestCase):
+
+    def setUp(self):
+        self.transactions = [
+            make_transaction(1, "main", 60, "café"),
+            make_transaction(2, "charity", 40, ""),
+            make_transaction(3, "main", 30, "rent, may"),
+            make_transaction(4, "home", 20),
+        ]
+        self.store = ColumnarTransactionStore()
+        self.store.extend(self.transactions[:2])
+        self.store.extend(self.transactions[2:])
+
+    def test_rows_materialized(self):
+        """Rows read back as equal Transaction objects"""
+        self.assertEqual(len(self.store), 4)
+        self.assertEqual(list(self.store), self.transactions)
+        self.assertEqual(self.store[-1], self.transactions[-1])
+        with self.assertRaises(IndexError):
+            self.store[4]
+
+    def test_dictionary_encoding(self):
+        """Wallet names are stored once"""
+        self.assertEqual(self.store.wallet_names, ["main", "charity", "home"])
+        self.assertEqual(self.store.type_names, ["deduction"])
+
+    def test_grows_past_capacity(self):
+        """Many extends keep every row"""
+        for day in range(1, 29):
+            self.store.extend([make_transaction(day, "main", day)] * 100)
+        self.assertEqual(len(self.store), 2804)
+        self.assertEqual(self.store[2803].amount, 28)
+
+    def test_select(self):
+        """Selections filter by date and wallet"""
+        selection = self.store.select(datetime(2023, 5, 2), datetime(2023, 5, 3, 23, 59, 59))
+        self.assertEqual(list(selection), self.transactions[1:3])
+        selection = self.store.select(datetime(2023, 5, 1), datetime(2023, 5, 31), "main")
+        self.assertEqual(selection.total(), 90)
+        self.assertEqual(len(self.store.select(datetime(2023, 5, 1), datetime(2023, 5, 31), "travels")), 0)
+
+    def test_wallet_statistics(self):
+        """Per wallet totals keep the order of first appearance"""
+        selection = self.store.select(datetime(2023, 5, 1), datetime(2023, 5, 31))
+        self.assertEqual(
+            selection.wallet_statistics(),
+            {
+                "main": {"total": 90, "transactions": 2},
+                "charity": {"total": 40, "transactions": 1},
+                "home": {"total": 20, "transactions": 1},
+            }
+        )
+
+    def test_out_of_order_rows_merged(self):
+        """Rows older than the last one are merged by date with their descriptions"""
+        late = [make_transaction(2, "travels", 5, "late one"), make_transaction(1, "travels", 6, "")]
+        self.store.extend(late)
+        self.assertEqual(
+            list(self.store),
+            [self.transactions[0], late[1], self.transactions[1], late[0]] + self.transactions[2:]
+        )
+        selection = self.store.select(datetime(2023, 5, 2), datetime(2023, 5, 2, 23, 59, 59))
+        self.assertEqual(list(selection), [self.transactions[1], late[0]])
+
+    def test_wallet_select_after_merge(self):
+        """Wallet queries still work after rows were merged by date"""
+        self.store.extend([make_transaction(2, "main", 5), make_transaction(30, "home", 1)])
+        selection = self.store.select(datetime(2023, 5, 2), datetime(2023, 5, 31), "main")
+        self.assertEqual([transaction.amount for transaction in selection], [5, 30])
+        selection = self.store.select(datetime(2023, 5, 1), datetime(2023, 5, 31), "home")
+        self.assertEqual([transaction.amount for transaction in selection], [20, 1])
+
+    def test_extend_with_nothing(self):
+        """Extending with no rows keeps the store as it is"""
+        self.store.extend([])
+        self.assertEqual(list(self.store), self.transactions)
+
+    def test_clear(self):
+        """Clear removes every row"""
+        self.store.clear()
+        self.assertEqual(len(self.store), 0)
+        self.assertEqual(self.store.wallet_names, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
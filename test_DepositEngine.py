@@ -0,0 +1,123 @@
+import copy
+import random
+import unittest
+from unittest.mock import patch
+from Account import Account
+from DepositEngine import DepositEngine, np
+from Wallet import Wallet
+from WalletList import WalletList
+
+
+def reference_deposit(wallets: WalletList, amount: int) -> None:
+    """The per wallet loop of Account.deposit"""
+    main = wallets.get('main')
+    remaining = amount
+    for wallet in [wallet for wallet in wallets if wallet.percent > 0 and wallet.name != 'main']:
+        part = (amount * wallet.percent) // 100
+        wallet.balance += part
+        remaining -= part
+        if wallet.cap and wallet.balance > wallet.cap:
+            main.balance += wallet.balance - wallet.cap
+            wallet.balance = wallet.cap
+            wallet.percent = 0
+    main.balance += remaining
+
+
+def random_wallets(seed: int, size: int) -> WalletList:
+    generator = random.Random(seed)
+    wallets = WalletList([Wallet('main', generator.randrange(10000), 0, 0)])
+    for number in range(size):
+        cap = generator.choice([0, generator.randrange(1, 5000)])
+        balance = generator.randrange(cap or 5000)
+        wallets.append(Wallet(f'wallet_{number}', balance, generator.choice([0, 0, 1, 2, 3]), cap))
+    wallets.get('main').percent = 100 - sum(wallet.percent for wallet in wallets)
+    return wallets
+
+
+def snapshot(wallets: WalletList) -> list:
+    return [wallet.to_dict() for wallet in wallets]
+
+
+class TestDepositEngine(unittest.TestCase):
+
+    def engines(self, make_wallets):
+        """An engine without numpy and one with it (if installed), each on new wallets"""
+        yield DepositEngine(make_wallets(), use_numpy=False)
+        if np is not None:
+            yield DepositEngine(make_wallets())
+
+    def test_same_as_account_deposit(self):
+        """Balances, percents and main are the same as the per wallet loop"""
+        for seed in range(20):
+            expected = random_wallets(seed, 30)
+            amounts = [random.Random(seed).randrange(1, 100000) for _ in range(3)]
+            for amount in amounts:
+                reference_deposit(expected, amount)
+            for engine in self.engines(lambda: random_wallets(seed, 30)):
+                for amount in amounts:
+                    engine.deposit(amount)
+                self.assertEqual(snapshot(engine.wallets), snapshot(expected))
+
+    def test_result(self):
+        """The result tells which wallets were capped and what main got"""
+        for engine in self.engines(lambda: WalletList([
+            Wallet('main', 1500, 70, 0),
+            Wallet('emergencies', 500, 20, 600),
+            Wallet('charity', 200, 10, 1000),
+        ])):
+            result = engine.deposit(1000)
+            self.assertEqual(result.deposited, 2)
+            self.assertEqual(result.capped, ['emergencies'])
+            self.assertEqual(result.to_main, 800)
+
+    def test_wallet_changes_refresh_arrays(self):
+        """Changes made to the wallets between deposits are used"""
+        for engine in self.engines(lambda: WalletList([Wallet('main', 0, 50, 0), Wallet('savings', 0, 50, 0)])):
+            engine.deposit(100)
+            engine.wallets.get('savings').balance = 0
+            engine.wallets.append(Wallet('travels', 0, 0, 0))
+            engine.deposit(100)
+            self.assertEqual(engine.wallets.get('savings').balance, 50)
+            self.assertEqual(engine.wallets.get('main').balance, 100)
+
+    def test_large_amounts(self):
+        """Amounts too large for 64 bit integers are still exact"""
+        amount = 10 ** 30 + 7
+        for engine in self.engines(lambda: WalletList([Wallet('main', 0, 67, 0), Wallet('savings', 0, 33, 0)])):
+            engine.deposit(amount)
+            self.assertEqual(engine.wallets.get('savings').balance, (amount * 33) // 100)
+            self.assertEqual(engine.wallets.get('main').balance, amount - (amount * 33) // 100)
+
+    def test_no_main(self):
+        """Deposits need a main wallet"""
+        with self.assertRaises(ValueError):
+            DepositEngine(WalletList([Wallet('savings', 0, 100, 0)])).deposit(100)
+
+    def test_account_uses_engine(self):
+        """Accounts with many wallets deposit with the engine"""
+        with patch('builtins.print'):
+            account = Account()
+        account.wallets.clear()
+        account.wallets.extend(map(copy.copy, random_wallets(1, 50)))
+        expected = random_wallets(1, 50)
+        reference_deposit(expected, 12345)
+
+        with patch.object(Account, 'deposit_engine_threshold', 10), patch('builtins.print') as mock_print:
+            account.deposit(12345)
+        self.assertEqual(snapshot(account.wallets), snapshot(expected))
+        self.assertLessEqual(mock_print.call_count, 3)
+
+    def test_account_loop_matches_reference(self):
+        """Below the threshold, Account.deposit gives the same as the reference loop"""
+        with patch('builtins.print'):
+            account = Account()
+            account.wallets.clear()
+            account.wallets.extend(map(copy.copy, random_wallets(2, 50)))
+            account.deposit(12345)
+        expected = random_wallets(2, 50)
+        reference_deposit(expected, 12345)
+        self.assertEqual(snapshot(account.wallets), snapshot(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from Account import Account
+from GroupCommit import GroupCommit
+
+
+TEST_COMMIT_FILENAME = "test_commit.csv"
+TEST_COMMIT_WALLETS_FILENAME = "test_commit_wallets.json"
+TEST_COMMIT_TRANSACTIONS_FILENAME = "test_commit_transactions.csv"
+
+
+class TestGroupCommit(unittest.TestCase):
+
+    def setUp(self):
+        with open(TEST_COMMIT_FILENAME, "w") as file:
+            file.write("data\n")
+
+    def tearDown(self):
+        if os.path.exists(TEST_COMMIT_FILENAME):
+            os.remove(TEST_COMMIT_FILENAME)
+
+    def run_threads(self, commit: GroupCommit, count: int) -> None:
+        threads = [
+            threading.Thread(target=commit.sync, args=([TEST_COMMIT_FILENAME],)) for _ in range(count)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_invalid_durability(self):
+        """Unknown durabilities are rejected"""
+        with self.assertRaises(ValueError):
+            GroupCommit("always")
+
+    def test_none(self):
+        """No fsync at all without durability"""
+        commit = GroupCommit("none")
+        with patch("os.fsync") as fsync:
+            commit.sync([TEST_COMMIT_FILENAME])
+            commit.close()
+        fsync.assert_not_called()
+
+    def test_commit(self):
+        """Each commit is synced before sync returns"""
+        commit = GroupCommit("commit", window=0)
+        commit.sync([TEST_COMMIT_FILENAME])
+        commit.sync([TEST_COMMIT_FILENAME])
+        self.assertEqual(commit.fsyncs, 2)
+
+    def test_concurrent_commits_share_fsync(self):
+        """Commits within the window share one fsync"""
+        commit = GroupCommit("commit", window=0.2)
+        self.run_threads(commit, 8)
+        self.assertLess(commit.fsyncs, 8)
+
+    def test_max_batch(self):
+        """A full group is synced without waiting for the window"""
+        commit = GroupCommit("commit", window=30, max_batch=4)
+        release = threading.Event()
+        fsync = os.fsync
+
+        def slow_fsync(descriptor):
+            release.wait()
+            fsync(descriptor)
+
+        start = time.monotonic()
+        with patch("os.fsync", side_effect=slow_fsync):
+            # the group forms behind a commit that is still syncing
+            first = threading.Thread(target=commit.sync, args=([TEST_COMMIT_FILENAME],))
+            first.start()
+            while commit._group == 0:
+                time.sleep(0.001)
+            threads = [threading.Thread(target=commit.sync, args=([TEST_COMMIT_FILENAME],)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            while commit._group < 2:
+                time.sleep(0.001)
+            release.set()
+            for thread in [first] + threads:
+                thread.join()
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertEqual(commit.fsyncs, 2)
+
+    def test_lone_commit_does_not_wait(self):
+        """A commit with no other one syncing doesn't wait for the window"""
+        commit = GroupCommit("commit", window=30)
+        start = time.monotonic()
+        commit.sync([TEST_COMMIT_FILENAME])
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertEqual(commit.fsyncs, 1)
+
+    def test_periodic(self):
+        """Periodic commits return at once and are synced in the background"""
+        commit = GroupCommit("periodic", interval=0.01)
+        commit.sync([TEST_COMMIT_FILENAME])
+        deadline = time.monotonic() + 5
+        while commit.fsyncs == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        commit.close()
+        self.assertGreaterEqual(commit.fsyncs, 1)
+
+    def test_missing_paths_are_skipped(self):
+        """Files renamed or removed before the fsync are skipped"""
+        commit = GroupCommit("commit", window=0)
+        commit.sync(["no_such_file.tmp"])
+        self.assertEqual(commit.fsyncs, 0)
+
+    def test_error_is_raised(self):
+        """A failed fsync is raised to the commits waiting for it"""
+        commit = GroupCommit("commit", window=0)
+        with patch("os.fsync", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                commit.sync([TEST_COMMIT_FILENAME])
+        self.assertEqual(commit._errors, {})
+        commit.sync([TEST_COMMIT_FILENAME])
+
+
+class TestAccountGroupCommit(unittest.TestCase):
+
+    def setUp(self):
+        with open(TEST_COMMIT_WALLETS_FILENAME, "w") as file:
+            file.write(json.dumps([{"name": "main", "percent": 100, "balance": 1500, "cap": 0}]))
+        self.commit = GroupCommit("commit", window=0)
+        self.account = self.open_account(self.commit)
+
+    def tearDown(self):
+        self.account.close()
+        for filename in (TEST_COMMIT_WALLETS_FILENAME, TEST_COMMIT_TRANSACTIONS_FILENAME):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def open_account(self, commit: GroupCommit) -> Account:
+        return Account(
+            TEST_COMMIT_WALLETS_FILENAME, transactions_name=TEST_COMMIT_TRANSACTIONS_FILENAME,
+            output=None, group_commit=commit,
+        )
+
+    def test_save_syncs_files(self):
+        """Saves sync the transactions, the wallets file and its directory"""
+        self.account.deduct('main', 'rent', 500)
+        with patch.object(self.commit, "sync", wraps=self.commit.sync) as sync:
+            self.account.save()
+        self.assertEqual(sync.call_count, 2)
+        first_paths = sync.call_args_list[0].args[0]
+        self.assertIn(TEST_COMMIT_TRANSACTIONS_FILENAME, first_paths)
+        self.assertFalse(os.path.exists(f"{TEST_COMMIT_WALLETS_FILENAME}.tmp"))
+        with open(TEST_COMMIT_WALLETS_FILENAME) as file:
+            self.assertEqual(json.load(file)[0]["balance"], 1000)
+
+    def test_periodic_syncs_wallets_file(self):
+        """With periodic durability the wallets file is synced by its final name"""
+        self.account.close()
+        commit = GroupCommit("periodic", interval=60)
+        self.addCleanup(commit.close)
+        self.account = self.open_account(commit)
+        self.account.deduct('main', 'rent', 500)
+        self.account.save()
+        self.assertIn(TEST_COMMIT_WALLETS_FILENAME, commit._pending)
+        self.assertIn(TEST_COMMIT_TRANSACTIONS_FILENAME, commit._pending)
+        self.assertNotIn(f"{TEST_COMMIT_WALLETS_FILENAME}.tmp", commit._pending)
+
+
+if __name__ == "__main__":
+    unittest.main()
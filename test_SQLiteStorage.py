@@ -0,0 +1,262 @@
+import json
+import os
+import sqlite3
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from Account import Account
+from AccountTransactionHandler import AccountTransactionHandler
+from SQLiteStorage import SQLiteStorage, SQLiteTransactionHistory, migrate_to_sqlite
+from TransactionSummary import sort_key
+
+
+TEST_DATABASE_FILENAME = "test_wallets.sqlite"
+TEST_MIGRATION_WALLETS_FILENAME = "test_migration_wallets.json"
+TEST_MIGRATION_TRANSACTIONS_FILENAME = "test_migration_transactions.csv"
+
+
+def remove_database(filename: str) -> None:
+    for name in (filename, f"{filename}-wal", f"{filename}-shm"):
+        if os.path.exists(name):
+            os.remove(name)
+
+
+class TestSQLiteStorage(unittest.TestCase):
+
+    def setUp(self):
+        remove_database(TEST_DATABASE_FILENAME)
+        with patch('builtins.print'):
+            self.account = self.reopen()
+            self.account.add_wallet('emergencies', percent=20)
+            self.account.add_wallet('charity', percent=10)
+            self.account.save()
+
+    def tearDown(self):
+        remove_database(TEST_DATABASE_FILENAME)
+        for filename in (TEST_MIGRATION_WALLETS_FILENAME, TEST_MIGRATION_TRANSACTIONS_FILENAME):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def reopen(self) -> Account:
+        return Account(TEST_DATABASE_FILENAME, storage="sqlite")
+
+    def test_new_database(self):
+        """A new database starts with the main wallet only"""
+        remove_database(TEST_DATABASE_FILENAME)
+        with patch('builtins.print'):
+            account = self.reopen()
+        self.assertEqual(list(account.wallets.names()), ['main'])
+
+    def test_open_readonly(self):
+        """A read only account reads the database without changing it"""
+        account = Account.open_readonly(TEST_DATABASE_FILENAME, storage="sqlite", output=None)
+        self.addCleanup(account.close)
+        self.assertEqual(list(account.wallets.names()), ['main', 'emergencies', 'charity'])
+        self.assertFalse(account.save())
+
+    def test_open_readonly_missing_database(self):
+        """No database is created for a read only account"""
+        account = Account.open_readonly("test_missing.sqlite", storage="sqlite", output=None)
+        with self.assertRaises(sqlite3.OperationalError):
+            account.total()
+        self.assertFalse(os.path.exists("test_missing.sqlite"))
+
+    def test_reload(self):
+        """Saved wallets come back in the same order"""
+        with patch('builtins.print'):
+            self.account.add('charity', 300)
+            self.account.save()
+            account = self.reopen()
+        self.assertEqual(list(account.wallets.names()), ['main', 'emergencies', 'charity'])
+        self.assertEqual(account.get_wallet('charity').balance, 300)
+        self.assertEqual(account.get_wallet('emergencies').percent, 20)
+
+    def test_types_saved(self):
+        """Wallet types and locations are saved"""
+        with patch('builtins.print'):
+            self.account.set_type('charity', 'lends')
+            self.account.set_location('charity', 'bank')
+            self.account.save()
+            account = self.reopen()
+        self.assertEqual(account.get_wallet('charity').to_dict()['wallet_type'], 'lends')
+        self.assertEqual(account.total_location('bank'), '$0')
+
+    def test_database_without_types(self):
+        """Databases saved before wallet types get the columns, wallets get the default types"""
+        self.account.close()
+        connection = sqlite3.connect(TEST_DATABASE_FILENAME)
+        with connection:
+            connection.execute("ALTER TABLE wallets DROP COLUMN wallet_type")
+            connection.execute("ALTER TABLE wallets DROP COLUMN location")
+        connection.close()
+        account = Account.open_readonly(TEST_DATABASE_FILENAME, storage="sqlite", output=None)
+        self.addCleanup(account.close)
+        self.assertEqual(account.get_wallet('emergencies').wallet_type, 'savings')
+        with patch('builtins.print'):
+            account = self.reopen()
+            account.set_location('charity', 'cash')
+            account.save()
+        self.addCleanup(account.close)
+        self.assertEqual(self.reopen().total_location('cash'), '$0')
+
+    def test_save_only_changed_wallets(self):
+        """Saves only write the wallets that changed"""
+        storage = SQLiteStorage(TEST_DATABASE_FILENAME)
+        self.addCleanup(storage.close)
+        with patch('builtins.print'):
+            self.account.add('charity', 300)
+        with patch.object(SQLiteStorage, '_apply_changes') as apply_changes:
+            with patch('builtins.print'):
+                self.account.save()
+        changes = apply_changes.call_args.args[0]
+        self.assertEqual([change['wallet']['name'] for change in changes], ['charity'])
+
+    def test_rename_and_delete(self):
+        """Renamed and deleted wallets are saved"""
+        with patch('builtins.print'):
+            self.account.rename('charity', 'gifts')
+            self.account.delete_wallet('emergencies')
+            self.account.save()
+            account = self.reopen()
+        self.assertEqual(list(account.wallets.names()), ['main', 'gifts'])
+
+    def test_transactions_saved_with_wallets(self):
+        """Queued transactions are inserted when saving"""
+        with patch('builtins.print'):
+            self.account.add('charity', 1000)
+            self.account.deduct('charity', 'first', 300)
+            self.account.deduct('charity', 'with, comma', 200)
+            self.account.save()
+        self.assertEqual(self.account.transaction_handler._transactions, [])
+        history = SQLiteTransactionHistory(TEST_DATABASE_FILENAME)
+        self.addCleanup(history.storage.close)
+        transactions = list(history.iter_query(wallet='charity'))
+        self.assertEqual([transaction.amount for transaction in transactions], [300, 200])
+        self.assertEqual(transactions[1].description, 'with, comma')
+
+    def test_failed_save_is_rolled_back(self):
+        """Wallets and transactions are saved together or not at all"""
+        with patch('builtins.print'):
+            self.account.add('charity', 300)
+        self.account.transaction_handler._transactions.append("not a transaction\n")
+        with patch('builtins.print'), self.assertRaises(ValueError):
+            self.account.save()
+        with patch('builtins.print'):
+            account = self.reopen()
+        self.assertEqual(account.get_wallet('charity').balance, 0)
+        storage = SQLiteStorage(TEST_DATABASE_FILENAME)
+        self.addCleanup(storage.close)
+        self.assertEqual(storage.total(datetime.min, datetime.max), 0)
+
+    def test_query(self):
+        """Queries, totals and aggregates run on the database"""
+        with patch('builtins.print'):
+            self.account.add('charity', 1000)
+            self.account.add('emergencies', 1000)
+            self.account.deduct('charity', 'first', 300)
+            self.account.deduct('emergencies', 'second', 200)
+            self.account.deduct('charity', 'third', 50)
+            self.account.save()
+        history = SQLiteTransactionHistory(TEST_DATABASE_FILENAME)
+        self.addCleanup(history.storage.close)
+        with patch('builtins.print'):
+            self.assertTrue(history.query())
+        self.assertEqual(len(history.queried_transactions), 3)
+        self.assertEqual(history.queried_balance(), 550)
+        self.assertEqual(history._wallet_statistics(), {
+            'charity': {'total': 350, 'transactions': 2},
+            'emergencies': {'total': 200, 'transactions': 1},
+        })
+        with patch('builtins.print'):
+            self.assertTrue(history.query(wallet='charity'))
+        self.assertEqual(history.queried_balance(), 350)
+        with patch('builtins.print'):
+            self.assertFalse(history.query(to_date='01-01-2000'))
+
+    def test_summary_and_totals(self):
+        """Wallet statistics and totals come from the database, without summary or rollups files"""
+        with patch('builtins.print'):
+            self.account.add('charity', 1000)
+            self.account.add('emergencies', 500)
+            self.account.deduct('charity', 'first', 300)
+            self.account.deduct('emergencies', 'second', 200)
+            self.account.deduct('charity', 'third', 50)
+            self.account.save()
+        history = SQLiteTransactionHistory(TEST_DATABASE_FILENAME)
+        self.addCleanup(history.storage.close)
+        summary = history.wallet_summary()
+        self.assertEqual(list(summary), ['charity', 'emergencies'])
+        self.assertEqual(
+            {key: summary['charity'][key] for key in ('total', 'transactions', 'min', 'max')},
+            {'total': 350, 'transactions': 2, 'min': 50, 'max': 300},
+        )
+        self.assertLessEqual(sort_key(summary['charity']['first']), sort_key(summary['charity']['last']))
+        self.assertEqual(history.totals(), (550, 3))
+        self.assertEqual(history.totals(wallet='charity', transaction_type='deduction'), (350, 2))
+        self.assertEqual(history.totals(transaction_type='deposit'), (0, 0))
+        self.assertEqual(history.totals(to_date='01-01-2000'), (0, 0))
+        for suffix in ('.summary', '.rollups'):
+            self.assertFalse(os.path.exists(f"{TEST_DATABASE_FILENAME}{suffix}"))
+
+    def test_iter_query_reads_the_cursor(self):
+        """iter_query yields the transactions as the database returns them, without a list first"""
+        with patch('builtins.print'):
+            self.account.add('charity', 1000)
+            self.account.deduct('charity', 'first', 300)
+            self.account.deduct('charity', 'second', 200)
+            self.account.save()
+        history = SQLiteTransactionHistory(TEST_DATABASE_FILENAME)
+        self.addCleanup(history.storage.close)
+        with patch.object(history.storage, 'transactions') as transactions:
+            query = history.iter_query(wallet='charity')
+            self.assertEqual(next(query).description, 'first')
+            self.assertEqual([transaction.description for transaction in query], ['second'])
+        transactions.assert_not_called()
+
+    def test_backup(self):
+        """The backup is a copy of the database, with the changes still in its write-ahead log"""
+        backup_filename = os.path.join("backup", "test_wallets_backup.sqlite")
+        self.addCleanup(remove_database, backup_filename)
+        with patch('builtins.print'):
+            self.account.add('charity', 1000)
+            self.account.deduct('charity', 'gift', 300)
+            self.account.save()
+            self.assertTrue(self.account.backup())
+        storage = SQLiteStorage(backup_filename, readonly=True)
+        self.addCleanup(storage.close)
+        self.assertEqual({wallet["name"]: wallet["balance"] for wallet in storage.load_wallets()}["charity"], 700)
+        self.assertEqual(len(storage.transactions(datetime.min, datetime.max)), 1)
+
+    def test_migration(self):
+        """JSON wallets and csv transactions are copied into a new database"""
+        remove_database(TEST_DATABASE_FILENAME)
+        with open(TEST_MIGRATION_WALLETS_FILENAME, 'w') as file:
+            json.dump([
+                {"name": "main", "percent": 70, "balance": 1500, "cap": 0},
+                {"name": "charity", "percent": 30, "balance": 200, "cap": 0},
+            ], file)
+        with open(TEST_MIGRATION_TRANSACTIONS_FILENAME, 'w') as file:
+            file.write(AccountTransactionHandler.headers)
+            file.write("01-02-2023 10:00:00,charity,add,200,\"a, b\",0,200\n")
+            file.write("02-02-2023 10:00:00,main,add,1500,no_description,0,1500\n")
+
+        migrate_to_sqlite(
+            TEST_MIGRATION_WALLETS_FILENAME, TEST_MIGRATION_TRANSACTIONS_FILENAME, TEST_DATABASE_FILENAME
+        )
+        with patch('builtins.print'):
+            account = self.reopen()
+        self.assertEqual(list(account.wallets.names()), ['main', 'charity'])
+        storage = SQLiteStorage(TEST_DATABASE_FILENAME)
+        self.addCleanup(storage.close)
+        transactions = storage.transactions(datetime.min, datetime.max)
+        self.assertEqual(transactions[0].description, 'a, b')
+        self.assertEqual(transactions[1].date, datetime(2023, 2, 2, 10))
+
+        with self.assertRaises(ValueError):
+            migrate_to_sqlite(
+                TEST_MIGRATION_WALLETS_FILENAME, TEST_MIGRATION_TRANSACTIONS_FILENAME, TEST_DATABASE_FILENAME
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
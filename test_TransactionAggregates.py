@@ -0,0 +1,61 @@
+import unittest
+from datetime import datetime
+from Transaction import Transaction
+from TransactionAggregates import Count, Sum, WalletTotals, aggregate, feed
+
+
+def make_transaction(wallet: str, amount: int) -> Transaction:
+    return Transaction(
+        date=datetime(2023, 5, 1),
+        wallet=wallet,
+        transaction_type="deduction",
+        amount=amount,
+        description="test",
+        balance_before=amount,
+        balance_after=0,
+    )
+
+
+class TestTransactionAggregates(unittest.TestCase):
+
+    def setUp(self):
+        self.transactions = [
+            make_transaction("main", 60),
+            make_transaction("charity", 40),
+            make_transaction("main", 30),
+        ]
+
+    def test_aggregate_single_pass(self):
+        """Several aggregates share one pass over a generator"""
+        transactions = (transaction for transaction in self.transactions)
+        total, count, wallets = aggregate(transactions, Sum(), Count(), WalletTotals())
+        self.assertEqual(total, 130)
+        self.assertEqual(count, 3)
+        self.assertEqual(
+            wallets,
+            {
+                "main": {"total": 90, "transactions": 2},
+                "charity": {"total": 40, "transactions": 1},
+            }
+        )
+
+    def test_empty(self):
+        """Aggregates of nothing are zero"""
+        self.assertEqual(aggregate([], Sum(), Count(), WalletTotals()), [0, 0, {}])
+
+    def test_feed(self):
+        """feed passes the transactions on while aggregating them"""
+        total = Sum()
+        exported = [transaction.wallet for transaction in feed(self.transactions, total)]
+        self.assertEqual(exported, ["main", "charity", "main"])
+        self.assertEqual(total.result, 130)
+
+    def test_feed_stops_early(self):
+        """Aggregates only see the transactions consumed"""
+        count = Count()
+        next(feed(self.transactions, count))
+        self.assertEqual(count.result, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
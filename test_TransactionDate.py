@@ -0,0 +1,74 @@
+import unittest
+from datetime import datetime
+from TransactionDate import DATE_FORMAT, date_key, parse_date, parse_date_key
+
+
+class TestParseDate(unittest.TestCase):
+
+    def assertSameAsStrptime(self, text: str) -> None:
+        try:
+            expected = datetime.strptime(text, DATE_FORMAT)
+        except ValueError as error:
+            with self.assertRaises(ValueError) as context:
+                parse_date(text)
+            self.assertEqual(str(context.exception), str(error))
+        else:
+            self.assertEqual(parse_date(text), expected)
+
+    def test_valid_dates(self):
+        """Valid dates are parsed like strptime does"""
+        self.assertEqual(parse_date("12-06-1995 08:30:59"), datetime(1995, 6, 12, 8, 30, 59))
+        for text in (
+            "01-01-2023 00:00:00",
+            "31-12-2023 23:59:59",
+            "29-02-2024 12:00:00",
+            "12-06-1995 00:00:00",
+        ):
+            self.assertSameAsStrptime(text)
+
+    def test_cached_day_reused(self):
+        """Rows of the same day get their own time"""
+        self.assertEqual(parse_date("02-07-2023 10:00:00"), datetime(2023, 7, 2, 10))
+        self.assertEqual(parse_date("02-07-2023 11:30:00"), datetime(2023, 7, 2, 11, 30))
+
+    def test_invalid_dates(self):
+        """Invalid dates raise the same errors strptime raises"""
+        for text in (
+            "29-02-2023 00:00:00",
+            "31-04-2023 00:00:00",
+            "00-01-2023 00:00:00",
+            "01-13-2023 00:00:00",
+            "01-01-2023 24:00:00",
+            "01-01-2023 00:60:00",
+            "01-01-2023 00:00:61",
+            "01/01/2023 00:00:00",
+            "01-01-2023T00:00:00",
+            "+1-01-2023 00:00:00",
+            "01-01-2023 0_:00:00",
+            "01-01-0000 00:00:00",
+            "01-01-2023 00:00:00 ",
+            "01-01-2023",
+            "",
+        ):
+            self.assertSameAsStrptime(text)
+
+    def test_non_fixed_width(self):
+        """Layouts that strptime accepts without padding still work"""
+        for text in ("1-5-2023 0:0:0", "01-05-2023 1:02:03", "١٢-06-1995 00:00:00"):
+            self.assertSameAsStrptime(text)
+
+    def test_other_format(self):
+        """Other formats go to strptime"""
+        self.assertEqual(parse_date("1995-06-12", "%Y-%m-%d"), datetime(1995, 6, 12))
+
+    def test_date_key(self):
+        """parse_date_key gives the date_key of parse_date, and its errors"""
+        for text in ("12-06-1995 08:30:59", "31-12-2023 23:59:59", "01-01-1970 00:00:00", "1-5-2023 0:0:0"):
+            self.assertEqual(parse_date_key(text), date_key(parse_date(text)))
+        for text in ("29-02-2023 00:00:00", "01-01-2023 24:00:00", "01-01-2023 00:00:61", ""):
+            with self.assertRaises(ValueError):
+                parse_date_key(text)
+
+
+if __name__ == "__main__":
+    unittest.main()
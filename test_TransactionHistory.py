@@ -1,8 +1,15 @@
+import os
 import unittest
+from unittest.mock import patch
 from TransactionHistory import TransactionHistory
 from Transaction import Transaction
 from datetime import datetime
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 TEST_TRANSACTIONS_FILENAME = "test_transactions.csv"
 
@@ -108,6 +115,18 @@ class TestTransactionHistory(unittest.TestCase):
         self.th.query(wallet="main")
         self.assertEqual(self.th.queried_balance(), 100)
 
+    def test_iter_query(self) -> None:
+        """iter_query yields the same transactions query finds"""
+        transactions = list(self.th.iter_query(from_date="01-05-2023", to_date="30-06-2023", wallet="main"))
+        self.assertEqual([transaction.amount for transaction in transactions], [60, 30])
+        self.assertEqual(len(self.th.queried_transactions), 0)
+
+    def test_iter_query_stops_early(self) -> None:
+        """iter_query is lazy"""
+        transactions = self.th.iter_query()
+        self.assertEqual(next(transactions).amount, 60)
+        transactions.close()
+
     def test_parse_transaction_entry(self) -> None:
         """Convert transaction dictionaries into Transaction objects"""
         transaction_dict = {
@@ -130,6 +149,160 @@ class TestTransactionHistory(unittest.TestCase):
         self.assertEqual(transaction.balance_after, 150)
 
 
+@unittest.skipUnless(numpy, "numpy is not installed")
+class TestColumnarTransactionHistory(TestTransactionHistory):
+    """Same queries, on the columnar backend"""
+
+    def setUp(self):
+        self.th = TransactionHistory(TEST_TRANSACTIONS_FILENAME, backend="columnar")
+
+    def test_aggregated_transactions(self) -> None:
+        """Aggregates match the ones of the list backend"""
+        self.th.query(from_date="01-05-2023", to_date="30-06-2023")
+        list_history = TransactionHistory(TEST_TRANSACTIONS_FILENAME)
+        list_history.query(from_date="01-05-2023", to_date="30-06-2023")
+        self.assertEqual(
+            self.th.queried_transactions.wallet_statistics(),
+            list_history._wallet_statistics()
+        )
+        self.assertEqual(list(self.th.queried_transactions), list_history.queried_transactions)
+
+    def test_invalid_backend(self) -> None:
+        """Unknown backends are rejected"""
+        with self.assertRaises(ValueError):
+            TransactionHistory(TEST_TRANSACTIONS_FILENAME, backend="sql")
+
+
+class TestScanTransactionHistory(TestTransactionHistory):
+    """Same queries, reading the file with the scan backend"""
+
+    def setUp(self):
+        self.th = TransactionHistory(TEST_TRANSACTIONS_FILENAME, backend="scan")
+
+    def test_query_does_not_load(self) -> None:
+        """Queries don't load the whole file"""
+        self.assertTrue(self.th.query(wallet="charity"))
+        self.assertEqual(len(self.th.transactions), 0)
+        self.assertEqual(self.th.queried_balance(), 60)
+
+
+class TestIncrementalLoad(unittest.TestCase):
+
+    filename = "test_incremental_transactions.csv"
+    headers = "date,wallet,transaction_type,amount,description,balance_before,balance_after\n"
+    backend = "list"
+
+    def setUp(self):
+        with open(self.filename, "w") as file:
+            file.write(self.headers)
+            file.write("01-05-2023 00:00:00,main,deduction,60,test description 1,3,0\n")
+        self.th = TransactionHistory(self.filename, backend=self.backend)
+        self.th.load_transactions()
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def append(self, *rows: str) -> None:
+        with open(self.filename, "a") as file:
+            file.writelines(rows)
+
+    def test_appended_rows_loaded(self) -> None:
+        """Only new rows are parsed on later loads"""
+        self.append("12-05-2023 00:00:00,charity,deduction,50,test description 2,3,0\n")
+        with patch.object(self.th, "_parse_transaction_entry", wraps=self.th._parse_transaction_entry) as parse:
+            self.assertEqual(self.th.load_transactions(), 0)
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual(len(self.th.transactions), 2)
+        self.assertEqual(self.th.transactions[1].wallet, "charity")
+
+    def test_bad_row_fails(self) -> None:
+        """A row that can't be parsed fails the load and adds no rows"""
+        self.append(
+            "12-05-2023 00:00:00,charity,deduction,50,test description 2,3,0\n",
+            "13-05-2023 00:00:00,charity,deduction,fifty,test description 3,3,0\n",
+        )
+        with patch("builtins.print"):
+            self.assertEqual(self.th.load_transactions(), 2)
+        self.assertEqual(len(self.th.transactions), 1)
+
+    def test_no_new_rows(self) -> None:
+        """Loading an unchanged file keeps the transactions"""
+        self.assertEqual(self.th.load_transactions(), 0)
+        self.assertEqual(len(self.th.transactions), 1)
+
+    def test_partial_row_waits(self) -> None:
+        """A row without its line end is loaded once it's complete"""
+        self.append("12-05-2023 00:00:00,charity,deduction,50,")
+        self.th.load_transactions()
+        self.assertEqual(len(self.th.transactions), 1)
+        self.append("test description 2,3,0\n")
+        self.th.load_transactions()
+        self.assertEqual(len(self.th.transactions), 2)
+        self.assertEqual(self.th.transactions[1].description, "test description 2")
+
+    def test_truncated_file_reloaded(self) -> None:
+        """Truncated files are fully loaded again"""
+        with open(self.filename, "w") as file:
+            file.write(self.headers)
+        self.th.load_transactions()
+        self.assertEqual(len(self.th.transactions), 0)
+
+    def test_rewritten_file_reloaded(self) -> None:
+        """Files rewritten with different rows are fully loaded again"""
+        with open(self.filename, "w") as file:
+            file.write(self.headers)
+            file.write("02-05-2023 00:00:00,home,deduction,70,test description 3,3,0\n")
+            file.write("03-05-2023 00:00:00,home,deduction,80,test description 4,3,0\n")
+        self.th.load_transactions()
+        self.assertEqual([transaction.amount for transaction in self.th.transactions], [70, 80])
+
+    def test_out_of_order_rows_queried(self) -> None:
+        """Rows appended out of date order are found by date queries"""
+        self.append(
+            "20-05-2023 00:00:00,charity,deduction,50,test description 2,3,0\n",
+            "10-05-2023 00:00:00,home,deduction,40,test description 3,3,0\n",
+        )
+        self.assertTrue(self.th.query(from_date="05-05-2023", to_date="15-05-2023"))
+        self.assertEqual([transaction.wallet for transaction in self.th.queried_transactions], ["home"])
+        self.assertEqual([transaction.date.day for transaction in self.th.transactions], [1, 10, 20])
+
+    def test_touched_file_without_new_rows(self) -> None:
+        """A file touched or with only part of a new row loads no rows"""
+        self.append("12-05-2023 00:00:00,char")
+        os.utime(self.filename)
+        self.assertEqual(self.th.load_transactions(), 0)
+        self.assertEqual(len(self.th.transactions), 1)
+
+    def test_replaced_file_reloaded(self) -> None:
+        """Files replaced by another one are fully loaded again"""
+        replacement = f"{self.filename}.new"
+        with open(replacement, "w") as file:
+            file.write(self.headers)
+            file.write("02-05-2023 00:00:00,home,deduction,70,test description 3,3,0\n")
+        os.replace(replacement, self.filename)
+        self.th.load_transactions()
+        self.assertEqual([transaction.wallet for transaction in self.th.transactions], ["home"])
+
+
+
+@unittest.skipUnless(numpy, "numpy is not installed")
+class TestColumnarIncrementalLoad(TestIncrementalLoad):
+    """Same loads, on the columnar backend"""
+
+    backend = "columnar"
+
+    def test_appended_rows_loaded(self) -> None:
+        """Only new rows are parsed on later loads, straight into the columns"""
+        self.append("12-05-2023 00:00:00,charity,deduction,50,test description 2,3,0\n")
+        with patch.object(self.th, "_parse_columns", wraps=self.th._parse_columns) as parse, \
+                patch.object(self.th, "_parse_transaction_entry") as parse_entry:
+            self.assertEqual(self.th.load_transactions(), 0)
+        self.assertEqual(parse.call_args.args[0].count(b"\n"), 1)
+        parse_entry.assert_not_called()
+        self.assertEqual(len(self.th.transactions), 2)
+        self.assertEqual(self.th.transactions[1].wallet, "charity")
+        self.assertEqual(self.th.transactions[1].date.day, 12)
+
 if __name__ == '__main__':
     if TransactionHistory(TEST_TRANSACTIONS_FILENAME).filename == "test_transactions.csv":
         unittest.main(buffer=True)
@@ -0,0 +1,70 @@
+import unittest
+from datetime import datetime
+from Transaction import Transaction
+from TransactionList import TransactionList
+
+
+def make_transaction(day: int, wallet: str = "main", amount: int = 10) -> Transaction:
+    return Transaction(
+        date=datetime(2023, 5, day),
+        wallet=wallet,
+        transaction_type="deduction",
+        amount=amount,
+        description="test",
+        balance_before=amount,
+        balance_after=0,
+    )
+
+
+class TestTransactionList(unittest.TestCase):
+
+    def setUp(self):
+        self.transactions = TransactionList(make_transaction(day) for day in (1, 3, 5, 7))
+
+    def test_in_order_rows_appended(self):
+        """Rows in date order go at the end"""
+        self.transactions.extend([make_transaction(7, amount=1), make_transaction(9)])
+        self.assertEqual([transaction.date.day for transaction in self.transactions], [1, 3, 5, 7, 7, 9])
+        self.assertEqual(self.transactions.dates, [transaction.date for transaction in self.transactions])
+        self.assertEqual(self.transactions[4].amount, 1)
+
+    def test_out_of_order_rows_merged(self):
+        """Older rows are merged into their place, after rows of the same date"""
+        self.transactions.extend([make_transaction(6), make_transaction(3, amount=2), make_transaction(2)])
+        self.assertEqual([transaction.date.day for transaction in self.transactions], [1, 2, 3, 3, 5, 6, 7])
+        self.assertEqual(self.transactions[3].amount, 2)
+        self.assertEqual(self.transactions.dates, [transaction.date for transaction in self.transactions])
+
+    def test_select(self):
+        """Date ranges include both ends"""
+        selected = self.transactions.select(datetime(2023, 5, 3), datetime(2023, 5, 5))
+        self.assertEqual([transaction.date.day for transaction in selected], [3, 5])
+        self.assertEqual(self.transactions.select(datetime(2023, 5, 8), datetime(2023, 5, 9)), [])
+
+    def test_select_wallet(self):
+        """Selections can be limited to a wallet"""
+        self.transactions.append(make_transaction(4, "home"))
+        selected = self.transactions.select(datetime(2023, 5, 1), datetime(2023, 5, 31), "home")
+        self.assertEqual([transaction.date.day for transaction in selected], [4])
+
+    def test_wallet_posting_lists(self):
+        """Each wallet keeps its own rows sorted by date"""
+        self.transactions.extend([make_transaction(6, "home"), make_transaction(2, "home")])
+        self.assertEqual(sorted(self.transactions.wallets), ["home", "main"])
+        home = self.transactions.wallets["home"]
+        self.assertEqual([transaction.date.day for transaction in home], [2, 6])
+        self.assertIsNone(home.wallets)
+        selected = self.transactions.select(datetime(2023, 5, 3), datetime(2023, 5, 31), "home")
+        self.assertEqual([transaction.date.day for transaction in selected], [6])
+        self.assertEqual(self.transactions.select(datetime(2023, 5, 1), datetime(2023, 5, 31), "travels"), [])
+
+    def test_clear(self):
+        """Clear empties the dates too"""
+        self.transactions.clear()
+        self.assertEqual(len(self.transactions), 0)
+        self.assertEqual(self.transactions.dates, [])
+        self.assertEqual(self.transactions.wallets, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import random
+import unittest
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+from AccountTransactionHandler import AccountTransactionHandler
+from TransactionHistory import TransactionHistory
+from TransactionRollups import TransactionRollups
+
+
+TEST_ROLLUPS_TRANSACTIONS_FILENAME = "test_rollups_transactions.csv"
+
+
+class TestTransactionRollups(unittest.TestCase):
+
+    def setUp(self):
+        generator = random.Random(7)
+        start = datetime(2023, 1, 20)
+        with open(TEST_ROLLUPS_TRANSACTIONS_FILENAME, "w") as file:
+            file.write(AccountTransactionHandler.headers)
+            for _ in range(400):
+                moment = start + timedelta(seconds=generator.randrange(120 * 24 * 3600))
+                wallet = generator.choice(["main", "charity", "home"])
+                transaction_type = generator.choice(["deduction", "deposit"])
+                file.write(f"{moment:%d-%m-%Y %H:%M:%S},{wallet},{transaction_type},{generator.randrange(1, 100)},test,0,0\n")
+        self.history = TransactionHistory(TEST_ROLLUPS_TRANSACTIONS_FILENAME)
+
+    def tearDown(self):
+        for filename in (TEST_ROLLUPS_TRANSACTIONS_FILENAME, self.history.rollups.filename):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def expected(self, from_date=None, to_date=None, wallet=None, transaction_type=None):
+        transactions = [
+            transaction for transaction in self.history.iter_query(from_date, to_date, wallet)
+            if transaction_type is None or transaction.transaction_type == transaction_type
+        ]
+        return sum(transaction.amount for transaction in transactions), len(transactions)
+
+    def test_buckets(self):
+        """Whole months come from the monthly buckets, the other days from the daily ones"""
+        rollups = TransactionRollups(TEST_ROLLUPS_TRANSACTIONS_FILENAME)
+        keys = [key for _, key in rollups._buckets(date(2023, 1, 30), date(2023, 4, 2))]
+        self.assertEqual(keys, ["2023-01-30", "2023-01-31", "2023-02", "2023-03", "2023-04-01", "2023-04-02"])
+
+    def test_totals_match_the_transactions(self):
+        """Totals are the same as adding up the queried transactions"""
+        ranges = [
+            ("20-01-2023", "19-05-2023"), ("01-02-2023", "31-03-2023"), ("15-02-2023", "02-04-2023"),
+            ("03-03-2023", "03-03-2023"), (None, "28-02-2023"), ("01-04-2023", None),
+        ]
+        for from_date, to_date in ranges:
+            for wallet in (None, "charity"):
+                for transaction_type in (None, "deposit"):
+                    with self.subTest(from_date=from_date, to_date=to_date, wallet=wallet, type=transaction_type):
+                        self.assertEqual(
+                            self.history.totals(from_date, to_date, wallet, transaction_type),
+                            self.expected(from_date, to_date, wallet, transaction_type),
+                        )
+
+    def test_partial_days_scanned(self):
+        """Rows of a partial day at the edge of the range are read from the file"""
+        now = datetime.now()
+        with open(TEST_ROLLUPS_TRANSACTIONS_FILENAME, "a") as file:
+            file.write(f"{now:%d-%m-%Y} 00:00:00,main,deposit,5,today,0,5\n")
+            file.write(f"{now + timedelta(days=1):%d-%m-%Y} 00:00:00,main,deposit,7,tomorrow,0,7\n")
+        with patch.object(self.history.scanner, "scan", wraps=self.history.scanner.scan) as scan:
+            total, count = self.history.totals("01-05-2023", wallet="main")
+        self.assertEqual((total, count), self.expected("01-05-2023", wallet="main"))
+        self.assertEqual(scan.call_args.args[0], datetime.combine(now.date(), datetime.min.time()))
+
+    def test_partial_days_seek(self):
+        """Only the bytes holding the rows of a partial day are read"""
+        size = os.path.getsize(TEST_ROLLUPS_TRANSACTIONS_FILENAME)
+        today = f"{datetime.now():%d-%m-%Y}"
+        with open(TEST_ROLLUPS_TRANSACTIONS_FILENAME, "a") as file:
+            file.write(f"{today} 00:00:00,main,deposit,5,today,0,5\n")
+            file.write("10-02-2023 12:00:00,home,deduction,1000,rent,0,0\n")
+            file.write(f'{today} 00:00:01,home,deposit,7,"two\nlines",0,7\n')
+        with patch.object(self.history.scanner, "scan", wraps=self.history.scanner.scan) as scan:
+            self.assertEqual(self.history.totals(today), (12, 2))
+        start, end = scan.call_args.args[3:]
+        self.assertEqual(start, size)
+        self.assertEqual(end, os.path.getsize(TEST_ROLLUPS_TRANSACTIONS_FILENAME))
+        self.assertEqual(self.history.totals(today, wallet="home"), (7, 1))
+
+    def test_appended_rows(self):
+        """Rows appended later are added to the rollups, the others are not read again"""
+        self.history.totals("01-02-2023", "28-02-2023")
+        with open(TEST_ROLLUPS_TRANSACTIONS_FILENAME, "a") as file:
+            file.write("10-02-2023 12:00:00,home,deduction,1000,rent,0,0\n")
+        before = self.history.rollups.totals(date(2023, 2, 1), date(2023, 2, 28))
+        with patch.object(self.history.rollups, "_add_rows", wraps=self.history.rollups._add_rows) as add_rows:
+            total, count = self.history.totals("01-02-2023", "28-02-2023")
+        self.assertEqual((total, count), (before[0] + 1000, before[1] + 1))
+        self.assertEqual(add_rows.call_count, 1)
+
+        history = TransactionHistory(TEST_ROLLUPS_TRANSACTIONS_FILENAME)
+        with patch.object(history.rollups, "_add_rows") as add_rows:
+            self.assertEqual(history.totals("01-02-2023", "28-02-2023"), (total, count))
+        add_rows.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import unittest
+from datetime import datetime
+from TransactionHistory import TransactionHistory
+from TransactionScanner import TransactionScanner
+
+
+TEST_SCAN_FILENAME = "test_scan_transactions.csv"
+
+
+class TestTransactionScanner(unittest.TestCase):
+
+    def setUp(self):
+        with open(TEST_SCAN_FILENAME, "w") as file:
+            file.write("date,wallet,transaction_type,amount,description,balance_before,balance_after\n")
+            file.write("01-05-2023 00:00:00,main,deduction,60,\"rent, may\",3,0\n")
+            file.write("12-05-2023 10:00:00,mainly,deduction,50,test description 2,3,0\n")
+            file.write("20-05-2023 00:00:00,charity,deduction,40,\"two\nlines\",3,0\n")
+            file.write("03-06-2023 00:00:00,main,deduction,30,test description 4,3,0\n")
+            file.write("3-6-2023 12:00:00,main,deduction,20,short date,3,0\n")
+        history = TransactionHistory(TEST_SCAN_FILENAME)
+        self.parse = history._parse_transaction_entry
+        self.scanner = TransactionScanner(TEST_SCAN_FILENAME, self.parse)
+
+    def tearDown(self):
+        os.remove(TEST_SCAN_FILENAME)
+
+    def test_scan_all(self):
+        """Every row is found, including quoted commas and line breaks"""
+        transactions = list(self.scanner.scan())
+        self.assertEqual(len(transactions), 5)
+        self.assertEqual(transactions[0].description, "rent, may")
+        self.assertEqual(transactions[2].description, "two\nlines")
+
+    def test_scan_wallet(self):
+        """Wallet names are matched whole"""
+        amounts = [transaction.amount for transaction in self.scanner.scan(wallet="main")]
+        self.assertEqual(amounts, [60, 30, 20])
+
+    def test_scan_dates(self):
+        """Date ranges include both ends, for any date layout"""
+        transactions = self.scanner.scan(datetime(2023, 5, 12, 10), datetime(2023, 6, 3, 12))
+        self.assertEqual([transaction.amount for transaction in transactions], [50, 40, 30, 20])
+
+    def test_only_matches_parsed(self):
+        """Rows that don't match are not parsed"""
+        parsed = []
+
+        def parse(entry):
+            parsed.append(entry)
+            return self.parse(entry)
+
+        scanner = TransactionScanner(TEST_SCAN_FILENAME, parse)
+        self.assertEqual(len(list(scanner.scan(datetime(2023, 5, 20), datetime(2023, 5, 20, 23)))), 1)
+        # the short date row can't be checked on raw bytes
+        self.assertEqual(len(parsed), 2)
+
+    def test_partial_last_row_skipped(self):
+        """A row still being written is left out"""
+        with open(TEST_SCAN_FILENAME, "a") as file:
+            file.write("04-06-2023 00:00:00,main,deduc")
+        self.assertEqual(len(list(self.scanner.scan())), 5)
+
+    def test_empty_file(self):
+        """Empty files have no transactions"""
+        open(TEST_SCAN_FILENAME, "w").close()
+        self.assertEqual(list(self.scanner.scan()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import json
+import os
+import unittest
+from unittest.mock import patch
+from AccountTransactionHandler import AccountTransactionHandler
+from TransactionHistory import TransactionHistory
+from TransactionSummary import TransactionSummary
+
+
+TEST_SUMMARY_TRANSACTIONS_FILENAME = "test_summary_transactions.csv"
+
+
+class TestTransactionSummary(unittest.TestCase):
+
+    def setUp(self):
+        with open(TEST_SUMMARY_TRANSACTIONS_FILENAME, "w") as file:
+            file.write(AccountTransactionHandler.headers)
+            file.write("12-05-2023 00:00:00,main,deduction,60,rent,100,40\n")
+            file.write("01-05-2023 00:00:00,main,deposit,20,salary,80,100\n")
+            file.write("20-05-2023 00:00:00,charity,deduction,40,gift,50,10\n")
+        self.summary = TransactionSummary(TEST_SUMMARY_TRANSACTIONS_FILENAME)
+
+    def tearDown(self):
+        for filename in (TEST_SUMMARY_TRANSACTIONS_FILENAME, self.summary.filename):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def append(self, *rows: str) -> None:
+        with open(TEST_SUMMARY_TRANSACTIONS_FILENAME, "a") as file:
+            file.writelines(rows)
+
+    def test_built_from_the_transactions(self):
+        """A missing summary is built from the transactions file and saved"""
+        self.assertEqual(self.summary.load()["main"], {
+            "total": 80, "transactions": 2, "first": "01-05-2023 00:00:00", "last": "12-05-2023 00:00:00",
+            "min": 20, "max": 60,
+        })
+        self.assertEqual(list(self.summary.wallets), ["main", "charity"])
+        with open(self.summary.filename) as file:
+            self.assertEqual(json.load(file)["data"], self.summary.wallets)
+
+    def test_saved_summary_is_used(self):
+        """A summary up to date doesn't read the transactions again"""
+        self.summary.load()
+        summary = TransactionSummary(TEST_SUMMARY_TRANSACTIONS_FILENAME)
+        with patch.object(summary, "_add_rows") as add_rows:
+            self.assertEqual(summary.load()["charity"]["total"], 40)
+        add_rows.assert_not_called()
+
+    def test_appended_rows_read(self):
+        """Rows appended by others are added on the next load, the rest is not read again"""
+        self.summary.load()
+        self.append("03-06-2023 00:00:00,charity,deduction,5,gift,10,5\n", "04-06-2023 00:00:00,char")
+        summary = TransactionSummary(TEST_SUMMARY_TRANSACTIONS_FILENAME)
+        rows_read = []
+        original_add_rows = summary._add_rows
+
+        def add_rows(rows):
+            rows_read.extend(rows)
+            original_add_rows(rows_read)
+
+        with patch.object(summary, "_add_rows", side_effect=add_rows):
+            statistics = summary.load()["charity"]
+        self.assertEqual(len(rows_read), 1)
+        self.assertEqual(statistics["transactions"], 2)
+        self.assertEqual(statistics["last"], "03-06-2023 00:00:00")
+        self.assertEqual(statistics["min"], 5)
+
+        self.append("ity,deduction,1,gift,5,4\n")
+        self.assertEqual(summary.load()["charity"]["total"], 46)
+
+    def test_rewritten_file_rebuilds(self):
+        """The summary is built again if the transactions file was rewritten"""
+        self.summary.load()
+        with open(TEST_SUMMARY_TRANSACTIONS_FILENAME, "w") as file:
+            file.write(AccountTransactionHandler.headers)
+            file.write("12-05-2023 00:00:00,main,deduction,60,rent,100,40\n")
+            file.write("01-05-2023 00:00:00,home,deposit,20,salary,80,100\n")
+            file.write("20-05-2023 00:00:00,home,deduction,40,gift,50,10\n")
+        self.assertEqual(set(TransactionSummary(TEST_SUMMARY_TRANSACTIONS_FILENAME).load()), {"main", "home"})
+
+    def test_unreadable_summary_rebuilds(self):
+        """A broken summary file is built again"""
+        with open(self.summary.filename, "w") as file:
+            file.write('{"offset": 12')
+        self.assertEqual(self.summary.load()["main"]["total"], 80)
+
+    def test_handler_updates_summary(self):
+        """The rows appended by the handler are added to a loaded summary, which is written on close"""
+        handler = AccountTransactionHandler(TEST_SUMMARY_TRANSACTIONS_FILENAME)
+        handler.summary.load()
+        handler._queue_transaction("01-06-2023 00:00:00", "main", "deduction", 10, 40, 30)
+        handler._insert_queued_transactions()
+        handler._queue_transaction("02-06-2023 00:00:00", "home", "deposit", 90, 0, 90)
+        with patch.object(handler.summary, "load") as load, patch.object(handler.summary, "_write") as write:
+            handler._insert_queued_transactions()
+        load.assert_not_called()
+        write.assert_not_called()
+        handler.close()
+
+        history = TransactionHistory(TEST_SUMMARY_TRANSACTIONS_FILENAME)
+        with patch.object(history.summary, "_add_rows") as add_rows:
+            statistics = history.wallet_summary()
+        add_rows.assert_not_called()
+        self.assertEqual(statistics["main"]["transactions"], 3)
+        self.assertEqual(statistics["home"]["total"], 90)
+
+    def test_handler_leaves_summary_for_later(self):
+        """Inserting doesn't build the summary, it's read from the transactions file on the next load"""
+        handler = AccountTransactionHandler(TEST_SUMMARY_TRANSACTIONS_FILENAME)
+        handler._queue_transaction("01-06-2023 00:00:00", "main", "deduction", 10, 40, 30)
+        with patch.object(handler.summary, "_add_rows") as add_rows:
+            handler._insert_queued_transactions()
+            handler.close()
+        add_rows.assert_not_called()
+        self.assertFalse(os.path.exists(self.summary.filename))
+        self.assertEqual(self.summary.load()["main"]["transactions"], 3)
+
+    def test_missing_transactions_file(self):
+        """Without a transactions file there are no statistics"""
+        os.remove(TEST_SUMMARY_TRANSACTIONS_FILENAME)
+        with patch('builtins.print'):
+            self.assertEqual(TransactionHistory(TEST_SUMMARY_TRANSACTIONS_FILENAME).wallet_summary(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
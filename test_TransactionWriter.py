@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+import unittest
+from Account import Account
+from AccountTransactionHandler import AccountTransactionHandler
+from TransactionWriter import TransactionWriter
+
+
+TEST_WRITER_FILENAME = "test_writer_transactions.csv"
+TEST_WRITER_WALLETS_FILENAME = "test_writer_wallets.json"
+
+
+class TestTransactionWriter(unittest.TestCase):
+
+    def setUp(self):
+        with open(TEST_WRITER_FILENAME, "w") as file:
+            file.write(AccountTransactionHandler.headers)
+
+    def tearDown(self):
+        if os.path.exists(TEST_WRITER_FILENAME):
+            os.remove(TEST_WRITER_FILENAME)
+
+    def read_lines(self) -> list:
+        with open(TEST_WRITER_FILENAME) as file:
+            return file.read().splitlines()
+
+    def test_flush(self):
+        """Lines written before flush are in the file after it"""
+        writer = TransactionWriter(TEST_WRITER_FILENAME)
+        self.addCleanup(writer.close)
+        for number in range(100):
+            writer.write([f"line {number}\n"])
+        writer.flush()
+        lines = self.read_lines()
+        self.assertEqual(len(lines), 101)
+        self.assertEqual(lines[-1], "line 99")
+
+    def test_close(self):
+        """Closing writes the pending lines and stops the thread"""
+        writer = TransactionWriter(TEST_WRITER_FILENAME)
+        writer.write(["first\n", "second\n"])
+        writer.close()
+        self.assertEqual(self.read_lines()[1:], ["first", "second"])
+        self.assertFalse(writer._thread.is_alive())
+        with self.assertRaises(ValueError):
+            writer.write(["third\n"])
+        writer.close()
+
+    def test_coalesced_writes(self):
+        """Lines queued while the thread is busy are written together"""
+        writer = TransactionWriter(TEST_WRITER_FILENAME)
+        self.addCleanup(writer.close)
+        busy = threading.Event()
+        batches = []
+        write = writer._write
+
+        def slow_write(file, lines):
+            busy.wait()
+            if lines:
+                batches.append(len(lines))
+            return write(file, lines)
+
+        writer._write = slow_write
+        for number in range(50):
+            writer.write([f"line {number}\n"])
+        busy.set()
+        writer.flush()
+        self.assertEqual(sum(batches), 50)
+        self.assertLessEqual(len(batches), 2)
+
+    def test_error_is_raised_to_caller(self):
+        """A failed write is raised by the next call"""
+        writer = TransactionWriter(os.path.join("no_such_directory", TEST_WRITER_FILENAME))
+        writer.write(["line\n"])
+        with self.assertRaises(OSError):
+            writer.flush()
+        with self.assertRaises(OSError):
+            writer.write(["other line\n"])
+        with self.assertRaises(OSError):
+            writer.close()
+
+
+class TestBackgroundWrites(unittest.TestCase):
+
+    def setUp(self):
+        test_wallet_data = [
+            {"name": "main", "percent": 70, "balance": 1500, "cap": 0},
+            {"name": "charity", "percent": 30, "balance": 200, "cap": 0}
+        ]
+        with open(TEST_WRITER_WALLETS_FILENAME, "w") as file:
+            file.write(json.dumps(test_wallet_data))
+        with open(TEST_WRITER_FILENAME, "w") as file:
+            file.write(AccountTransactionHandler.headers)
+        self.account = Account(
+            TEST_WRITER_WALLETS_FILENAME, transactions_name=TEST_WRITER_FILENAME, output=None, background_writes=True
+        )
+
+    def tearDown(self):
+        self.account.close()
+        for filename in (TEST_WRITER_FILENAME, TEST_WRITER_WALLETS_FILENAME):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_save_hands_transactions_to_writer(self):
+        """save() queues the transactions for the writer, flush() waits for them"""
+        self.account.deduct('charity', 'gift', 50)
+        self.account.deduct('main', 'rent', 500)
+        self.account.save()
+        self.assertEqual(self.account.transaction_handler._transactions, [])
+        self.account.flush()
+        with open(TEST_WRITER_FILENAME) as file:
+            lines = file.read().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn(',main,deduction,500,"rent",1500,1000', lines[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -47,5 +47,18 @@ class TestWallet(unittest.TestCase):
         test_wallet -= 50
         self.assertEqual(test_wallet.balance, 0)
 
+    def test_default_types(self):
+        """Wallets without a type get one from their name"""
+        self.assertEqual(Wallet('main').wallet_type, 'main')
+        self.assertEqual(Wallet('emergencies').wallet_type, 'savings')
+        self.assertEqual(Wallet('food').wallet_type, 'regular')
+        self.assertEqual(Wallet('emergencies', wallet_type='lends').wallet_type, 'lends')
+
+    def test_type_and_location_saved(self):
+        """Type and location are part of the wallet data"""
+        wallet = Wallet('loan', 300, wallet_type='debts', location='bank')
+        self.assertEqual(Wallet(**wallet.to_dict()).to_dict(), wallet.to_dict())
+        self.assertEqual(wallet.to_dict()['location'], 'bank')
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,150 @@
+import json
+import os
+import unittest
+from unittest.mock import patch
+from Account import Account
+from AccountTransactionHandler import AccountTransactionHandler
+from Wallet import Wallet
+from WalletBatch import WalletBatch
+from WalletList import WalletList
+
+
+TEST_BATCH_WALLETS_FILENAME = "test_batch_wallets.json"
+TEST_BATCH_TRANSACTIONS_FILENAME = "test_batch_transactions.csv"
+
+class TestWalletBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.wallets = WalletList([
+            Wallet('main', 1500, 70, 0),
+            Wallet('emergencies', 500, 20, 600),
+            Wallet('charity', 200, 10, 0),
+        ])
+
+    def test_valid_batch(self):
+        """Operations run on the copy, in order"""
+        batch = WalletBatch(self.wallets)
+        self.assertTrue(batch.run([
+            ("add", "charity", 100),
+            ("transfer", "charity", "emergencies", 200),
+            ("deduct", "charity", "gift", 50),
+        ]))
+        self.assertEqual(batch.state["charity"], [50, 10, 0])
+        self.assertEqual(batch.state["emergencies"], [600, 0, 600])
+        self.assertEqual(batch.state["main"], [1600, 70, 0])
+        self.assertEqual(batch.deductions, [("charity", 50, 100, 50, "gift")])
+        self.assertEqual(self.wallets.get('charity').balance, 200)
+
+    def test_deposit(self):
+        """Deposits split the amount as Account.deposit"""
+        batch = WalletBatch(self.wallets)
+        self.assertTrue(batch.run([("deposit", 1000)]))
+        self.assertEqual(batch.state["main"], [2300, 70, 0])
+        self.assertEqual(batch.state["emergencies"], [600, 0, 600])
+        self.assertEqual(batch.state["charity"], [300, 10, 0])
+
+    def test_errors(self):
+        """Every invalid operation is reported with its index"""
+        batch = WalletBatch(self.wallets)
+        self.assertFalse(batch.run([
+            ("add", "travels", 100),
+            ("deduct", "charity", "too much", 300),
+            ("set_cap", "main", 10),
+            ("deposit", -5),
+            ("fly", "main"),
+            ("add", "main"),
+            ("add", "main", 10),
+        ]))
+        self.assertEqual([index for index, _ in batch.errors], [0, 1, 2, 3, 4, 5])
+
+    def test_later_operations_see_earlier_ones(self):
+        """An operation is checked against the balances left by the previous ones"""
+        batch = WalletBatch(self.wallets)
+        self.assertFalse(batch.run([
+            ("deduct", "charity", "first", 150),
+            ("deduct", "charity", "second", 100),
+        ]))
+        self.assertEqual(batch.errors[0][0], 1)
+
+
+class TestApplyBatch(unittest.TestCase):
+
+    def setUp(self):
+        test_wallet_data = [
+            {"name": "main", "percent": 70, "balance": 1500, "cap": 0, "wallet_type": "main", "location": ""},
+            {"name": "emergencies", "percent": 20, "balance": 500, "cap": 50000, "wallet_type": "savings", "location": ""},
+            {"name": "charity", "percent": 10, "balance": 200, "cap": 0, "wallet_type": "regular", "location": ""}
+        ]
+        with open(TEST_BATCH_WALLETS_FILENAME, "w") as file:
+            file.write(json.dumps(test_wallet_data))
+        with patch('builtins.print'):
+            self.account = Account(TEST_BATCH_WALLETS_FILENAME, transactions_name=TEST_BATCH_TRANSACTIONS_FILENAME)
+        with open(self.account.get_transactions_file_name(), "w") as file:
+            file.write(AccountTransactionHandler.headers)
+
+    def tearDown(self):
+        self.account.close()
+        for filename in (TEST_BATCH_WALLETS_FILENAME, TEST_BATCH_TRANSACTIONS_FILENAME):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def saved_wallets(self) -> dict:
+        with open(TEST_BATCH_WALLETS_FILENAME) as file:
+            return {wallet["name"]: wallet for wallet in json.load(file)}
+
+    def test_apply_batch(self):
+        """The batch is applied and saved once"""
+        with patch('builtins.print'), patch.object(Account, 'save', wraps=self.account.save) as save:
+            self.assertTrue(self.account.apply_batch(
+                [("add", "charity", 1)] * 1000 + [("deduct", "charity", "gift", 200), ("deposit", 100)]
+            ))
+        save.assert_called_once()
+        self.assertEqual(self.account.get_wallet('charity').balance, 1010)
+        self.assertEqual(self.saved_wallets()["charity"]["balance"], 1010)
+        self.assertEqual(self.saved_wallets()["main"]["balance"], 1570)
+        with open(self.account.get_transactions_file_name()) as file:
+            lines = file.read().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn(',charity,deduction,200,"gift",1200,1000', lines[1])
+
+    def test_invalid_batch_changes_nothing(self):
+        """One invalid operation stops the whole batch"""
+        with patch('builtins.print'), patch.object(Account, 'save') as save:
+            self.assertFalse(self.account.apply_batch([
+                ("add", "charity", 100),
+                ("deduct", "charity", "gift", 1000),
+            ]))
+        save.assert_not_called()
+        self.assertEqual(self.account.get_wallet('charity').balance, 200)
+        self.assertEqual(self.account.transaction_handler._transactions, [])
+
+    def test_failed_save_rolls_back(self):
+        """If saving fails, the wallets and the queue are left as they were"""
+        with patch('builtins.print'), patch.object(Account, 'save', side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.account.apply_batch([("add", "charity", 100), ("deduct", "main", "rent", 500)])
+        self.assertEqual(self.account.get_wallet('charity').balance, 200)
+        self.assertEqual(self.account.get_wallet('main').balance, 1500)
+        self.assertEqual(self.account.transaction_handler._transactions, [])
+
+    def test_failed_wallets_write_takes_transactions_back(self):
+        """If the wallets file can't be written, the transactions appended by the save are removed"""
+        with open(self.account.get_transactions_file_name()) as file:
+            transactions = file.read()
+        with patch('builtins.print'), patch('os.replace', side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.account.apply_batch([("deduct", "main", "rent", 500)])
+        with open(self.account.get_transactions_file_name()) as file:
+            self.assertEqual(file.read(), transactions)
+        self.assertEqual(self.saved_wallets()["main"]["balance"], 1500)
+        self.assertEqual(self.account.transaction_handler._transactions, [])
+
+        with patch('builtins.print'):
+            self.account.deduct('main', 'rent', 100)
+            self.account.save()
+        with open(self.account.get_transactions_file_name()) as file:
+            self.assertEqual(len(file.read().splitlines()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import json
+import os
+import unittest
+from Account import Account
+from WalletJournal import WalletJournal
+
+
+TEST_JOURNAL_WALLET_FILENAME = "test_journal_wallet.json"
+TEST_TRANSACTIONS_FILENAME = "test_transactions.csv"
+
+
+class TestWalletJournal(unittest.TestCase):
+
+    def setUp(self):
+        test_wallet_data = [
+            {"name": "main", "percent": 70, "balance": 1500, "cap": 0},
+            {"name": "emergencies", "percent": 20, "balance": 500, "cap": 50000},
+            {"name": "charity", "percent": 10, "balance": 200, "cap": 0}
+        ]
+        with open(TEST_JOURNAL_WALLET_FILENAME, "w") as file:
+            file.write(json.dumps(test_wallet_data))
+        self.account = self.reopen()
+        self.journal_filename = f"{TEST_JOURNAL_WALLET_FILENAME}.journal"
+
+    def tearDown(self):
+        for filename in (TEST_JOURNAL_WALLET_FILENAME, self.journal_filename):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def reopen(self) -> Account:
+        return Account(
+            TEST_JOURNAL_WALLET_FILENAME,
+            storage="journal",
+            transactions_name=TEST_TRANSACTIONS_FILENAME
+        )
+
+    def journal_lines(self) -> list:
+        with open(self.journal_filename) as file:
+            return file.read().splitlines()
+
+    def test_invalid_storage(self):
+        """Unknown storages are rejected"""
+        with self.assertRaises(ValueError):
+            Account(TEST_JOURNAL_WALLET_FILENAME, storage="xml")
+
+    def test_first_save_writes_snapshot(self):
+        """The first save compacts, leaving only the journal header"""
+        self.account.add('charity', 100)
+        self.account.save()
+        self.assertEqual(len(self.journal_lines()), 1)
+        with open(TEST_JOURNAL_WALLET_FILENAME) as file:
+            wallets = json.loads(file.read())
+        self.assertEqual(wallets[2]["balance"], 300)
+
+    def test_save_appends_only_changes(self):
+        """Saves append the changed wallets only"""
+        self.account.save()
+        self.account.add('charity', 100)
+        self.account.save()
+        lines = self.journal_lines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[1])["wallet"]["name"], "charity")
+
+        self.account.save()
+        self.assertEqual(len(self.journal_lines()), 2)
+
+    def test_reload_replays_journal(self):
+        """Snapshot plus journal rebuild the saved state"""
+        self.account.save()
+        self.account.transfer('main', 'charity', 100)
+        self.account.add_wallet('home', 10, 0, 0)
+        self.account.rename('emergencies', 'savings')
+        self.account.delete_wallet('home')
+        self.account.save()
+
+        account = self.reopen()
+        self.assertEqual([wallet.name for wallet in account.wallets], ['main', 'savings', 'charity'])
+        self.assertEqual(account.get_wallet('main').balance, 1410)
+        self.assertEqual(account.get_wallet('savings').balance, 500)
+        self.assertEqual(account.get_wallet('charity').balance, 300)
+
+    def test_reset_replays_journal(self):
+        """Reset goes back to snapshot plus journal"""
+        self.account.save()
+        self.account.add('charity', 100)
+        self.account.save()
+        self.account.add('charity', 500)
+        self.account.reset()
+        self.assertEqual(self.account.get_wallet('charity').balance, 300)
+
+    def test_compaction(self):
+        """Once the journal is long enough the next save writes a snapshot"""
+        self.account.save()
+        journal = WalletJournal(TEST_JOURNAL_WALLET_FILENAME, compact_every=2)
+        journal.load()
+        for amount in (1, 2, 3):
+            self.account.add('charity', amount)
+            journal.save(self.account.wallets)
+        self.assertEqual(len(self.journal_lines()), 1)
+        self.assertEqual(self.reopen().get_wallet('charity').balance, 206)
+
+    def test_stale_journal_ignored(self):
+        """A journal for another snapshot is not replayed"""
+        self.account.save()
+        self.account.add('charity', 100)
+        self.account.save()
+        with open(TEST_JOURNAL_WALLET_FILENAME, "w") as file:
+            file.write(json.dumps([{"name": "main", "percent": 0, "balance": 5, "cap": 0}]))
+        account = self.reopen()
+        self.assertEqual(len(account), 1)
+        self.assertEqual(account.get_wallet('main').balance, 5)
+
+    def test_incomplete_journal_line(self):
+        """An interrupted save doesn't break the load"""
+        self.account.save()
+        self.account.add('charity', 100)
+        self.account.save()
+        with open(self.journal_filename, "a") as file:
+            file.write('{"op": "put", "wal')
+        account = self.reopen()
+        self.assertEqual(account.get_wallet('charity').balance, 300)
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
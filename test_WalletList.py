@@ -0,0 +1,174 @@
+import unittest
+from Wallet import Wallet
+from WalletList import WalletList
+
+
+class TestWalletList(unittest.TestCase):
+
+    def setUp(self):
+        self.main = Wallet('main', 100)
+        self.home = Wallet('home', 50)
+        self.wallets = WalletList([self.main, self.home])
+
+    def test_get(self):
+        """Wallets are found by name"""
+        self.assertIs(self.wallets.get('main'), self.main)
+        self.assertIs(self.wallets.get('home'), self.home)
+        self.assertIsNone(self.wallets.get('travels'))
+
+    def test_keeps_order(self):
+        """The list order is kept for display"""
+        travels = Wallet('travels')
+        self.wallets.insert(0, travels)
+        self.assertEqual([wallet.name for wallet in self.wallets], ['travels', 'main', 'home'])
+        self.assertIs(self.wallets.get('travels'), travels)
+
+    def test_remove(self):
+        """Removed wallets are dropped from the index"""
+        self.wallets.remove(self.home)
+        self.assertIsNone(self.wallets.get('home'))
+        self.assertEqual(len(self.wallets), 1)
+
+    def test_pop_and_del(self):
+        """pop and del keep the index in sync"""
+        self.assertIs(self.wallets.pop(), self.home)
+        self.assertIsNone(self.wallets.get('home'))
+        del self.wallets[0]
+        self.assertIsNone(self.wallets.get('main'))
+
+    def test_clear(self):
+        """Clearing the list empties the index"""
+        self.wallets.clear()
+        self.assertIsNone(self.wallets.get('main'))
+        self.assertEqual(len(self.wallets.names()), 0)
+
+    def test_cleared_wallets_keep_their_data(self):
+        """Wallets taken out by clear still work and can join a list again"""
+        self.wallets.clear()
+        self.assertEqual((self.home.name, self.home.balance), ('home', 50))
+        self.home.balance = 70
+        self.assertEqual(self.wallets.total(), 0)
+        self.wallets.append(self.home)
+        self.assertEqual(self.wallets.total(), 70)
+        self.assertIs(self.home._table, self.wallets.table)
+
+    def test_extend_data(self):
+        """Wallets added from their data are made in the table of the list"""
+        self.wallets.extend_data([{'name': 'travels', 'balance': 30, 'location': 'bank'}, {'name': 'savings'}])
+        travels = self.wallets.get('travels')
+        self.assertIs(travels._table, self.wallets.table)
+        self.assertEqual(travels.to_dict()['balance'], 30)
+        self.assertEqual(self.wallets.total(), 180)
+        self.assertEqual(self.wallets.group_total('location', 'bank'), 30)
+        self.assertEqual(self.wallets.get('savings').wallet_type, Wallet.default_type('savings'))
+
+    def test_rename_wallet(self):
+        """Renamed wallets are indexed under their new name"""
+        self.wallets.rename_wallet(self.home, 'house')
+        self.assertEqual(self.home.name, 'house')
+        self.assertIsNone(self.wallets.get('home'))
+        self.assertIs(self.wallets.get('house'), self.home)
+
+    def test_contains(self):
+        """Membership checks use the index for wallets"""
+        self.assertIn(self.main, self.wallets)
+        self.assertNotIn(Wallet('main'), self.wallets)
+
+    def test_rename_through_attribute(self):
+        """Setting the name attribute keeps the index in sync"""
+        self.home.name = 'house'
+        self.assertIs(self.wallets.get('house'), self.home)
+        self.assertIsNone(self.wallets.get('home'))
+
+    def test_pending_changes(self):
+        """Changes since the last save are reported as journal records"""
+        self.wallets.mark_saved()
+        self.assertFalse(self.wallets.has_changes())
+
+        self.home.balance += 10
+        self.wallets.rename_wallet(self.main, 'principal')
+        self.wallets.append(Wallet('travels'))
+        self.wallets.remove(self.home)
+
+        records = self.wallets.pending_changes()
+        self.assertEqual(records[0], {'op': 'rename', 'name': 'main', 'new_name': 'principal'})
+        self.assertEqual(records[1], {'op': 'delete', 'name': 'home'})
+        self.assertEqual([record['wallet']['name'] for record in records[2:]], ['principal', 'travels'])
+
+        self.wallets.mark_saved()
+        self.assertEqual(self.wallets.pending_changes(), [])
+
+    def test_removed_wallets_not_tracked(self):
+        """Wallets out of the list don't report changes anymore"""
+        self.wallets.remove(self.home)
+        self.wallets.mark_saved()
+        self.home.balance = 0
+        self.assertFalse(self.wallets.has_changes())
+
+    def test_running_total(self):
+        """The total balance follows every change of the wallets"""
+        self.assertEqual(self.wallets.total(), 150)
+        self.main += 20
+        self.home -= 5
+        self.assertEqual(self.wallets.total(), 165)
+        self.home.balance = 0
+        self.wallets.append(Wallet('car', 30))
+        self.assertEqual(self.wallets.total(), 150)
+        self.wallets.remove(self.main)
+        self.assertEqual(self.wallets.total(), 30)
+        self.wallets[0] = Wallet('trip', 7)
+        self.assertEqual(self.wallets.total(), 37)
+        self.wallets.clear()
+        self.assertEqual(self.wallets.total(), 0)
+
+    def test_check_totals(self):
+        """The debug mode catches a running total gone wrong"""
+        self.wallets.check_totals = True
+        self.main += 10
+        self.assertEqual(self.wallets.total(), 160)
+        self.wallets._balance_total += 1
+        with self.assertRaises(AssertionError):
+            self.wallets.total()
+
+    def test_groups(self):
+        """Groups and their totals follow the wallets and their changes"""
+        loan = Wallet('loan', 40, wallet_type='debts', location='bank')
+        self.wallets.append(loan)
+        self.home.location = 'bank'
+        self.assertEqual(self.wallets.group_totals('wallet_type'), {'main': 100, 'regular': 50, 'debts': 40})
+        self.assertEqual(self.wallets.group_total('location', 'bank'), 90)
+        self.assertCountEqual(self.wallets.group('location', 'bank'), [loan, self.home])
+
+        loan.wallet_type = 'lends'
+        loan += 10
+        self.home.balance = 0
+        self.assertEqual(self.wallets.group_totals('wallet_type'), {'main': 100, 'regular': 0, 'lends': 50})
+        self.assertEqual(self.wallets.group_total('location', 'bank'), 50)
+
+        self.wallets.remove(loan)
+        self.assertEqual(self.wallets.group('wallet_type', 'lends'), [])
+        self.assertEqual(self.wallets.group_totals('location'), {'': 100, 'bank': 0})
+
+    def test_group_members_after_removals(self):
+        """Removing wallets from the middle of a group keeps the rest of it"""
+        wallets = [Wallet(f'wallet_{number}', number) for number in range(20)]
+        self.wallets.extend(wallets)
+        for wallet in wallets[::3]:
+            self.wallets.remove(wallet)
+        kept = [wallet for number, wallet in enumerate(wallets) if number % 3]
+        self.assertCountEqual(self.wallets.group('wallet_type', 'regular'), kept + [self.home])
+        self.wallets.clear()
+        self.assertEqual(self.wallets.group_totals('location'), {})
+        self.assertEqual(self.wallets.total(), 0)
+        self.wallets.append(wallets[0])
+        self.assertEqual(self.wallets.group('location', ''), [wallets[0]])
+
+    def test_check_group_totals(self):
+        """The debug mode also checks the totals of the groups"""
+        self.wallets.check_totals = True
+        self.wallets._group_totals['wallet_type']['main'] += 1
+        with self.assertRaises(AssertionError):
+            self.wallets.group_total('wallet_type', 'regular')
+
+if __name__ == "__main__":
+    unittest.main()
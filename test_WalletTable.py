@@ -0,0 +1,109 @@
+import copy
+import gc
+import pickle
+import unittest
+from array import array
+from Wallet import Wallet
+from WalletList import WalletList
+from WalletTable import WalletTable
+
+
+class TestWalletTable(unittest.TestCase):
+
+    def test_rows_are_reused(self):
+        """Freed rows are zeroed and given to the next wallet"""
+        table = WalletTable()
+        first = table.add('first', 10, 20, 30)
+        second = table.add('second', 1, 2, 3)
+        table.remove(first)
+        self.assertEqual(len(table), 1)
+        self.assertEqual(table.row(first), (None, 0, 0, 0, None, None))
+        self.assertEqual(table.add('third', 4, 5, 6), first)
+        self.assertEqual(table.row(second), ('second', 1, 2, 3, 'regular', ''))
+        self.assertEqual(table.total(), 5)
+
+    def test_names_are_interned(self):
+        """Equal names share one string"""
+        table = WalletTable()
+        row = table.add(''.join(['sav', 'ings']), 0, 0, 0)
+        self.assertIs(table.names[row], 'savings')
+
+    def test_values_that_dont_fit(self):
+        """A column becomes a list to keep values an int64 array can't hold"""
+        table = WalletTable()
+        row = table.add('big', 2 ** 70, 0, 0)
+        table.set('percents', row, 1.5)
+        self.assertEqual(table.row(row), ('big', 2 ** 70, 1.5, 0, 'regular', ''))
+        self.assertIsInstance(table.balances, list)
+        self.assertIsInstance(table.caps, array)
+
+
+class TestWalletViews(unittest.TestCase):
+
+    def test_no_instance_dict(self):
+        """Wallets are slotted views and don't take new attributes"""
+        wallet = Wallet('test', 5)
+        self.assertFalse(hasattr(wallet, '__dict__'))
+        with self.assertRaises(AttributeError):
+            wallet.color = 'blue'
+
+    def test_wallets_move_to_their_list(self):
+        """A wallet's data moves to the table of its list and back when it leaves"""
+        wallet = Wallet('test', 5, 10, 20, 'debts', 'bank')
+        self.assertIs(wallet._table, Wallet.loose)
+        wallets = WalletList([wallet])
+        self.assertIs(wallet._table, wallets.table)
+        wallet += 10
+        self.assertEqual(wallets.table.balances[wallet._row], 15)
+
+        wallets.remove(wallet)
+        self.assertIs(wallet._table, Wallet.loose)
+        self.assertEqual(wallet.to_dict(), {
+            'name': 'test', 'percent': 10, 'balance': 15, 'cap': 20, 'wallet_type': 'debts', 'location': 'bank'
+        })
+        self.assertEqual(len(wallets.table), 0)
+
+    def test_collected_wallet_frees_row(self):
+        """The row of a wallet is freed when the wallet is collected"""
+        in_use = len(Wallet.loose)
+        wallet = Wallet('temporary')
+        self.assertEqual(len(Wallet.loose), in_use + 1)
+        del wallet
+        gc.collect()
+        self.assertEqual(len(Wallet.loose), in_use)
+
+    def test_copies_have_their_own_row(self):
+        """Copies are new wallets, dropping them leaves the original as it was"""
+        wallets = WalletList([Wallet('main', 10), Wallet('home', 5, wallet_type='debts')])
+        home = wallets.get('home')
+        for copied in (copy.copy(home), copy.deepcopy(home), pickle.loads(pickle.dumps(home))):
+            self.assertIs(copied._table, Wallet.loose)
+            self.assertEqual(copied.to_dict(), home.to_dict())
+            del copied
+        gc.collect()
+        wallets.append(Wallet('car', 1))
+        self.assertEqual(home.to_dict()['balance'], 5)
+        self.assertEqual([wallet.name for wallet in wallets], ['main', 'home', 'car'])
+
+    def test_wallet_in_one_list(self):
+        """A wallet must leave its list before joining another one"""
+        first, second = WalletList([Wallet('main', 10)]), WalletList()
+        wallet = first.get('main')
+        with self.assertRaises(ValueError):
+            second.append(wallet)
+        self.assertEqual(first.total(), 10)
+        first.remove(wallet)
+        second.append(wallet)
+        self.assertEqual((first.total(), second.total()), (0, 10))
+
+    def test_list_total(self):
+        """Sums run on the columns of the list table"""
+        wallets = WalletList([Wallet('one', 10, 30), Wallet('two', 20, 70)])
+        wallets.append(Wallet('three', 5))
+        wallets.pop(0)
+        self.assertEqual(wallets.total(), 25)
+        self.assertEqual(wallets.total('percents'), 70)
+
+
+if __name__ == "__main__":
+    unittest.main()